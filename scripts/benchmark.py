@@ -0,0 +1,281 @@
+# scripts/benchmark.py
+
+import contextlib
+import importlib.metadata
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from run_metrics import peak_rss_mb
+
+# Text drawn on the synthetic videos, matching the classes in create_data_yaml.py
+SYNTHETIC_TEXT = "Billing_Enabled"
+
+DEFAULT_CONFIG = {
+    "model": "yolo11n.yaml",     # Untrained tiny model, built locally without downloading weights
+    "videos": 4,                 # Synthetic videos for the extraction benchmark
+    "video_frames": 120,         # Frames per synthetic video
+    "video_size": [640, 360],    # (width, height) of the synthetic videos
+    "fps": 30,
+    "images": 2000,              # Synthetic images/labels for the split and validation benchmarks
+    "image_size": [320, 180],
+    "boxes_per_image": 3,
+    "verify_frames": 60,         # Frames in the video used by the verification benchmarks
+    "batch_size": 4,
+    "seed": 0,
+}
+
+def generate_video(path, frames, size, fps, text_from=None, seed=0):
+    """
+    Write a synthetic screen-recording-like video: a static background with a moving cursor and,
+    from frame text_from on, the target text at a fixed position.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    background = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    for i in range(frames):
+        frame = background.copy()
+        cv2.circle(frame, (int(i * 7) % width, height // 2), 6, (255, 255, 255), -1)
+        if text_from is not None and i >= text_from:
+            cv2.putText(frame, SYNTHETIC_TEXT, (width // 10, height // 5), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        out.write(frame)
+    out.release()
+
+def generate_dataset(images_dir, labels_dir, count, size, boxes_per_image, seed=0):
+    """
+    Write count random JPEG images with YOLO label files holding random boxes.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(images_dir, exist_ok=True)
+    os.makedirs(labels_dir, exist_ok=True)
+    width, height = size
+    image = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(count):
+        cv2.imwrite(os.path.join(images_dir, f"image_{i}.jpg"), np.roll(image, i, axis=1))
+        boxes = rng.uniform(0.05, 0.3, (boxes_per_image, 4))
+        boxes[:, :2] = rng.uniform(0.3, 0.7, (boxes_per_image, 2))
+        classes = rng.integers(0, 4, boxes_per_image)
+        with open(os.path.join(labels_dir, f"image_{i}.txt"), 'w') as f:
+            f.writelines(f"{c} {x:.6f} {y:.6f} {w:.6f} {h:.6f}\n" for c, (x, y, w, h) in zip(classes, boxes))
+
+def _load_model(config):
+    from ultralytics import YOLO
+
+    model = YOLO(config["model"])
+    model.to('cpu')
+    # Warm up so model construction and the first-call overhead are not measured
+    model(np.zeros((config["video_size"][1], config["video_size"][0], 3), dtype=np.uint8), verbose=False)
+    return model
+
+def bench_extract_frames(workdir, config):
+    from extract_frames import extract_frames_from_videos
+
+    videos_dir = os.path.join(workdir, "videos")
+    os.makedirs(videos_dir, exist_ok=True)
+    for i in range(config["videos"]):
+        generate_video(os.path.join(videos_dir, f"video_{i}.mp4"), config["video_frames"], config["video_size"], config["fps"], seed=config["seed"] + i)
+    output_dir = os.path.join(workdir, "extracted_frames")
+
+    def run():
+        results = extract_frames_from_videos(videos_dir, output_dir, frame_rate=config["fps"], incremental=False)
+        return sum(stats["extracted"] for stats in results)
+    return run, "frames"
+
+def _bench_split(workdir, config, mode):
+    from dataset_index import DatasetIndex
+    from split_dataset import split_dataset
+
+    images_dir, labels_dir = os.path.join(workdir, "all_images"), os.path.join(workdir, "all_labels")
+    generate_dataset(images_dir, labels_dir, config["images"], config["image_size"], config["boxes_per_image"], seed=config["seed"])
+
+    def run():
+        # A fresh output directory and index per run, so every repeat lists and places all files
+        run_dir = tempfile.mkdtemp(prefix="split_", dir=workdir)
+        index = DatasetIndex(os.path.join(run_dir, "dataset_index.json"))
+        split_dataset(images_dir, labels_dir, os.path.join(run_dir, "split"), mode=mode, index=index)
+        return config["images"]
+    return run, "images"
+
+def bench_split_dataset(workdir, config):
+    return _bench_split(workdir, config, 'copy')
+
+def bench_split_dataset_hardlink(workdir, config):
+    return _bench_split(workdir, config, 'hardlink')
+
+def bench_check_labels(workdir, config):
+    from check_labels import check_labels
+    from dataset_index import DatasetIndex
+
+    images_dir, labels_dir = os.path.join(workdir, "images"), os.path.join(workdir, "labels")
+    generate_dataset(images_dir, labels_dir, config["images"], config["image_size"], config["boxes_per_image"], seed=config["seed"])
+
+    def run():
+        # A fresh index per run so the directory listing is part of every repeat
+        index_dir = tempfile.mkdtemp(prefix="index_", dir=workdir)
+        check_labels(labels_dir, nc=4, index=DatasetIndex(os.path.join(index_dir, "dataset_index.json")))
+        return config["images"]
+    return run, "label files"
+
+def bench_verify_and_save_video(workdir, config):
+    from verify_video import verify_and_save_video
+
+    video = os.path.join(workdir, "verify.mp4")
+    generate_video(video, config["verify_frames"], config["video_size"], config["fps"], text_from=config["verify_frames"] // 2)
+    model = _load_model(config)
+
+    def run():
+        verify_and_save_video(video, os.path.join(workdir, "annotated.mp4"), model, batch_size=config["batch_size"])
+        return config["verify_frames"]
+    return run, "frames"
+
+def bench_verify_and_save_frame(workdir, config):
+    from verify_video_frame import verify_and_save_frame
+
+    # No text is drawn, so an untrained model scans the whole video like the worst case of a real one
+    video = os.path.join(workdir, "verify_frame.mp4")
+    generate_video(video, config["verify_frames"], config["video_size"], config["fps"])
+    model = _load_model(config)
+
+    def run():
+        result = verify_and_save_frame(video, model, os.path.join(workdir, "detected_frames"), batch_size=config["batch_size"])
+        return result["frames_decoded"]
+    return run, "frames"
+
+BENCHMARKS = {
+    "extract_frames": bench_extract_frames,
+    "split_dataset": bench_split_dataset,
+    "split_dataset_hardlink": bench_split_dataset_hardlink,
+    "check_labels": bench_check_labels,
+    "verify_and_save_video": bench_verify_and_save_video,
+    "verify_and_save_frame": bench_verify_and_save_frame,
+}
+
+def _run_in_child(name, config, repeat, results):
+    """
+    Set up and time one benchmark in its own process so its peak memory is measured in isolation.
+    """
+    workdir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            run, unit = BENCHMARKS[name](workdir, config)
+            setup_rss = peak_rss_mb()
+            timings = []
+            items = 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                items = run()
+                timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results.put({
+            "seconds": best,
+            "seconds_all": timings,
+            "items": items,
+            "unit": unit,
+            "throughput": items / best if best > 0 else None,
+            "peak_rss_mb": peak_rss_mb(),
+            "setup_peak_rss_mb": setup_rss,
+        })
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def run_benchmarks(names=None, config=None, repeat=3):
+    """
+    Run the selected benchmarks, each in a fresh process, on synthetic data.
+
+    :param names: Benchmarks to run (default: all of BENCHMARKS).
+    :param config: Overrides for DEFAULT_CONFIG.
+    :param repeat: Timed runs per benchmark; the fastest is reported.
+    :return: Dictionary with run metadata and one result per benchmark.
+    """
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    context = multiprocessing.get_context("spawn")
+    report = {"meta": _environment(config, repeat), "benchmarks": {}}
+    for name in names or BENCHMARKS:
+        queue = context.Queue()
+        process = context.Process(target=_run_in_child, args=(name, config, repeat, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        report["benchmarks"][name] = result
+        if "error" in result:
+            print(f"{name}: failed ({result['error']})")
+        else:
+            print(f"{name}: {result['throughput']:.1f} {result['unit']}/s, {result['seconds']:.2f}s, peak RSS {result['peak_rss_mb'] or 0:.0f} MB")
+    return report
+
+def _environment(config, repeat):
+    versions = {"python": platform.python_version(), "opencv": cv2.__version__, "numpy": np.__version__}
+    # Read from the package metadata: importing torch here would raise the peak RSS every
+    # benchmark process inherits from this one
+    for module in ("torch", "ultralytics"):
+        try:
+            versions[module] = importlib.metadata.version(module)
+        except importlib.metadata.PackageNotFoundError:
+            versions[module] = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+        "config": config,
+        "repeat": repeat,
+    }
+
+def compare_to_baseline(report, baseline, tolerance=0.1):
+    """
+    Compare throughput against a stored baseline report.
+
+    :param tolerance: Relative slowdown allowed before a benchmark counts as a regression.
+    :return: Dictionary per benchmark with the throughput ratio (current / baseline) and a
+             regression flag; benchmarks missing from either report are skipped.
+    """
+    comparison = {}
+    for name, result in report["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if not reference or not reference.get("throughput") or not result.get("throughput"):
+            continue
+        ratio = result["throughput"] / reference["throughput"]
+        comparison[name] = {"ratio": ratio, "regression": ratio < 1 - tolerance}
+    return comparison
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark extraction, splitting, label validation and verification on synthetic data.")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=None, help="Benchmarks to run (default: all).")
+    parser.add_argument("--model", type=str, default=DEFAULT_CONFIG["model"], help="Model used by the verification benchmarks (default: yolo11n.yaml).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3).")
+    parser.add_argument("--output", type=str, default="benchmark_results.json", help="Path to write the JSON results.")
+    parser.add_argument("--baseline", type=str, default=None, help="Baseline JSON results to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative slowdown before reporting a regression (default: 0.1).")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.benchmarks, config={"model": args.model}, repeat=args.repeat)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            report["comparison"] = compare_to_baseline(report, json.load(f), tolerance=args.tolerance)
+        for name, result in report["comparison"].items():
+            status = "REGRESSION" if result["regression"] else "ok"
+            print(f"{name}: {result['ratio']:.2f}x baseline ({status})")
+            if result["regression"]:
+                regressions.append(name)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    sys.exit(1 if regressions else 0)
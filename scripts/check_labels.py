@@ -1,28 +1,218 @@
 # scripts/check_labels.py
- 
+
 import os
- 
-def check_labels(labels_dir):
-    label_files = [f for f in os.listdir(labels_dir) if f.endswith('.txt')]
-    for label_file in label_files:
-        path = os.path.join(labels_dir, label_file)
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import yaml
+
+from dataset_index import DatasetIndex, LABEL_EXTENSIONS
+
+LABEL_ERRORS = ('bad_class', 'out_of_range', 'zero_size', 'duplicate')
+
+def load_class_count(yaml_path):
+    """
+    Read the number of classes (nc) from a data.yaml file.
+    """
+    with open(yaml_path, 'r') as f:
+        return int(yaml.safe_load(f)['nc'])
+
+def parse_label_files(paths):
+    """
+    Parse YOLO label files into a single array of rows.
+
+    :param paths: Label file paths.
+    :return: Tuple (rows, file_ids, line_numbers, empty, malformed) where rows is an (N, 5) float64
+             array of class, x, y, w, h, file_ids and line_numbers locate each row, empty lists the
+             indices of empty files and malformed lists (file index, line number, line) tuples.
+    """
+    rows, file_ids, line_numbers = [], [], []
+    empty, malformed = [], []
+    for file_id, path in enumerate(paths):
         with open(path, 'r') as file:
             content = file.read().strip()
-            if not content:
-                print(f"Empty label file: {label_file}")
-            else:
-                # Check each line for correct number of elements
-                for line_num, line in enumerate(content.split('\n'), start=1):
-                    parts = line.strip().split()
-                    if len(parts) != 5:
-                        print(f"Malformed line in {label_file} on line {line_num}: {line}")
- 
+        if not content:
+            empty.append(file_id)
+            continue
+        for line_num, line in enumerate(content.split('\n'), start=1):
+            parts = line.split()
+            if len(parts) != 5:
+                malformed.append((file_id, line_num, line.strip()))
+                continue
+            try:
+                rows.append([float(part) for part in parts])
+            except ValueError:
+                malformed.append((file_id, line_num, line.strip()))
+                continue
+            file_ids.append(file_id)
+            line_numbers.append(line_num)
+    return (np.asarray(rows, dtype=np.float64).reshape(-1, 5), np.asarray(file_ids, dtype=np.int64),
+            np.asarray(line_numbers, dtype=np.int64), empty, malformed)
+
+def _parse_chunk(args):
+    offset, paths = args
+    rows, file_ids, line_numbers, empty, malformed = parse_label_files(paths)
+    return (rows, file_ids + offset, line_numbers, [i + offset for i in empty],
+            [(i + offset, line_num, line) for i, line_num, line in malformed])
+
+def parse_label_files_parallel(paths, workers=None, chunk_size=256):
+    """
+    Parse label files in a process pool, one chunk of files per task.
+
+    Small inputs are parsed in-process to avoid the pool start-up cost.
+    """
+    if workers == 1 or len(paths) <= chunk_size:
+        return parse_label_files(paths)
+
+    chunks = [(offset, paths[offset:offset + chunk_size]) for offset in range(0, len(paths), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_parse_chunk, chunks))
+
+    return (np.concatenate([part[0] for part in parts]),
+            np.concatenate([part[1] for part in parts]),
+            np.concatenate([part[2] for part in parts]),
+            [i for part in parts for i in part[3]],
+            [m for part in parts for m in part[4]])
+
+def validate_rows(rows, file_ids, nc=None):
+    """
+    Check every label row in one vectorized pass.
+
+    :param rows: (N, 5) array of class, x, y, w, h.
+    :param file_ids: (N,) array with the file each row belongs to.
+    :param nc: Number of classes; class ids must be integers in [0, nc). Only the sign and
+               integrality of class ids are checked when None.
+    :return: Dictionary mapping each error in LABEL_ERRORS to a boolean mask over the rows.
+    """
+    classes = rows[:, 0]
+    coords = rows[:, 1:]
+
+    bad_class = (classes < 0) | (classes != np.round(classes))
+    if nc is not None:
+        bad_class |= classes >= nc
+
+    out_of_range = ((coords < 0) | (coords > 1)).any(axis=1)
+    zero_size = (coords[:, 2] <= 0) | (coords[:, 3] <= 0)
+
+    # A row is a duplicate if an identical row appeared earlier in the same file
+    duplicate = np.zeros(len(rows), dtype=bool)
+    if len(rows):
+        keyed = np.column_stack([file_ids, np.round(rows, 6)])
+        _, first = np.unique(keyed, axis=0, return_index=True)
+        duplicate[:] = True
+        duplicate[first] = False
+
+    return {
+        'bad_class': bad_class,
+        'out_of_range': out_of_range,
+        'zero_size': zero_size,
+        'duplicate': duplicate,
+    }
+
+def summarize(names, rows, file_ids, line_numbers, empty, malformed, masks, top=10):
+    """
+    Build a structured summary of the validation results.
+
+    :return: Dictionary with file and row counts, counts per error type, the empty and malformed
+             files, and the files with the most problems together with their offending lines.
+    """
+    invalid = np.zeros(len(rows), dtype=bool)
+    for mask in masks.values():
+        invalid |= mask
+
+    problems = np.bincount(file_ids[invalid], minlength=len(names))
+    for file_id, _, _ in malformed:
+        problems[file_id] += 1
+
+    worst = []
+    for file_id in np.argsort(-problems, kind='stable')[:top]:
+        if problems[file_id] == 0:
+            break
+        in_file = invalid & (file_ids == file_id)
+        worst.append({
+            'file': names[file_id],
+            'problems': int(problems[file_id]),
+            'errors': {error: [int(n) for n in line_numbers[mask & in_file]] for error, mask in masks.items() if (mask & in_file).any()},
+            'malformed_lines': [line_num for i, line_num, _ in malformed if i == file_id],
+        })
+
+    return {
+        'files': len(names),
+        'rows': int(len(rows)),
+        'invalid_rows': int(invalid.sum()),
+        'empty_files': [names[i] for i in empty],
+        'malformed_lines': len(malformed),
+        'errors': {error: int(mask.sum()) for error, mask in masks.items()},
+        'worst_files': worst,
+    }
+
+def check_labels(labels_dir, nc=None, workers=None, top=10, index=None, use_store=False, verify_store=False):
+    """
+    Validate all YOLO label files in a directory.
+
+    Files are parsed in parallel and every row is checked at once: class id in [0, nc),
+    coordinates in [0, 1], non-zero width and height, and no duplicate boxes within a file.
+
+    :param labels_dir: Directory containing label files.
+    :param nc: Number of classes from data.yaml (class ids are not range-checked if None).
+    :param workers: Number of parser processes (default: number of CPU cores).
+    :param top: Number of worst offending files to include in the summary.
+    :param index: DatasetIndex used to list the label files (a new one is opened if None).
+    :param use_store: Validate the packed label store (rebuilt only if a label file changed)
+                      instead of parsing every .txt file.
+    :param verify_store: Stat every label file before trusting the store, to catch files edited in place.
+    :return: Summary dictionary, see summarize().
+    """
+    index = index or DatasetIndex()
+    if use_store:
+        # Imported here because label_store builds on the parser in this module
+        from label_store import open_label_store
+
+        store = open_label_store(labels_dir, workers=workers, index=index, verify=verify_store)
+        names, rows, file_ids = store.names, store.rows(), store.file_ids()
+        line_numbers, empty, malformed = np.asarray(store.lines), store.empty, store.malformed
+    else:
+        names = sorted(index.files(labels_dir, LABEL_EXTENSIONS))
+        index.save()
+        paths = [os.path.join(labels_dir, name) for name in names]
+        rows, file_ids, line_numbers, empty, malformed = parse_label_files_parallel(paths, workers=workers)
+
+    masks = validate_rows(rows, file_ids, nc=nc)
+    return summarize(names, rows, file_ids, line_numbers, empty, malformed, masks, top=top)
+
+def print_summary(summary):
+    """
+    Print a validation summary in a compact, human-readable form.
+    """
+    print(f"Files: {summary['files']}, boxes: {summary['rows']}, invalid boxes: {summary['invalid_rows']}")
+    print(f"Empty files: {len(summary['empty_files'])}, malformed lines: {summary['malformed_lines']}")
+    for error, count in summary['errors'].items():
+        print(f"  {error}: {count}")
+    if summary['worst_files']:
+        print("Worst offenders:")
+        for worst in summary['worst_files']:
+            details = ", ".join(f"{error} on lines {lines}" for error, lines in worst['errors'].items())
+            if worst['malformed_lines']:
+                details = ", ".join(filter(None, [details, f"malformed lines {worst['malformed_lines']}"]))
+            print(f"  {worst['file']}: {worst['problems']} problems ({details})")
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate the training and validation label files.")
+    parser.add_argument("--store", action='store_true', help="Validate the packed label store instead of parsing every .txt file.")
+    parser.add_argument("--verify", action='store_true', help="With --store, stat every label file to catch files edited in place since the store was built.")
+    args = parser.parse_args()
+
     train_labels_dir = os.path.abspath("../dataset/images/train/labels")
     val_labels_dir = os.path.abspath("../dataset/images/val/labels")
-   
+    data_yaml = os.path.abspath("../dataset/data.yaml")
+    nc = load_class_count(data_yaml) if os.path.exists(data_yaml) else None
+    use_store = args.store
+    index = DatasetIndex()
+
     print("Checking training labels...")
-    check_labels(train_labels_dir)
-   
+    print_summary(check_labels(train_labels_dir, nc=nc, index=index, use_store=use_store, verify_store=args.verify))
+
     print("\nChecking validation labels...")
-    check_labels(val_labels_dir)
\ No newline at end of file
+    print_summary(check_labels(val_labels_dir, nc=nc, index=index, use_store=use_store, verify_store=args.verify))
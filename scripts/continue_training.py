@@ -1,6 +1,15 @@
 # scripts/continue_training.py
  
+import os
+import random
+import shutil
+import tempfile
+
+import yaml
 from ultralytics import YOLO
+
+from export_model import split_images, split_source
+from training_manifest import load_training_manifest, save_training_manifest, training_manifest, training_manifest_path
  
 def continue_training(existing_model_path, data_yaml_path, epochs=50, imgsz=640, batch=16, name="text_verification_model_finetuned"):
     """
@@ -32,26 +41,133 @@ def continue_training(existing_model_path, data_yaml_path, epochs=50, imgsz=640,
  
     print("Training completed successfully.")
  
+def find_new_images(data_yaml_path, manifest):
+    """
+    Split the train images of a data.yaml into those not seen in a dataset manifest, including
+    images replaced or relabeled since, and those already trained on.
+
+    :return: Tuple (new, old) of image paths, and the manifest of the current train split.
+    """
+    current = training_manifest(split_images(data_yaml_path, 'train'))
+    new = [path for path, stat in current.items() if manifest.get(path) != stat]
+    old = [path for path, stat in current.items() if manifest.get(path) == stat]
+    return new, old, current
+
+def incremental_finetune(existing_model_path, data_yaml_path, epochs=10, imgsz=640, batch=16, replay_ratio=1.0,
+                         lr0=0.001, seed=0, manifest=None, name="text_verification_model_incremental"):
+    """
+    Fine-tune an existing model on the images added since it was trained, plus a replay sample
+    of the images it was trained on so it does not forget them.
+
+    The images the model was trained on are read from the dataset manifest next to its weights
+    (see training_manifest.training_manifest_path). The fine-tune starts from the existing
+    weights as a new run, validates on the full val split of data_yaml_path, and writes the
+    manifest of the current train split next to the new weights for the next refresh.
+
+    :param existing_model_path: Path to the existing trained model (.pt file).
+    :param data_yaml_path: Path to the data.yaml of the full dataset.
+    :param epochs: Number of fine-tuning epochs.
+    :param imgsz: Image size.
+    :param batch: Batch size.
+    :param replay_ratio: Old images replayed per new image.
+    :param lr0: Initial learning rate, lower than for training from scratch.
+    :param seed: Seed for drawing the replay sample.
+    :param manifest: Dataset manifest of the existing model (default: next to its weights).
+    :param name: Name for the training run.
+    :return: Path of the fine-tuned weights, or None if there were no new images.
+    """
+    manifest = manifest or training_manifest_path(existing_model_path)
+    if not os.path.exists(manifest):
+        raise FileNotFoundError(f"No dataset manifest at {manifest}; record the data the model was trained on with --init_manifest")
+    new, old, current = find_new_images(data_yaml_path, load_training_manifest(manifest))
+    if not new:
+        print("No new images since the model was trained.")
+        return None
+    replay = random.Random(seed).sample(old, min(len(old), round(len(new) * replay_ratio)))
+    print(f"Fine-tuning on {len(new)} new and {len(replay)} replayed images.")
+
+    with open(data_yaml_path, 'r') as f:
+        config = yaml.safe_load(f)
+    work_dir = tempfile.mkdtemp(prefix="incremental_")
+    train_list = os.path.join(work_dir, 'train.txt')
+    with open(train_list, 'w') as f:
+        f.writelines(path + '\n' for path in new + replay)
+    config['train'] = train_list
+    # The other splits stay with the dataset, so make them absolute before moving data.yaml
+    for split in ('val', 'test'):
+        if config.get(split):
+            config[split] = split_source(data_yaml_path, split)
+    config.pop('path', None)
+    data = os.path.join(work_dir, 'data.yaml')
+    with open(data, 'w') as f:
+        yaml.safe_dump(config, f)
+
+    model = YOLO(existing_model_path)
+    try:
+        model.train(
+            data=data,
+            epochs=epochs,
+            imgsz=imgsz,
+            batch=batch,
+            name=name,
+            lr0=lr0,
+            warmup_epochs=0,  # The weights are already trained
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    save_dir = str(model.trainer.save_dir)
+    best = os.path.join(save_dir, 'weights', 'best.pt')
+
+    # Score the result on the full val split, not just data similar to the new images
+    metrics = YOLO(best).val(data=data_yaml_path, split='val', imgsz=imgsz, batch=batch)
+    print(f"Full val split: mAP50 {metrics.box.map50:.4f}, mAP50-95 {metrics.box.map:.4f}")
+
+    save_training_manifest(current, training_manifest_path(best))
+    print(f"Fine-tuned weights saved to {best}")
+    return best
+ 
 if __name__ == "__main__":
     import argparse
  
     parser = argparse.ArgumentParser(description="Continue training YOLOv8 model with additional data.")
     parser.add_argument("--model", type=str, required=True, help="Path to the existing YOLOv8 model (.pt file).")
     parser.add_argument("--data", type=str, required=True, help="Path to data.yaml file.")
-    parser.add_argument("--epochs", type=int, default=50, help="Number of additional epochs.")
+    parser.add_argument("--epochs", type=int, default=None, help="Number of additional epochs (default: 50, or 10 with --incremental).")
     parser.add_argument("--imgsz", type=int, default=640, help="Image size.")
     parser.add_argument("--batch", type=int, default=16, help="Batch size.")
-    parser.add_argument("--name", type=str, default="text_verification_model_finetuned", help="Name for the training run.")
+    parser.add_argument("--name", type=str, default=None, help="Name for the training run.")
+    parser.add_argument("--incremental", action='store_true', help="Fine-tune only on images added since the model was trained, plus a replay sample.")
+    parser.add_argument("--replay_ratio", type=float, default=1.0, help="Old images replayed per new image in incremental mode (default: 1.0).")
+    parser.add_argument("--lr0", type=float, default=0.001, help="Initial learning rate in incremental mode (default: 0.001).")
+    parser.add_argument("--manifest", type=str, default=None, help="Dataset manifest of the model (default: next to its weights).")
+    parser.add_argument("--init_manifest", action='store_true', help="Record the current train split as the data the model was trained on, then exit.")
  
     args = parser.parse_args()
  
-    continue_training(
-        existing_model_path=args.model,
-        data_yaml_path=args.data,
-        epochs=args.epochs,
-        imgsz=args.imgsz,
-        batch=args.batch,
-        name=args.name
-    )
+    if args.init_manifest:
+        path = args.manifest or training_manifest_path(args.model)
+        save_training_manifest(training_manifest(split_images(args.data, 'train')), path)
+        print(f"Dataset manifest written to {path}")
+    elif args.incremental:
+        incremental_finetune(
+            existing_model_path=args.model,
+            data_yaml_path=args.data,
+            epochs=args.epochs or 10,
+            imgsz=args.imgsz,
+            batch=args.batch,
+            replay_ratio=args.replay_ratio,
+            lr0=args.lr0,
+            manifest=args.manifest,
+            name=args.name or "text_verification_model_incremental"
+        )
+    else:
+        continue_training(
+            existing_model_path=args.model,
+            data_yaml_path=args.data,
+            epochs=args.epochs or 50,
+            imgsz=args.imgsz,
+            batch=args.batch,
+            name=args.name or "text_verification_model_finetuned"
+        )
  
  
@@ -2,18 +2,30 @@
  
 import os
  
-def count_files(dir_path, extension):
-    return len([f for f in os.listdir(dir_path) if f.lower().endswith(extension)])
+from dataset_index import DatasetIndex
+ 
+def count_files(dir_path, extension, index=None):
+    """
+    Count the files in a directory with the given extension(s), using the cached dataset index.
+
+    :param dir_path: Directory to count files in.
+    :param extension: Extension or tuple of extensions (case-insensitive).
+    :param index: DatasetIndex to query (a new one is opened if None).
+    """
+    index = index or DatasetIndex()
+    return index.count(dir_path, extension)
  
 if __name__ == "__main__":
     train_images = os.path.abspath("../dataset/images/train/images")
     train_labels = os.path.abspath("../dataset/images/train/labels")
     val_images = os.path.abspath("../dataset/images/val/images")
     val_labels = os.path.abspath("../dataset/images/val/labels")
+    index = DatasetIndex()
    
-    print(f"Training images: {count_files(train_images, '.jpg') + count_files(train_images, '.png')}")
-    print(f"Training labels: {count_files(train_labels, '.txt')}")
-    print(f"Validation images: {count_files(val_images, '.jpg') + count_files(val_images, '.png')}")
-    print(f"Validation labels: {count_files(val_labels, '.txt')}")
+    print(f"Training images: {count_files(train_images, ('.jpg', '.png'), index)}")
+    print(f"Training labels: {count_files(train_labels, '.txt', index)}")
+    print(f"Validation images: {count_files(val_images, ('.jpg', '.png'), index)}")
+    print(f"Validation labels: {count_files(val_labels, '.txt', index)}")
+    index.save()
  
  
\ No newline at end of file
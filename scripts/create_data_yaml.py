@@ -2,25 +2,48 @@
  
 import os
  
-def create_data_yaml(output_dir, yaml_path="../dataset/data.yaml"):
+def create_data_yaml(output_dir, yaml_path="../dataset/data.yaml", split_lists=False, shards_dir=None, scratch_dir=None):
     """
     Create data.yaml configuration file for YOLOv8.
+
+    :param output_dir: Directory holding the dataset splits.
+    :param yaml_path: Path of the data.yaml file to write.
+    :param split_lists: Point train/val at the train.txt/val.txt path lists written by
+                        split_dataset(mode='list') instead of the split image directories.
+    :param shards_dir: Shard directory written by dataset_shards.export_shards. The ultralytics
+                       dataloader only reads image files, so the shards are streamed into
+                       scratch_dir and train/val point at the unpacked copies; the shards are
+                       read sequentially once, and training reads the local copies.
+    :param scratch_dir: Local directory to unpack the shards into; required with shards_dir.
     """
-    # Ensure the train/val/images subfolders exist
-    train_images_dir = os.path.join(output_dir, 'train', 'images')
-    val_images_dir = os.path.join(output_dir, 'val', 'images')
+    shards_line = ""
+    if shards_dir:
+        from dataset_shards import unpack_shards
+
+        if not scratch_dir:
+            raise ValueError("scratch_dir is required with shards_dir: a local directory to unpack the shards into")
+        train_images = unpack_shards(shards_dir, 'train', scratch_dir)
+        val_images = unpack_shards(shards_dir, 'val', scratch_dir)
+        shards_line = f"shards: {os.path.abspath(shards_dir)}\n"
+    elif split_lists:
+        train_images = os.path.abspath(os.path.join(output_dir, 'train.txt'))
+        val_images = os.path.abspath(os.path.join(output_dir, 'val.txt'))
+    else:
+        # Ensure the train/val/images subfolders exist
+        train_images_dir = os.path.join(output_dir, 'train', 'images')
+        val_images_dir = os.path.join(output_dir, 'val', 'images')
    
-    os.makedirs(train_images_dir, exist_ok=True)
-    os.makedirs(val_images_dir, exist_ok=True)
+        os.makedirs(train_images_dir, exist_ok=True)
+        os.makedirs(val_images_dir, exist_ok=True)
  
-    # Convert to absolute paths
-    train_images = os.path.abspath(train_images_dir)
-    val_images = os.path.abspath(val_images_dir)
+        # Convert to absolute paths
+        train_images = os.path.abspath(train_images_dir)
+        val_images = os.path.abspath(val_images_dir)
  
     data_yaml_content = f"""
 train: {train_images}
 val: {val_images}
- 
+{shards_line} 
 nc: 4
 names: ['Billing_Enabled', 'Service_NotEnabled', 'Billing_NotEnabled', 'Service_Enabled']
 """
@@ -0,0 +1,102 @@
+# scripts/dataset_index.py
+
+import json
+import os
+import time
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+LABEL_EXTENSIONS = ('.txt',)
+INDEX_VERSION = 1
+
+# A directory modified this close to its last scan may have changed within the same mtime tick,
+# so its cached listing is not trusted
+_RACY_WINDOW_NS = 2 * 10**9
+
+class DatasetIndex:
+    """
+    Cached listing of the dataset directories, shared by the preparation scripts.
+
+    Each directory is listed once with os.scandir and the size and mtime of every file are kept
+    in a JSON index file. A directory is only listed again when its own mtime changes (files
+    added, removed or renamed), or on request with verify=True to pick up files edited in place.
+    """
+
+    def __init__(self, index_path=None):
+        """
+        :param index_path: Path of the index file (default: ../dataset/.dataset_index.json).
+        """
+        self.index_path = os.path.abspath(index_path or "../dataset/.dataset_index.json")
+        self.dirs = {}
+        self.dirty = False
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.dirs = data["dirs"]
+
+    def files(self, dir_path, extensions=None, verify=False):
+        """
+        Return the files of a directory as {name: [size, mtime_ns]}.
+
+        :param dir_path: Directory to list.
+        :param extensions: Only return names ending with one of these (case-insensitive).
+        :param verify: Re-stat every file even if the directory itself is unchanged.
+        """
+        dir_path = os.path.abspath(dir_path)
+        dir_mtime = os.stat(dir_path).st_mtime_ns
+        cached = self.dirs.get(dir_path)
+        if (verify or cached is None or cached["mtime_ns"] != dir_mtime
+                or cached["scanned_ns"] - dir_mtime < _RACY_WINDOW_NS):
+            cached = self._scan(dir_path, dir_mtime)
+
+        entries = cached["files"]
+        if extensions is None:
+            return dict(entries)
+        return {name: stat for name, stat in entries.items() if name.lower().endswith(extensions)}
+
+    def count(self, dir_path, extensions):
+        """
+        Count the files of a directory with one of the given extensions.
+        """
+        return len(self.files(dir_path, extensions))
+
+    def pair(self, images_dir, labels_dir):
+        """
+        Match images with their label files.
+
+        :return: Tuple (labeled, unlabeled) of sorted image file names.
+        """
+        images = self.files(images_dir, IMAGE_EXTENSIONS)
+        labels = self.files(labels_dir, LABEL_EXTENSIONS)
+        labeled, unlabeled = [], []
+        for img_file in sorted(images):
+            if os.path.splitext(img_file)[0] + '.txt' in labels:
+                labeled.append(img_file)
+            else:
+                unlabeled.append(img_file)
+        return labeled, unlabeled
+
+    def save(self):
+        """
+        Write the index back to disk if anything was rescanned.
+        """
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": INDEX_VERSION, "dirs": self.dirs}, f)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+    def _scan(self, dir_path, dir_mtime):
+        entries = {}
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries[entry.name] = [stat.st_size, stat.st_mtime_ns]
+        cached = {"mtime_ns": dir_mtime, "scanned_ns": time.time_ns(), "files": entries}
+        self.dirs[dir_path] = cached
+        self.dirty = True
+        return cached
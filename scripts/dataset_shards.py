@@ -0,0 +1,202 @@
+# scripts/dataset_shards.py
+
+import io
+import json
+import os
+import tarfile
+
+from export_model import split_images
+from split_dataset import label_path_for
+
+SHARDS_VERSION = 2
+MANIFEST_NAME = "shards.json"
+INDEX_MEMBER = "__index__.json"
+
+def _add_member(tar, name, data):
+    # Returns the offset of the member data within the shard
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    tar.addfile(info, io.BytesIO(data))
+    # The member data follows its header and is padded to whole blocks
+    padded = -(-len(data) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+    return tar.offset - padded
+
+def _write_shard(path, records):
+    """
+    Write one shard: for every (image path, label path, member name) record an image member and a
+    label member, followed by an index member listing the data offset and size of each, so a
+    shard can be streamed front to back or read at random from its index.
+
+    Shards are written in PAX format, which has no limit on the length of member names.
+    """
+    index = []
+    with open(path + ".tmp", 'wb') as f:
+        with tarfile.open(fileobj=f, mode='w', format=tarfile.PAX_FORMAT) as tar:
+            for image_path, label_path, name in records:
+                with open(image_path, 'rb') as image_file:
+                    image = image_file.read()
+                entry = {"image": name, "image_offset": _add_member(tar, name, image), "image_size": len(image)}
+                if os.path.exists(label_path):
+                    with open(label_path, 'rb') as label_file:
+                        label = label_file.read()
+                    label_name = os.path.splitext(name)[0] + '.txt'
+                    entry.update({"label_offset": _add_member(tar, label_name, label), "label_size": len(label)})
+                index.append(entry)
+            data = json.dumps(index).encode()
+            index_offset = _add_member(tar, INDEX_MEMBER, data)
+    os.replace(path + ".tmp", path)
+    return {"path": os.path.basename(path), "images": len(index), "bytes": os.path.getsize(path),
+            "index_offset": index_offset, "index_size": len(data)}
+
+def export_shards(data, output_dir, splits=('train', 'val'), shard_size_mb=256):
+    """
+    Pack the images and labels of the splits of a data.yaml into large sequential shards.
+
+    Each split becomes output_dir/{split}-00000.tar, {split}-00001.tar, ... of about
+    shard_size_mb each, in plain tar format. Members are named by their path relative to the
+    common directory of the split's images, so images with the same file name in different
+    directories stay apart. A shards.json manifest listing the shards is written last, so an
+    interrupted export is never mistaken for a complete one.
+
+    :param data: data.yaml whose splits point at image directories or path lists.
+    :param output_dir: Directory to write the shards to.
+    :param splits: Splits to export.
+    :param shard_size_mb: Target shard size in megabytes.
+    :return: The manifest.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    manifest = {"version": SHARDS_VERSION, "splits": {}}
+    limit = shard_size_mb * 1024 * 1024
+    for split in splits:
+        shards, records, size = [], [], 0
+        image_paths = [os.path.abspath(path) for path in split_images(data, split)]
+        root = os.path.commonpath([os.path.dirname(path) for path in image_paths]) if image_paths else ""
+        for image_path in image_paths:
+            name = os.path.relpath(image_path, root).replace(os.sep, '/')
+            records.append((image_path, label_path_for(image_path), name))
+            size += os.path.getsize(image_path)
+            if size >= limit:
+                shards.append(_write_shard(os.path.join(output_dir, f"{split}-{len(shards):05d}.tar"), records))
+                records, size = [], 0
+        if records or not shards:
+            shards.append(_write_shard(os.path.join(output_dir, f"{split}-{len(shards):05d}.tar"), records))
+        manifest["splits"][split] = {"images": sum(shard["images"] for shard in shards), "shards": shards}
+        print(f"Exported {manifest['splits'][split]['images']} {split} images into {len(shards)} shards.")
+
+    with open(manifest_path + ".tmp", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+def load_manifest(shard_dir):
+    """
+    Read the shards.json manifest of a shard directory.
+    """
+    with open(os.path.join(shard_dir, MANIFEST_NAME), 'r') as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SHARDS_VERSION:
+        raise ValueError(f"Unsupported shard format version in {shard_dir}: {manifest.get('version')}")
+    return manifest
+
+def read_shard_index(shard_dir, shard):
+    """
+    Read the index of a shard with a single seek, given its entry in the manifest.
+    """
+    with open(os.path.join(shard_dir, shard["path"]), 'rb') as f:
+        f.seek(shard["index_offset"])
+        return json.loads(f.read(shard["index_size"]))
+
+def iter_shard(path):
+    """
+    Stream the records of one shard front to back, yielding (image_name, image_bytes, label_bytes).
+
+    image_name is the image path relative to the common directory of the split's images, with /
+    separators; label_bytes is None for images without a label file.
+    """
+    pending = None
+    with tarfile.open(path, mode='r|') as tar:
+        for member in tar:
+            if member.name == INDEX_MEMBER:
+                break
+            data = tar.extractfile(member).read()
+            if pending is not None and member.name == os.path.splitext(pending[0])[0] + '.txt':
+                yield pending[0], pending[1], data
+                pending = None
+                continue
+            if pending is not None:
+                yield pending[0], pending[1], None
+            pending = (member.name, data)
+    if pending is not None:
+        yield pending[0], pending[1], None
+
+def _is_current(path, data):
+    if not os.path.exists(path) or os.path.getsize(path) != len(data):
+        return False
+    with open(path, 'rb') as f:
+        return f.read() == data
+
+def unpack_shards(shard_dir, split, scratch_dir):
+    """
+    Stream the shards of a split front to back into scratch_dir/{split}/images and labels for training.
+
+    Files already unpacked with the same content are left alone, so unpacking again after an
+    interruption or a re-export only writes what is missing or changed (e.g. a relabeled box).
+    Files not in the shards are removed.
+
+    :return: The unpacked image directory.
+    """
+    images_dir = os.path.join(scratch_dir, split, 'images')
+    labels_dir = os.path.join(scratch_dir, split, 'labels')
+    os.makedirs(images_dir, exist_ok=True)
+    os.makedirs(labels_dir, exist_ok=True)
+
+    wanted, written = set(), 0
+    for shard in load_manifest(shard_dir)["splits"][split]["shards"]:
+        for name, image, label in iter_shard(os.path.join(shard_dir, shard["path"])):
+            relative = os.path.normpath(name)
+            if os.path.isabs(relative) or relative.split(os.sep)[0] == os.pardir:
+                raise ValueError(f"Unsafe member name in shard {shard['path']}: {name}")
+            image_path = os.path.join(images_dir, relative)
+            files = [(image_path, image)]
+            if label is not None:
+                # Where the dataloader looks for the label of the unpacked image
+                files.append((label_path_for(image_path), label))
+            for path, data in files:
+                wanted.add(path)
+                if _is_current(path, data):
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                written += 1
+
+    removed = 0
+    for directory in (images_dir, labels_dir):
+        for dir_path, _, file_names in os.walk(directory):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                if path not in wanted:
+                    os.remove(path)
+                    removed += 1
+    print(f"Unpacked {split} shards into {images_dir} ({written} files written, {removed} stale files removed).")
+    return os.path.abspath(images_dir)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pack dataset splits into large sequential shards, or unpack them for training.")
+    parser.add_argument("--data", type=str, default="../dataset/data.yaml", help="data.yaml of the splits to export.")
+    parser.add_argument("--output_dir", type=str, default="../dataset/shards", help="Shard directory (default: ../dataset/shards).")
+    parser.add_argument("--shard_size_mb", type=int, default=256, help="Target shard size in MB (default: 256).")
+    parser.add_argument("--unpack", type=str, default=None, help="Unpack the shards of --output_dir into this scratch directory instead of exporting.")
+    args = parser.parse_args()
+
+    if args.unpack:
+        for split in load_manifest(args.output_dir)["splits"]:
+            unpack_shards(args.output_dir, split, args.unpack)
+    else:
+        export_shards(args.data, args.output_dir, shard_size_mb=args.shard_size_mb)
@@ -0,0 +1,202 @@
+# scripts/export_model.py
+
+import glob
+import os
+import random
+
+import cv2
+import numpy as np
+import yaml
+from ultralytics import YOLO
+
+from dataset_index import IMAGE_EXTENSIONS
+
+BACKENDS = ('pytorch', 'onnx', 'openvino')
+
+def exported_path(model_path, backend, int8=False):
+    """
+    Path export_model() writes the model to, e.g. best.pt -> best_int8.onnx or best_openvino_model/.
+    """
+    stem = os.path.splitext(model_path)[0]
+    suffix = "_int8" if int8 else ""
+    if backend == 'onnx':
+        return f"{stem}{suffix}.onnx"
+    if backend == 'openvino':
+        return f"{stem}{suffix}_openvino_model"
+    raise ValueError(f"Unknown export backend: {backend}")
+
+def split_source(data, split='val'):
+    """
+    Absolute image directory or path list of one split of a data.yaml.
+
+    Relative entries are relative to the dataset root: the path key of the data.yaml, itself
+    relative to the directory of the data.yaml, which is also the root when path is not set.
+    """
+    with open(data, 'r') as f:
+        config = yaml.safe_load(f)
+    root = os.path.join(os.path.dirname(os.path.abspath(data)), config.get('path') or '')
+    return os.path.abspath(os.path.join(root, config[split]))
+
+def source_images(source):
+    """
+    Image paths of an image directory, or of a text file listing one image path per line;
+    relative lines are relative to the directory of the list.
+    """
+    if source.endswith('.txt'):
+        list_dir = os.path.dirname(os.path.abspath(source))
+        with open(source, 'r') as f:
+            return [os.path.abspath(os.path.join(list_dir, line.strip())) for line in f if line.strip()]
+    return sorted(path for path in glob.glob(os.path.join(source, '*')) if path.lower().endswith(IMAGE_EXTENSIONS))
+
+def split_images(data, split='val'):
+    """
+    Image paths of one split of a data.yaml, which may point at an image directory or a path list.
+    """
+    return source_images(split_source(data, split))
+
+def letterbox(image, imgsz=640):
+    """
+    Resize an image to fit imgsz x imgsz keeping its aspect ratio and pad it with grey, as the
+    ultralytics predictor does, returning a 1x3xHxW float32 RGB tensor in [0, 1].
+    """
+    height, width = image.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_w, new_h = round(width * scale), round(height * scale)
+    padded = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - new_h) // 2, (imgsz - new_w) // 2
+    padded[top:top + new_h, left:left + new_w] = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return np.ascontiguousarray(padded[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255
+
+class _CalibrationReader:
+    """
+    onnxruntime CalibrationDataReader feeding letterboxed val images one at a time.
+    """
+
+    def __init__(self, input_name, paths, imgsz):
+        self.input_name = input_name
+        self.paths = iter(paths)
+        self.imgsz = imgsz
+
+    def get_next(self):
+        for path in self.paths:
+            image = cv2.imread(path)
+            if image is not None:
+                return {self.input_name: letterbox(image, self.imgsz)}
+        return None
+
+def _quantize_onnx(fp32_path, int8_path, data, imgsz, calibration_images, seed=0):
+    """
+    Static INT8 quantization of an ONNX model with onnxruntime, calibrated on val images.
+
+    Only convolutions and matrix multiplications are quantized; the box decoding at the end of the
+    detection head stays in FP32, where INT8 rounding costs the most accuracy for little speed.
+    """
+    import onnx
+    import onnxruntime
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+
+    paths = split_images(data, 'val')
+    if not paths:
+        raise ValueError(f"No val images found in {data} for INT8 calibration")
+    random.Random(seed).shuffle(paths)
+
+    input_name = onnxruntime.InferenceSession(fp32_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    quantize_static(
+        fp32_path,
+        int8_path,
+        _CalibrationReader(input_name, paths[:calibration_images], imgsz),
+        quant_format=QuantFormat.QDQ,
+        op_types_to_quantize=['Conv', 'MatMul'],
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+
+    # Carry over the class names, stride and image size ultralytics stores in the model metadata
+    fp32_model, int8_model = onnx.load(fp32_path), onnx.load(int8_path)
+    del int8_model.metadata_props[:]
+    int8_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(int8_model, int8_path)
+    return int8_path
+
+def export_model(model_path, backend, int8=False, data=None, imgsz=640, calibration_images=300):
+    """
+    Export a trained .pt model to a CPU inference runtime.
+
+    :param model_path: Path to the trained model, e.g. runs/detect/train/weights/best.pt.
+    :param backend: 'onnx' (ONNX Runtime) or 'openvino'.
+    :param int8: Apply post-training INT8 quantization calibrated on the val split of data.
+    :param data: data.yaml whose val split is used for calibration (required with int8).
+    :param imgsz: Input image size of the exported model.
+    :param calibration_images: Maximum number of val images used for calibration.
+    :return: Path of the exported model, see exported_path().
+    """
+    if int8 and not data:
+        raise ValueError("INT8 export needs a data.yaml to calibrate on")
+    model = YOLO(model_path)
+
+    if backend == 'openvino':
+        # Exported with a dynamic batch so the verify scripts can run any --batch_size
+        path = model.export(format='openvino', imgsz=imgsz, dynamic=True, int8=int8, data=data)
+    elif backend == 'onnx':
+        path = model.export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+        if int8:
+            path = _quantize_onnx(path, exported_path(model_path, 'onnx', int8=True), data, imgsz, calibration_images)
+    else:
+        raise ValueError(f"Unknown export backend: {backend}")
+
+    print(f"Exported {model_path} to {path}")
+    return str(path)
+
+def load_model(model_path, backend='pytorch', int8=False, data=None, imgsz=640):
+    """
+    Load a model for inference with the chosen backend.
+
+    A .pt model is exported on first use and re-exported whenever the .pt file is newer than the
+    export; an already exported .onnx file or OpenVINO directory is loaded as is.
+    """
+    if backend == 'pytorch':
+        return YOLO(model_path)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+
+    if model_path.endswith('.pt'):
+        path = exported_path(model_path, backend, int8)
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(model_path):
+            path = export_model(model_path, backend, int8=int8, data=data, imgsz=imgsz)
+        model_path = path
+    return YOLO(model_path, task='detect')
+
+def compare_accuracy(reference_path, model_paths, data, imgsz=640):
+    """
+    Validate several models on the val split and compare them with a reference model.
+
+    :return: Dictionary per model path with mAP50, mAP50-95 and the mAP50-95 difference to the reference.
+    """
+    results = {}
+    for path in [reference_path] + list(model_paths):
+        metrics = YOLO(path, task='detect').val(data=data, split='val', imgsz=imgsz, batch=1, device='cpu', plots=False, verbose=False)
+        results[path] = {"mAP50": float(metrics.box.map50), "mAP50-95": float(metrics.box.map)}
+    reference = results[reference_path]["mAP50-95"]
+    for result in results.values():
+        result["delta_mAP50-95"] = result["mAP50-95"] - reference
+    return results
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a trained model to ONNX Runtime or OpenVINO for CPU inference.")
+    parser.add_argument("--model", type=str, default="runs/detect/train/weights/best.pt", help="Path to the trained .pt model.")
+    parser.add_argument("--backend", type=str, choices=['onnx', 'openvino'], default='openvino', help="Runtime to export to (default: openvino).")
+    parser.add_argument("--int8", action='store_true', help="Apply INT8 post-training quantization calibrated on the val split.")
+    parser.add_argument("--data", type=str, default="../dataset/data.yaml", help="data.yaml used for calibration and validation.")
+    parser.add_argument("--imgsz", type=int, default=640, help="Input image size (default: 640).")
+    parser.add_argument("--calibration_images", type=int, default=300, help="Maximum val images used for INT8 calibration (default: 300).")
+    parser.add_argument("--compare", action='store_true', help="Report the mAP difference of the exported model against the FP32 .pt model on the val split.")
+    args = parser.parse_args()
+
+    path = export_model(args.model, args.backend, int8=args.int8, data=args.data, imgsz=args.imgsz, calibration_images=args.calibration_images)
+
+    if args.compare:
+        for model_path, result in compare_accuracy(args.model, [path], args.data, imgsz=args.imgsz).items():
+            print(f"{model_path}: mAP50 {result['mAP50']:.4f}, mAP50-95 {result['mAP50-95']:.4f} ({result['delta_mAP50-95']:+.4f})")
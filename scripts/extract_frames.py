@@ -1,81 +1,298 @@
 # scripts/extract_frames.py
- 
-import cv2
 
+import cv2
+import hashlib
+import json
 import os
- 
-def extract_frames_from_videos(videos_dir, output_dir, frame_rate=1):
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
+from video_utils import FramePool, frame_signature, signature_difference
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+MANIFEST_NAME = "extraction_manifest.json"
+ 
+def load_manifest(manifest_path):
     """
+    Load the extraction manifest, returning an empty manifest if it does not exist yet.
 
-    Extract frames from all videos in the specified directory.
+    The manifest maps each video file name to its size, mtime, optional SHA-1, the frame_rate
+    used, the number of frames produced and whether extraction completed.
+    """
+    if not os.path.exists(manifest_path):
+        return {"videos": {}}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
  
-    :param videos_dir: Directory containing video files.
+def save_manifest(manifest, manifest_path):
+    """
+    Write the manifest atomically so a crash never leaves a truncated file behind.
+    """
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+ 
+def _file_sha1(path, chunk_size=1 << 20):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+ 
+def _existing_frames(output_dir):
+    """
+    Map each video stem to the set of frame indices already present in output_dir.
+    """
+    pattern = re.compile(r"^(.*)_frame_(\d+)\.jpg$")
+    frames = {}
+    for name in os.listdir(output_dir):
+        match = pattern.match(name)
+        if match:
+            frames.setdefault(match.group(1), set()).add(int(match.group(2)))
+    return frames
+ 
+def _remove_frames(output_dir, stem, indices):
+    for index in indices:
+        path = os.path.join(output_dir, f"{stem}_frame_{index}.jpg")
+        if os.path.exists(path):
+            os.remove(path)
+ 
+def extract_frames_from_video(video_path, output_dir, frame_rate=1, encode_threads=2, start_frame=0, dedup_threshold=None):
+    """
+    Extract frames from a single video.
 
-    :param output_dir: Directory to save extracted frames.
+    Only the frames that are kept are decoded into images; the frames in between are skipped
+    with cap.grab(). JPEG encoding runs on a small thread pool so it overlaps with decoding, and
+    frames are decoded into a small pool of reused buffers that are handed back once written.
+    With dedup_threshold set, a candidate frame is dropped when its downscaled signature differs
+    from the last kept frame by less than the threshold.
 
+    :param video_path: Path to the video file.
+    :param output_dir: Directory to save extracted frames.
     :param frame_rate: Number of frames to extract per second.
-
+    :param encode_threads: Number of background threads encoding and writing images.
+    :param start_frame: Index of the first output frame to produce, used to resume a partial extraction.
+                        Must be 0 when dedup_threshold is set.
+    :param dedup_threshold: Mean absolute difference (0-255) below which a frame counts as a
+                            near-duplicate of the last kept frame (default: keep every frame).
+    :return: Dictionary with the video name, total frames, frames extracted by this call,
+             near-duplicates dropped, elapsed seconds and worker pid, or None if the video
+             could not be opened.
     """
+    video_file = os.path.basename(video_path)
+    start_time = time.time()
 
-    if not os.path.exists(output_dir):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Error: Could not open video {video_file}. Skipping.")
+        return None
 
-        os.makedirs(output_dir)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    interval = max(int(fps / frame_rate), 1)  # Ensure interval is at least 1
+    stem = os.path.splitext(video_file)[0]
 
-        print(f"Created directory: {output_dir}")
- 
-    video_files = [f for f in os.listdir(videos_dir) if f.lower().endswith(('.mp4', '.avi', '.mov', '.mkv'))]
- 
-    for video_file in video_files:
-
-        video_path = os.path.join(videos_dir, video_file)
+    count = start_frame * interval
+    frame_count = start_frame
+    dropped = 0
+    last_signature = None
+    # Bound the number of frames waiting to be encoded so memory stays flat on long videos
+    pending = deque()
+    max_pending = max(encode_threads, 1) * 4
+    height, width = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    pool = FramePool((height, width, 3), max_pending + 1)
 
-        cap = cv2.VideoCapture(video_path)
+    with ThreadPoolExecutor(max_workers=max(encode_threads, 1)) as encoder:
+        try:
+            # Skip the frames that were already extracted by a previous run
+            for _ in range(count):
+                if not cap.grab():
+                    break
+            while True:
+                if count % interval == 0:
+                    buffer = pool.acquire()
+                    ret, frame = cap.read(buffer)
+                    if not ret:
+                        pool.release([buffer])
+                        break
+                    if dedup_threshold is not None:
+                        signature = frame_signature(frame)
+                        if last_signature is not None and signature_difference(signature, last_signature) < dedup_threshold:
+                            pool.release([buffer])
+                            dropped += 1
+                            count += 1
+                            continue
+                        last_signature = signature
+                    frame_filename = os.path.join(output_dir, f"{stem}_frame_{frame_count}.jpg")
+                    future = encoder.submit(cv2.imwrite, frame_filename, frame)
+                    # Hand the buffer back once written (a frame of unexpected size was not decoded into it)
+                    future.add_done_callback(lambda _, buffer=buffer: pool.release([buffer]))
+                    pending.append(future)
+                    frame_count += 1
+                    if len(pending) >= max_pending:
+                        pending.popleft().result()
+                elif not cap.grab():
+                    break
+                count += 1
+        finally:
+            cap.release()
+            # Surface any encoding errors before reporting the video as done
+            while pending:
+                pending.popleft().result()
 
-        if not cap.isOpened():
+    return {
+        "video": video_file,
+        "frames": frame_count,
+        "extracted": frame_count - start_frame,
+        "dropped": dropped,
+        "elapsed": time.time() - start_time,
+        "worker": os.getpid(),
+    }
+ 
+def extract_frames_from_videos(videos_dir, output_dir, frame_rate=1, workers=None, encode_threads=2, incremental=True, hash_videos=False, dedup_threshold=None):
+    """
+    Extract frames from all videos in the specified directory.
 
-            print(f"Error: Could not open video {video_file}. Skipping.")
+    Videos are distributed over a pool of worker processes, one video per task. Progress is
+    recorded in a manifest in output_dir: with incremental=True, videos whose size, mtime and
+    frame_rate match a completed entry are skipped, videos left unfinished by an interrupted run
+    are resumed, and new or modified videos are extracted from scratch.
 
-            continue
- 
-        fps = cap.get(cv2.CAP_PROP_FPS)
+    :param videos_dir: Directory containing video files.
+    :param output_dir: Directory to save extracted frames.
+    :param frame_rate: Number of frames to extract per second.
+    :param workers: Number of worker processes (default: one per CPU core, at most one per video).
+    :param encode_threads: Number of image-encoding threads inside each worker.
+    :param incremental: Skip unchanged videos and resume partial ones using the manifest.
+    :param hash_videos: Also record a SHA-1 of each video, so a video whose mtime changed but whose
+                        content did not is still skipped.
+    :param dedup_threshold: Drop frames whose signature differs from the last kept frame of the
+                            same video by less than this mean absolute difference (0-255).
+                            Partially extracted videos are restarted rather than resumed when set,
+                            since kept frame indices no longer map to video positions.
+    :return: List of per-video statistics for the videos that were extracted.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        print(f"Created directory: {output_dir}")
 
-        interval = max(int(fps / frame_rate), 1)  # Ensure interval is at least 1
- 
-        count = 0
+    video_files = [f for f in os.listdir(videos_dir) if f.lower().endswith(VIDEO_EXTENSIONS)]
+    if not video_files:
+        print(f"No videos found in {videos_dir}.")
+        return []
 
-        frame_count = 0
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    existing = _existing_frames(output_dir)
 
-        while True:
+    # Decide per video whether to skip, resume or (re-)extract it
+    tasks = []
+    for video_file in video_files:
+        video_path = os.path.join(videos_dir, video_file)
+        stem = os.path.splitext(video_file)[0]
+        stat = os.stat(video_path)
+        entry = manifest["videos"].get(video_file)
+        source = {"size": stat.st_size, "mtime": stat.st_mtime, "frame_rate": frame_rate, "dedup_threshold": dedup_threshold}
 
-            ret, frame = cap.read()
+        unchanged = entry is not None and all(entry.get(key) == value for key, value in source.items())
+        if not unchanged and hash_videos and entry is not None and entry.get("sha1") \
+                and all(entry.get(key) == value for key, value in source.items() if key != "mtime"):
+            # Only the mtime changed; compare content in its place
+            unchanged = _file_sha1(video_path) == entry["sha1"]
 
-            if not ret:
+        frames_on_disk = existing.get(stem, set())
+        start_frame = 0
+        if incremental and unchanged and entry.get("complete"):
+            entry["mtime"] = stat.st_mtime
+            print(f"Skipping {video_file}: unchanged since last extraction ({entry['frames']} frames).")
+            continue
+        if incremental and unchanged and dedup_threshold is None:
+            # Resume after the last contiguous frame, rewriting it in case the crash truncated it
+            while start_frame in frames_on_disk:
+                start_frame += 1
+            start_frame = max(start_frame - 1, 0)
+            print(f"Resuming {video_file} from frame {start_frame}.")
+        else:
+            _remove_frames(output_dir, stem, frames_on_disk)
 
-                break
+        if hash_videos:
+            source["sha1"] = entry["sha1"] if unchanged and entry.get("sha1") else _file_sha1(video_path)
+        manifest["videos"][video_file] = dict(source, frames=start_frame, complete=False)
+        tasks.append((video_file, start_frame))
 
-            if count % interval == 0:
+    save_manifest(manifest, manifest_path)
+    if not tasks:
+        print("All videos are up to date.")
+        return []
 
-                frame_filename = os.path.join(output_dir, f"{os.path.splitext(video_file)[0]}_frame_{frame_count}.jpg")
+    if workers is None:
+        workers = min(len(tasks), os.cpu_count() or 1)
 
-                cv2.imwrite(frame_filename, frame)
+    results = []
+    with ProcessPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = {
+            pool.submit(extract_frames_from_video, os.path.join(videos_dir, video_file), output_dir, frame_rate, encode_threads, start_frame, dedup_threshold): video_file
+            for video_file, start_frame in tasks
+        }
+        for future in as_completed(futures):
+            video_file = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                # A broken video must not stop the rest of the batch
+                print(f"Error: Failed to extract frames from {video_file}: {e}")
+                continue
+            if stats is None:
+                continue
+            results.append(stats)
+            manifest["videos"][video_file].update(frames=stats["frames"], complete=True)
+            save_manifest(manifest, manifest_path)
+            rate = stats["extracted"] / stats["elapsed"] if stats["elapsed"] > 0 else 0.0
+            print(f"Extracted {stats['extracted']} frames from {video_file} ({rate:.1f} frames/s).")
+            if dedup_threshold is not None:
+                print(f"Dropped {stats['dropped']} near-duplicate frames from {video_file}.")
 
-                frame_count += 1
+    # Summarise throughput per worker process
+    per_worker = {}
+    for stats in results:
+        worker = per_worker.setdefault(stats["worker"], {"videos": 0, "frames": 0, "elapsed": 0.0})
+        worker["videos"] += 1
+        worker["frames"] += stats["extracted"]
+        worker["elapsed"] += stats["elapsed"]
+    for pid, worker in sorted(per_worker.items()):
+        rate = worker["frames"] / worker["elapsed"] if worker["elapsed"] > 0 else 0.0
+        print(f"Worker {pid}: {worker['videos']} videos, {worker['frames']} frames in {worker['elapsed']:.1f}s ({rate:.1f} frames/s).")
 
-            count += 1
- 
-        cap.release()
+    if dedup_threshold is not None:
+        dropped = sum(stats["dropped"] for stats in results)
+        kept = sum(stats["extracted"] for stats in results)
+        print(f"Near-duplicate filter dropped {dropped} of {dropped + kept} candidate frames.")
 
-        print(f"Extracted {frame_count} frames from {video_file}.")
+    return results
  
 if __name__ == "__main__":
+    import argparse
 
-    extract_frames_from_videos(
-
-        videos_dir=os.path.abspath("../dataset/videos"),
-
-        output_dir=os.path.abspath("../dataset/extracted_frames"),
-
-        frame_rate=1  # Extract 1 frame per second
+    parser = argparse.ArgumentParser(description="Extract frames from all videos in a directory.")
+    parser.add_argument("--videos_dir", type=str, default=os.path.abspath("../dataset/videos"), help="Directory containing video files.")
+    parser.add_argument("--output_dir", type=str, default=os.path.abspath("../dataset/extracted_frames"), help="Directory to save extracted frames.")
+    parser.add_argument("--frame_rate", type=float, default=1, help="Frames to extract per second (default: 1).")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: number of CPU cores).")
+    parser.add_argument("--encode_threads", type=int, default=2, help="Image-encoding threads per worker (default: 2).")
+    parser.add_argument("--full", action='store_true', help="Re-extract every video instead of only new or modified ones.")
+    parser.add_argument("--hash", action='store_true', help="Record and compare a SHA-1 of each video in the manifest.")
+    parser.add_argument("--dedup_threshold", type=float, default=None, help="Drop frames whose mean absolute difference to the last kept frame is below this value (0-255).")
+    args = parser.parse_args()
 
+    extract_frames_from_videos(
+        videos_dir=args.videos_dir,
+        output_dir=args.output_dir,
+        frame_rate=args.frame_rate,
+        workers=args.workers,
+        encode_threads=args.encode_threads,
+        incremental=not args.full,
+        hash_videos=args.hash,
+        dedup_threshold=args.dedup_threshold
     )
@@ -0,0 +1,208 @@
+# scripts/image_cache.py
+
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import yaml
+from ultralytics.data.dataset import YOLODataset
+from ultralytics.models.yolo.detect import DetectionTrainer
+
+from export_model import source_images, split_source
+
+CACHE_VERSION = 1
+
+class ImageCache:
+    """
+    Training images decoded once and resized for one imgsz, stored in a memory-mapped uint8 shard.
+
+    Slot i of images holds the i-th image resized so its long side is imgsz, exactly as the
+    ultralytics dataloader resizes it, in the top-left corner of an imgsz x imgsz slot;
+    shapes[i] holds the original and resized (height, width). The padding is never read, so
+    the label coordinates stay valid and augmentation works as without the cache.
+
+    Only the cache directory is pickled, so datasets holding a cache can be sent to dataloader
+    worker processes without copying the shard.
+    """
+
+    def __init__(self, cache_dir):
+        with open(os.path.join(cache_dir, "meta.json"), 'r') as f:
+            meta = json.load(f)
+        self.cache_dir = cache_dir
+        self.paths = meta["paths"]
+        self.imgsz = meta["imgsz"]
+        self.fingerprint = meta["fingerprint"]
+        self.slots = {os.path.abspath(path): i for i, path in enumerate(self.paths)}
+        self.images = np.load(os.path.join(cache_dir, "images.npy"), mmap_mode='r')
+        self.shapes = np.load(os.path.join(cache_dir, "shapes.npy"))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getstate__(self):
+        return {"cache_dir": self.cache_dir}
+
+    def __setstate__(self, state):
+        self.__init__(state["cache_dir"])
+
+    def load(self, path):
+        """
+        Return (image, (h0, w0), (h, w)) for an image path, or None if it is not in the cache.
+        """
+        slot = self.slots.get(os.path.abspath(path))
+        if slot is None:
+            return None
+        h0, w0, h, w = (int(v) for v in self.shapes[slot])
+        return np.array(self.images[slot, :h, :w]), (h0, w0), (h, w)
+
+def default_cache_dir(source):
+    """
+    Cache location next to an image directory or path list, e.g. train/images -> train/images.imgcache.
+    """
+    return os.path.abspath(source).rstrip(os.sep) + ".imgcache"
+
+def images_fingerprint(paths, imgsz):
+    """
+    Hash of the paths, sizes and mtimes of the images and the image size; changes whenever an
+    image is added, removed or modified, or imgsz changes.
+    """
+    digest = hashlib.sha1(f"imgsz={imgsz}\n".encode())
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+def _resize(image, imgsz):
+    # Same rounding and interpolation as ultralytics BaseDataset.load_image in rect mode
+    h0, w0 = image.shape[:2]
+    r = imgsz / max(h0, w0)
+    if r != 1:
+        w, h = min(math.ceil(w0 * r), imgsz), min(math.ceil(h0 * r), imgsz)
+        image = cv2.resize(image, (w, h), interpolation=cv2.INTER_LINEAR)
+    return image
+
+def build_image_cache(source, imgsz=640, cache_dir=None, workers=8):
+    """
+    Decode and resize every image of a directory or path list into an image cache.
+
+    :param source: Image directory or text file with one image path per line, as in data.yaml.
+    :param imgsz: Training image size.
+    :param cache_dir: Directory to write the cache to (default: default_cache_dir(source)).
+    :param workers: Number of decoding threads.
+    :return: The opened ImageCache.
+    """
+    cache_dir = cache_dir or default_cache_dir(source)
+    paths = source_images(source)
+    fingerprint = images_fingerprint(paths, imgsz)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Remove the metadata first so a crash mid-build leaves an incomplete cache that is rebuilt next time
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    images = np.lib.format.open_memmap(os.path.join(cache_dir, "images.npy"), mode='w+', dtype=np.uint8,
+                                       shape=(len(paths), imgsz, imgsz, 3))
+    shapes = np.zeros((len(paths), 4), dtype=np.int32)
+
+    def load(slot):
+        image = cv2.imread(paths[slot])
+        if image is None:
+            raise FileNotFoundError(f"Image Not Found {paths[slot]}")
+        resized = _resize(image, imgsz)
+        h, w = resized.shape[:2]
+        images[slot, :h, :w] = resized
+        shapes[slot] = (*image.shape[:2], h, w)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(load, range(len(paths))))
+    images.flush()
+
+    np.save(os.path.join(cache_dir, "shapes.npy"), shapes)
+    with open(meta_path + ".tmp", 'w') as f:
+        json.dump({"version": CACHE_VERSION, "fingerprint": fingerprint, "imgsz": imgsz, "paths": paths}, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+    print(f"Built image cache of {len(paths)} images at {imgsz}px in {cache_dir}")
+    return ImageCache(cache_dir)
+
+def open_image_cache(source, imgsz=640, cache_dir=None, workers=8):
+    """
+    Open the image cache of a directory or path list, rebuilding it if any image or imgsz changed.
+    """
+    cache_dir = cache_dir or default_cache_dir(source)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if (meta.get("version") == CACHE_VERSION and meta.get("imgsz") == imgsz
+                and meta.get("fingerprint") == images_fingerprint(source_images(source), imgsz)):
+            return ImageCache(cache_dir)
+    return build_image_cache(source, imgsz, cache_dir, workers)
+
+class CachedImageDataset(YOLODataset):
+    """
+    YOLODataset whose load_image reads from an attached ImageCache instead of decoding.
+
+    Images missing from the cache, and loads the cache cannot serve (non-rect or short-side
+    resizing, or another imgsz), fall back to the regular decode.
+    """
+
+    image_cache = None
+
+    def load_image(self, i, rect_mode=True, resize_short=False):
+        cache = self.image_cache
+        if cache is None or self.ims[i] is not None or not rect_mode or resize_short or cache.imgsz != self.imgsz:
+            return super().load_image(i, rect_mode, resize_short)
+        loaded = cache.load(self.im_files[i])
+        if loaded is None:
+            return super().load_image(i, rect_mode, resize_short)
+        im, hw0, hw = loaded
+
+        # Keep the mosaic buffer of recently loaded images, as the regular load does
+        if self.augment and self.cache != "ram":
+            self.ims[i], self.im_hw0[i], self.im_hw[i] = im, hw0, hw
+            self.buffer.append(i)
+            if 1 < len(self.buffer) >= self.max_buffer_length:
+                j = self.buffer.pop(0)
+                self.ims[j], self.im_hw0[j], self.im_hw[j] = None, None, None
+        return im, hw0, hw
+
+class CachedDetectionTrainer(DetectionTrainer):
+    """
+    DetectionTrainer whose train and val datasets read from image caches, opened (and rebuilt if
+    stale) next to the image directories or path lists in data.yaml.
+
+    Pass it to model.train(trainer=CachedDetectionTrainer).
+    """
+
+    def build_dataset(self, img_path, mode="train", batch=None):
+        dataset = super().build_dataset(img_path, mode, batch)
+        if isinstance(img_path, str) and type(dataset) is YOLODataset:
+            dataset.__class__ = CachedImageDataset
+            dataset.image_cache = open_image_cache(img_path, imgsz=self.args.imgsz)
+        return dataset
+
+def build_data_caches(data, imgsz=640, workers=8):
+    """
+    Build (or refresh) the image caches of the train and val splits of a data.yaml.
+    """
+    with open(data, 'r') as f:
+        config = yaml.safe_load(f)
+    return {split: open_image_cache(split_source(data, split), imgsz=imgsz, workers=workers) for split in ('train', 'val') if config.get(split)}
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Decode and resize the training images once into memory-mapped caches. Run after split_dataset.")
+    parser.add_argument("--data", type=str, default="../dataset/data.yaml", help="data.yaml listing the train and val images.")
+    parser.add_argument("--imgsz", type=int, default=640, help="Training image size (default: 640).")
+    parser.add_argument("--workers", type=int, default=8, help="Decoding threads (default: 8).")
+    args = parser.parse_args()
+
+    for split, cache in build_data_caches(args.data, imgsz=args.imgsz, workers=args.workers).items():
+        print(f"{split}: {len(cache)} images cached in {cache.cache_dir}")
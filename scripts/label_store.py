@@ -0,0 +1,174 @@
+# scripts/label_store.py
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from check_labels import parse_label_files_parallel
+from dataset_index import DatasetIndex, LABEL_EXTENSIONS
+
+STORE_VERSION = 1
+_ARRAYS = ('boxes', 'classes', 'offsets', 'lines')
+
+class LabelStore:
+    """
+    All YOLO labels of one directory packed into flat, memory-mapped NumPy arrays.
+
+    Image i owns rows offsets[i]:offsets[i + 1] of boxes (float32 x, y, w, h) and classes
+    (int32). Rows whose class id is not an integer are stored with class -1 so validation still
+    flags them; malformed lines are kept in the metadata.
+    """
+
+    def __init__(self, store_dir):
+        with open(os.path.join(store_dir, "meta.json"), 'r') as f:
+            meta = json.load(f)
+        self.store_dir = store_dir
+        self.names = meta["names"]
+        self.fingerprint = meta["fingerprint"]
+        self.empty = meta["empty"]
+        self.malformed = [tuple(m) for m in meta["malformed"]]
+        for name in _ARRAYS:
+            setattr(self, name, np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode='r'))
+
+    def __len__(self):
+        return len(self.names)
+
+    def labels(self, i):
+        """
+        Return (classes, boxes) of the i-th label file.
+        """
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.classes[start:end], self.boxes[start:end]
+
+    def file_ids(self):
+        """
+        Index of the label file each row belongs to.
+        """
+        return np.repeat(np.arange(len(self.names)), np.diff(self.offsets))
+
+    def rows(self):
+        """
+        Rows as an (N, 5) float64 array of class, x, y, w, h, as returned by parse_label_files.
+        """
+        return np.column_stack([self.classes.astype(np.float64), self.boxes.astype(np.float64)])
+
+def default_store_dir(labels_dir):
+    """
+    Store location next to the labels directory, e.g. train/labels -> train/labels.store.
+    """
+    return os.path.abspath(labels_dir).rstrip(os.sep) + ".store"
+
+def labels_fingerprint(labels_dir, index=None, verify=False):
+    """
+    Hash of the names, sizes and mtimes of all label files.
+
+    The sizes and mtimes come from the cached DatasetIndex listing, which is refreshed when files
+    are added, removed or renamed, so no label file is stat'ed while the directory is unchanged.
+    With verify=True every file is stat'ed again, which also catches files edited in place.
+    """
+    index = index or DatasetIndex()
+    files = index.files(labels_dir, LABEL_EXTENSIONS, verify=verify)
+    digest = hashlib.sha1()
+    for name in sorted(files):
+        size, mtime_ns = files[name]
+        digest.update(f"{name}\0{size}\0{mtime_ns}\n".encode())
+    return digest.hexdigest(), sorted(files)
+
+def build_label_store(labels_dir, store_dir=None, workers=None, index=None):
+    """
+    Parse every label file of a directory and pack them into a label store.
+
+    :param labels_dir: Directory containing YOLO label files.
+    :param store_dir: Directory to write the store to (default: default_store_dir(labels_dir)).
+    :param workers: Number of parser processes.
+    :param index: DatasetIndex used to list the label files.
+    :return: The opened LabelStore.
+    """
+    store_dir = store_dir or default_store_dir(labels_dir)
+    # Every file is parsed anyway, so record exactly what is on disk
+    fingerprint, names = labels_fingerprint(labels_dir, index, verify=True)
+    paths = [os.path.join(labels_dir, name) for name in names]
+
+    rows, file_ids, line_numbers, empty, malformed = parse_label_files_parallel(paths, workers=workers)
+
+    classes = rows[:, 0]
+    integral = classes == np.round(classes)
+    arrays = {
+        'boxes': rows[:, 1:].astype(np.float32),
+        'classes': np.where(integral, classes, -1).astype(np.int32),
+        'offsets': np.concatenate([[0], np.cumsum(np.bincount(file_ids, minlength=len(names)))]).astype(np.int64),
+        'lines': line_numbers.astype(np.int32),
+    }
+
+    os.makedirs(store_dir, exist_ok=True)
+    # Remove the metadata first so a crash mid-build leaves an incomplete store that is rebuilt next time
+    meta_path = os.path.join(store_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(store_dir, f"{name}.npy"), array)
+    with open(meta_path + ".tmp", 'w') as f:
+        json.dump({
+            "version": STORE_VERSION,
+            "fingerprint": fingerprint,
+            "names": names,
+            "empty": empty,
+            "malformed": malformed,
+        }, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+    print(f"Built label store for {len(names)} files ({len(rows)} boxes) at {store_dir}")
+    return LabelStore(store_dir)
+
+def open_label_store(labels_dir, store_dir=None, workers=None, index=None, verify=False):
+    """
+    Open the label store of a directory, rebuilding it if the label files changed.
+
+    :param verify: Stat every label file to also catch files edited in place, which do not change
+                   the directory listing (see labels_fingerprint).
+    """
+    store_dir = store_dir or default_store_dir(labels_dir)
+    index = index or DatasetIndex()
+    meta_path = os.path.join(store_dir, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        fingerprint, _ = labels_fingerprint(labels_dir, index, verify=verify)
+        if meta.get("version") == STORE_VERSION and meta.get("fingerprint") == fingerprint:
+            index.save()
+            return LabelStore(store_dir)
+
+    store = build_label_store(labels_dir, store_dir, workers=workers, index=index)
+    index.save()
+    return store
+
+def label_statistics(store, nc=None):
+    """
+    Summary statistics of a label store.
+
+    :return: Dictionary with image and box counts, boxes per class, boxes per image and
+             box width/height percentiles.
+    """
+    counts = np.diff(store.offsets)
+    classes = np.asarray(store.classes)
+    boxes = np.asarray(store.boxes)
+    valid = classes >= 0
+    per_class = np.bincount(classes[valid], minlength=nc or 0)
+
+    stats = {
+        "images": len(store),
+        "boxes": int(len(classes)),
+        "background_images": int((counts == 0).sum()),
+        "boxes_per_class": {int(c): int(n) for c, n in enumerate(per_class)},
+        "boxes_per_image": {
+            "mean": float(counts.mean()) if len(counts) else 0.0,
+            "max": int(counts.max()) if len(counts) else 0,
+        },
+    }
+    if len(boxes):
+        for i, name in ((2, "width"), (3, "height")):
+            p5, p50, p95 = np.percentile(boxes[:, i], [5, 50, 95])
+            stats[f"box_{name}"] = {"p5": float(p5), "p50": float(p50), "p95": float(p95)}
+    return stats
@@ -0,0 +1,187 @@
+# scripts/metrics_db.py
+
+import json
+import sqlite3
+import time
+
+DEFAULT_DB = "yolov8_training.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS training_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    epoch INTEGER,
+    batch INTEGER,
+    progress REAL,
+    device TEXT,
+    metrics TEXT,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS training_metrics_run ON training_metrics (run_id, id);
+"""
+
+def connect(db_path=DEFAULT_DB):
+    """
+    Open the training database in WAL mode, so the server can read while a run writes.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _floats(values):
+    # Metrics arrive as numpy scalars or 0-d tensors; store plain numbers
+    return {key: float(value) for key, value in values.items()}
+
+def add_epoch_callbacks(model, on_epoch, on_final=None):
+    """
+    Register callbacks on a YOLO model: on_epoch(trainer) after the validation of every training
+    epoch, and on_final(trainer) for the evaluation of best.pt after training.
+
+    Ultralytics fires on_fit_epoch_end for both; only a training epoch is preceded by
+    on_train_epoch_end, which tells them apart.
+    """
+    epoch_done = False
+
+    def on_train_epoch_end(trainer):
+        nonlocal epoch_done
+        epoch_done = True
+
+    def on_fit_epoch_end(trainer):
+        nonlocal epoch_done
+        if epoch_done:
+            epoch_done = False
+            on_epoch(trainer)
+        elif on_final is not None:
+            on_final(trainer)
+
+    model.add_callback("on_train_epoch_end", on_train_epoch_end)
+    model.add_callback("on_fit_epoch_end", on_fit_epoch_end)
+    return model
+
+class MetricsSink:
+    """
+    Append-only log of the progress of one training run in the training_metrics table.
+
+    Rows are buffered and written in one transaction every flush_every rows or flush_interval
+    seconds, whichever comes first, so per-batch logging costs one commit per many batches.
+    Each row has a kind: 'start' (device), 'batch', 'epoch' (validation metrics, losses,
+    learning rates and epoch time), 'final' (best.pt evaluated after training) or 'end'.
+    """
+
+    def __init__(self, run_id, db_path=DEFAULT_DB, per_batch=False, flush_every=100, flush_interval=5.0):
+        self.run_id = run_id
+        self.conn = connect(db_path)
+        self.per_batch = per_batch
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.last_flush = time.monotonic()
+        self.device = None
+        self.batch = 0
+
+    def log(self, kind, epoch=None, batch=None, progress=None, metrics=None):
+        self.pending.append((self.run_id, kind, epoch, batch, progress, self.device,
+                             json.dumps(metrics) if metrics is not None else None, time.time()))
+        if len(self.pending) >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO training_metrics (run_id, kind, epoch, batch, progress, device, metrics, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self.pending,
+                )
+            self.pending = []
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # Ultralytics callbacks
+
+    def on_train_start(self, trainer):
+        self.device = str(trainer.device)
+        self.log("start", epoch=0, progress=0.0)
+        self.flush()
+
+    def on_train_epoch_start(self, trainer):
+        self.batch = 0
+
+    def on_train_batch_end(self, trainer):
+        self.batch += 1
+        if self.per_batch:
+            nb = len(trainer.train_loader)
+            progress = 100 * (trainer.epoch + self.batch / nb) / trainer.epochs
+            self.log("batch", epoch=trainer.epoch + 1, batch=self.batch, progress=progress,
+                     metrics=_floats(trainer.label_loss_items(trainer.tloss, prefix="train")))
+
+    def on_epoch(self, trainer):
+        metrics = _floats({**trainer.label_loss_items(trainer.tloss, prefix="train"), **trainer.metrics, **trainer.lr})
+        metrics["epoch_time_s"] = trainer.epoch_time or 0.0
+        self.log("epoch", epoch=trainer.epoch + 1, progress=100 * (trainer.epoch + 1) / trainer.epochs, metrics=metrics)
+        self.flush()
+
+    def on_final(self, trainer):
+        self.log("final", epoch=trainer.epoch, progress=100.0, metrics=_floats(trainer.metrics))
+
+    def on_train_end(self, trainer):
+        self.log("end", epoch=trainer.epoch + 1, progress=100.0)
+        self.flush()
+
+    def attach(self, model):
+        """
+        Register the callbacks on a YOLO model before model.train().
+        """
+        for event in ("on_train_start", "on_train_epoch_start", "on_train_batch_end", "on_train_end"):
+            model.add_callback(event, getattr(self, event))
+        add_epoch_callbacks(model, self.on_epoch, self.on_final)
+        return self
+
+def read_run(run_id, db_path=DEFAULT_DB, kinds=None, after_id=0):
+    """
+    Rows logged for a run in order, optionally only some kinds and only rows after a given id
+    (pass the last id seen to poll for new rows).
+    """
+    conn = connect(db_path)
+    try:
+        query = "SELECT id, kind, epoch, batch, progress, device, metrics, timestamp FROM training_metrics WHERE run_id = ? AND id > ?"
+        params = [run_id, after_id]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        rows = conn.execute(query + " ORDER BY id", params).fetchall()
+    finally:
+        conn.close()
+    return [{"id": row[0], "kind": row[1], "epoch": row[2], "batch": row[3], "progress": row[4], "device": row[5],
+             "metrics": json.loads(row[6]) if row[6] else None, "timestamp": row[7]} for row in rows]
+
+def run_status(run_id, db_path=DEFAULT_DB):
+    """
+    Summary of a run: latest progress, device, latest epoch metrics and the per-epoch history.
+    """
+    rows = read_run(run_id, db_path, kinds=("start", "batch", "epoch", "final", "end"))
+    epochs = [row for row in rows if row["kind"] == "epoch"]
+    return {
+        "run_id": run_id,
+        "progress": rows[-1]["progress"] if rows else 0.0,
+        "device": next((row["device"] for row in reversed(rows) if row["device"]), None),
+        "metrics": epochs[-1]["metrics"] if epochs else None,
+        "finished": bool(rows) and rows[-1]["kind"] == "end",
+        "history": [{"epoch": row["epoch"], "timestamp": row["timestamp"], "metrics": row["metrics"]} for row in epochs],
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print the logged progress of a training run.")
+    parser.add_argument("--run_id", type=int, required=True, help="Training run id (training_tasks.id).")
+    parser.add_argument("--db", type=str, default=DEFAULT_DB, help=f"Training database (default: {DEFAULT_DB}).")
+    args = parser.parse_args()
+
+    print(json.dumps(run_status(args.run_id, args.db), indent=2))
@@ -0,0 +1,287 @@
+# scripts/model_server.py
+
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import numpy as np
+
+from export_model import BACKENDS, load_model
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+def _result(data, speed):
+    """
+    Minimal stand-in for an ultralytics Results object: boxes.data as an (n, 6) array and the
+    per-image speed dictionary, which is all extract_detections and StageTimers read.
+    """
+    return SimpleNamespace(boxes=SimpleNamespace(data=data), speed=speed)
+
+class DynamicBatcher:
+    """
+    Collect frames submitted by concurrent callers into shared model calls.
+
+    A batch is run as soon as it holds max_batch frames, or max_wait_ms after its first request
+    arrived, whichever comes first. Requests are never split, so a batch can exceed max_batch
+    when a single request is larger.
+    """
+
+    def __init__(self, model, max_batch=16, max_wait_ms=5):
+        self.model = model
+        self.names = dict(model.names)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.frames = 0
+        self.thread = threading.Thread(target=self._run, name="batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, frames, imgsz=None):
+        """
+        Queue frames for inference.
+
+        :param imgsz: Inference size, or None for the model's default. Requests with different
+                      sizes share a batch window but are run in separate model calls.
+        :return: Future resolving to one result per frame, see _result().
+        """
+        future = Future()
+        self.requests.put((list(frames), imgsz, future))
+        return future
+
+    def __call__(self, frames, verbose=False, imgsz=None):
+        return self.submit(frames, imgsz).result()
+
+    def _collect(self):
+        pending = [self.requests.get()]
+        size = len(pending[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = self.requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            pending.append(request)
+            size += len(request[0])
+        return pending
+
+    def _run(self):
+        while True:
+            groups = {}
+            for request in self._collect():
+                groups.setdefault(request[1], []).append(request)
+            for imgsz, pending in groups.items():
+                self._run_batch(pending, imgsz)
+
+    def _run_batch(self, pending, imgsz):
+        frames = [frame for request_frames, _, _ in pending for frame in request_frames]
+        kwargs = {"imgsz": imgsz} if imgsz else {}
+        try:
+            results = self.model(frames, verbose=False, **kwargs)
+            converted = [_result(r.boxes.data.cpu().numpy(), dict(r.speed)) for r in results]
+        except Exception as e:
+            for _, _, future in pending:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.frames += len(frames)
+        start = 0
+        for request_frames, _, future in pending:
+            future.set_result(converted[start:start + len(request_frames)])
+            start += len(request_frames)
+
+class ModelRegistry:
+    """
+    Models kept loaded for the lifetime of the server, keyed by their absolute path, each with
+    its own DynamicBatcher.
+
+    A model is loaded outside the lock, so requests for models already loaded and stats() are
+    not held up by a slow load; concurrent requests for the model being loaded wait for it.
+    A failed load is forgotten, so the next request tries again.
+    """
+
+    def __init__(self, backend='pytorch', int8=False, data=None, max_batch=16, max_wait_ms=5):
+        self.backend = backend
+        self.int8 = int8
+        self.data = data
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.batchers = {}
+        self.lock = threading.Lock()
+
+    def get(self, model_path):
+        model_path = os.path.abspath(model_path)
+        with self.lock:
+            future = self.batchers.get(model_path)
+            loading = future is None
+            if loading:
+                future = self.batchers[model_path] = Future()
+        if not loading:
+            return future.result()
+
+        try:
+            print(f"Loading {model_path} ({self.backend})")
+            model = load_model(model_path, backend=self.backend, int8=self.int8, data=self.data)
+            batcher = DynamicBatcher(model, self.max_batch, self.max_wait_ms)
+        except BaseException as e:
+            with self.lock:
+                del self.batchers[model_path]
+            future.set_exception(e)
+            raise
+        future.set_result(batcher)
+        return batcher
+
+    def stats(self):
+        with self.lock:
+            futures = list(self.batchers.items())
+        loaded = {path: future.result() for path, future in futures if future.done() and not future.exception()}
+        return {path: {"batches": b.batches, "frames": b.frames} for path, b in loaded.items()}
+
+class LocalModelClient:
+    """
+    In-process stand-in for ModelClient: same interface, served by a ModelRegistry without HTTP.
+    """
+
+    def __init__(self, registry, model_path):
+        self.batcher = registry.get(model_path)
+        self.names = self.batcher.names
+
+    def __call__(self, frames, verbose=False, imgsz=None):
+        return self.batcher(frames, imgsz=imgsz)
+
+class ModelClient:
+    """
+    Client for a running model server, usable in place of a YOLO model by the verify scripts.
+
+    Calling it with a list of BGR frames of the same shape returns one result per frame with
+    boxes.data and speed, like the ultralytics Results consumed by extract_detections.
+    """
+
+    def __init__(self, model_path, url=DEFAULT_URL, timeout=120):
+        parsed = urlparse(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.timeout = timeout
+        self.query = urlencode({"model": os.path.abspath(model_path)})
+        self.local = threading.local()
+        self.names = {int(k): v for k, v in self._request('GET', '/names')["names"].items()}
+
+    def _connection(self):
+        # One keep-alive connection per calling thread
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def _request(self, method, path, body=None, headers=None):
+        connection = self._connection()
+        try:
+            connection.request(method, f"{path}?{self.query}", body=body, headers=headers or {})
+            response = connection.getresponse()
+            payload = json.loads(response.read())
+        except (ConnectionError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+        if response.status != 200:
+            raise RuntimeError(f"Model server error: {payload.get('error')}")
+        return payload
+
+    def __call__(self, frames, verbose=False, imgsz=None):
+        batch = np.ascontiguousarray(np.stack(frames), dtype=np.uint8)
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "X-Frame-Shape": ",".join(str(d) for d in batch.shape),
+        }
+        if imgsz:
+            headers["X-Imgsz"] = str(imgsz)
+        payload = self._request('POST', '/detect', body=batch.tobytes(), headers=headers)
+        return [_result(np.asarray(r["boxes"], dtype=np.float32).reshape(-1, 6), r["speed"]) for r in payload["results"]]
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    registry = None
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _model_path(self):
+        return parse_qs(urlparse(self.path).query).get("model", [None])[0]
+
+    def do_GET(self):
+        route = urlparse(self.path).path
+        try:
+            if route == "/names":
+                self._reply(200, {"names": self.registry.get(self._model_path()).names})
+            elif route == "/stats":
+                self._reply(200, self.registry.stats())
+            else:
+                self._reply(404, {"error": f"Unknown route {route}"})
+        except Exception as e:
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_POST(self):
+        route = urlparse(self.path).path
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if route != "/detect":
+            self._reply(404, {"error": f"Unknown route {route}"})
+            return
+        try:
+            shape = tuple(int(d) for d in self.headers["X-Frame-Shape"].split(","))
+            frames = np.frombuffer(body, dtype=np.uint8).reshape(shape)
+            imgsz = int(self.headers["X-Imgsz"]) if self.headers.get("X-Imgsz") else None
+            results = self.registry.get(self._model_path()).submit(list(frames), imgsz).result()
+            self._reply(200, {"results": [{"boxes": r.boxes.data.tolist(), "speed": r.speed} for r in results]})
+        except Exception as e:
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(host='127.0.0.1', port=8765, registry=None):
+    """
+    Create the HTTP server; call serve_forever() on the result to start serving.
+    """
+    handler = type("Handler", (_Handler,), {"registry": registry or ModelRegistry()})
+    return ThreadingHTTPServer((host, port), handler)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve YOLO models from a long-lived local process with dynamic request batching.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765).")
+    parser.add_argument("--backend", type=str, choices=BACKENDS, default='pytorch', help="Inference runtime for every model (default: pytorch).")
+    parser.add_argument("--int8", action='store_true', help="Use INT8 exports calibrated on the val split of --data.")
+    parser.add_argument("--data", type=str, default="../dataset/data.yaml", help="data.yaml used to calibrate INT8 exports.")
+    parser.add_argument("--max_batch", type=int, default=16, help="Frames per model call before a batch is run (default: 16).")
+    parser.add_argument("--max_wait_ms", type=float, default=5, help="Longest a request waits for a batch to fill (default: 5).")
+    parser.add_argument("--preload", type=str, nargs="*", default=[], help="Models to load at startup.")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.backend, int8=args.int8, data=args.data, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    for model_path in args.preload:
+        registry.get(model_path)
+
+    server = serve(args.host, args.port, registry)
+    print(f"Model server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
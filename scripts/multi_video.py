@@ -0,0 +1,145 @@
+# scripts/multi_video.py
+
+import glob
+import os
+import queue
+import threading
+
+import cv2
+
+from extract_frames import VIDEO_EXTENSIONS
+
+def expand_inputs(source):
+    """
+    Resolve a video file, a directory of videos or a glob pattern to a sorted list of video paths.
+    """
+    if os.path.isfile(source):
+        return [source]
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source) if name.lower().endswith(VIDEO_EXTENSIONS))
+    return sorted(path for path in glob.glob(source) if os.path.isfile(path))
+
+def is_multi_input(source):
+    """
+    Whether an input names several videos (a directory or a glob pattern) rather than one video file.
+
+    :raises FileNotFoundError: If the input is a plain path that does not exist.
+    """
+    if os.path.isdir(source) or any(char in source for char in "*?["):
+        return True
+    if not os.path.isfile(source):
+        raise FileNotFoundError(f"Video not found: {source}")
+    return False
+
+class MultiVideoDecoder:
+    """
+    Decode several videos on parallel threads and merge their frames into shared batches.
+
+    Iterating yields (kind, index, payload) events, where index is the position of the video
+    in paths:
+
+    - ("start", index, info): the video was opened; info has fps, width, height and total_frames.
+    - ("batch", None, items): up to batch_size (index, frame_number, frame) tuples, possibly from
+      different videos. Frames of one video always arrive in order, numbered from 1.
+    - ("end", index, frames_decoded): the video is finished and none of its frames are pending.
+    - ("error", index, message): the video failed; the other videos carry on.
+
+    Each decoder thread works through the videos one at a time, so at most `decoders` videos are
+    open at once. Call stop(index) to stop decoding a video early, e.g. after its first detection.
+    """
+
+    def __init__(self, paths, batch_size=8, decoders=4, queue_size=64, max_ms=None):
+        self.paths = list(paths)
+        self.batch_size = batch_size
+        self.decoders = max(1, min(decoders, len(self.paths)))
+        self.max_ms = max_ms
+        self.events = queue.Queue(maxsize=queue_size)
+        self.work = queue.Queue()
+        for index, path in enumerate(self.paths):
+            self.work.put((index, path))
+        self.stopped = set()
+        self.shutdown = threading.Event()
+        self.threads = []
+
+    def stop(self, index):
+        self.stopped.add(index)
+
+    def _put(self, event):
+        while not self.shutdown.is_set():
+            try:
+                self.events.put(event, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _decode(self):
+        while not self.shutdown.is_set():
+            try:
+                index, path = self.work.get_nowait()
+            except queue.Empty:
+                break
+            cap = cv2.VideoCapture(path)
+            try:
+                if not cap.isOpened():
+                    raise IOError(f"Could not open video {path}")
+                self._put(("start", index, {
+                    "fps": cap.get(cv2.CAP_PROP_FPS),
+                    "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                    "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                    "total_frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+                }))
+                frame_number = 0
+                while index not in self.stopped:
+                    ret, frame = cap.read()
+                    if not ret or (self.max_ms is not None and cap.get(cv2.CAP_PROP_POS_MSEC) > self.max_ms):
+                        break
+                    frame_number += 1
+                    if not self._put(("frame", index, (frame_number, frame))):
+                        break
+                self._put(("end", index, frame_number))
+            except Exception as e:
+                self._put(("error", index, f"{type(e).__name__}: {e}"))
+            finally:
+                cap.release()
+        self._put(("done", None, None))
+
+    def __enter__(self):
+        for i in range(self.decoders):
+            thread = threading.Thread(target=self._decode, name=f"decode-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        self.shutdown.set()
+        for thread in self.threads:
+            thread.join()
+
+    def __iter__(self):
+        running = len(self.threads)
+        batch = []
+        while running:
+            kind, index, payload = self.events.get()
+            if kind == "frame":
+                if index not in self.stopped:
+                    batch.append((index, *payload))
+                if len(batch) >= self.batch_size:
+                    yield "batch", None, batch
+                    batch = []
+            elif kind == "done":
+                running -= 1
+            elif kind == "start":
+                yield kind, index, payload
+            else:
+                # Frames queued before the end of a video belong in front of it
+                if batch:
+                    yield "batch", None, batch
+                    batch = []
+                yield kind, index, payload
+        if batch:
+            yield "batch", None, batch
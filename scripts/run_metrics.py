@@ -0,0 +1,154 @@
+# scripts/run_metrics.py
+
+import json
+import math
+import sys
+import time
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process and its waited-for children in MB, or None if unknown.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 2**20
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak * scale / 2**20
+
+class LatencyHistogram:
+    """
+    Fixed-size histogram of latencies with logarithmic buckets.
+
+    Buckets grow by 5% from 1 microsecond, so percentiles are accurate to within 5% while
+    recording stays O(1) and memory stays constant however many samples are added.
+    """
+
+    MIN_SECONDS = 1e-6
+    GROWTH = 1.05
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds, count=1):
+        if seconds <= self.MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = int(math.log(seconds / self.MIN_SECONDS, self.GROWTH)) + 1
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += count
+        self.total += seconds * count
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """
+        Upper bound of the bucket holding the q-th percentile (0-100), in seconds.
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.MIN_SECONDS * self.GROWTH ** bucket, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+class _StageTimer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.add(time.perf_counter() - self.start)
+        return False
+
+class StageTimers:
+    """
+    Per-stage latency histograms for a processing run.
+
+    Use ``with timers.time("decode"): ...`` around a stage, or ``timers.add(stage, seconds)``
+    for durations measured elsewhere (e.g. the per-image speeds reported by ultralytics).
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self._timers = {}
+        self.start = time.perf_counter()
+
+    def _histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+            self._timers[stage] = _StageTimer(histogram)
+        return histogram
+
+    def time(self, stage):
+        self._histogram(stage)
+        return self._timers[stage]
+
+    def add(self, stage, seconds, count=1):
+        self._histogram(stage).add(seconds, count)
+
+    def add_ultralytics_speed(self, results):
+        """
+        Record the preprocess, inference and postprocess times ultralytics reports per image.
+        """
+        for result in results:
+            speed = getattr(result, "speed", None) or {}
+            for stage in ("preprocess", "inference", "postprocess"):
+                if speed.get(stage) is not None:
+                    self.add(stage, speed[stage] / 1000)
+
+    def summary_line(self):
+        """
+        One-line summary of the p50/p95 latency of every stage, for periodic progress output.
+        """
+        parts = []
+        for stage, histogram in self.histograms.items():
+            parts.append(f"{stage} p50 {histogram.percentile(50) * 1000:.1f}ms p95 {histogram.percentile(95) * 1000:.1f}ms")
+        return ", ".join(parts)
+
+    def report(self, **extra):
+        """
+        Run report with per-stage statistics, wall time and peak RSS, plus any extra fields.
+        """
+        report = {
+            "wall_time_s": time.perf_counter() - self.start,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+        }
+        report.update(extra)
+        return report
+
+def write_report(report, path):
+    """
+    Write a run report as JSON.
+    """
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, default=float)
@@ -3,8 +3,151 @@
 import os
 import shutil
 import random
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
  
-def split_dataset(images_dir, labels_dir, output_dir, train_ratio=0.8, seed=42):
+from dataset_index import DatasetIndex, IMAGE_EXTENSIONS, LABEL_EXTENSIONS
+from label_store import open_label_store
+ 
+SPLIT_MODES = ('copy', 'hardlink', 'symlink', 'reflink', 'list')
+ 
+# ioctl request number of FICLONE on Linux (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+ 
+def _reflink(src, dst):
+    """
+    Clone src into dst sharing the same data blocks. Raises OSError where unsupported.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("reflinks are not supported on this platform")
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    shutil.copystat(src, dst)
+ 
+def _is_placed(src, dst, mode):
+    """
+    Check whether dst already holds src from a previous split, so re-splitting can leave it alone.
+    """
+    if not os.path.exists(dst):
+        return False
+    if mode == 'symlink':
+        return os.path.islink(dst) and os.path.samefile(src, dst)
+    if os.path.islink(dst) or os.path.samefile(src, dst) != (mode == 'hardlink'):
+        return False
+    if mode == 'hardlink':
+        return True
+    src_stat, dst_stat = os.stat(src), os.stat(dst)
+    return src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+ 
+def place_file(src, dst, mode='copy'):
+    """
+    Place src at dst using the given split mode, falling back to a copy when the filesystem
+    cannot link or clone the file (e.g. across devices).
+
+    :return: The mode actually used, or None if dst was already in place.
+    """
+    if _is_placed(src, dst, mode):
+        return None
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        if mode == 'hardlink':
+            os.link(src, dst)
+            return mode
+        if mode == 'symlink':
+            os.symlink(os.path.abspath(src), dst)
+            return mode
+        if mode == 'reflink':
+            _reflink(src, dst)
+            return mode
+    except OSError:
+        if os.path.lexists(dst):
+            os.remove(dst)
+    shutil.copy2(src, dst)
+    return 'copy'
+ 
+def place_files(file_list, src_images, src_labels, dst_images, dst_labels, split_name, mode='copy', workers=8, clean=False):
+    """
+    Place images and their labels into a split directory in parallel.
+
+    Images and labels left over from a previous split are only removed with clean=True; other
+    files in the split directories are never touched.
+
+    :param file_list: Image file names to place.
+    :param src_images: Directory containing the source images.
+    :param src_labels: Directory containing the source labels.
+    :param dst_images: Destination image directory.
+    :param dst_labels: Destination label directory.
+    :param split_name: Name of the split used in messages.
+    :param mode: One of 'copy', 'hardlink', 'symlink' or 'reflink'.
+    :param workers: Number of threads placing files.
+    :param clean: Remove image and label files that are not part of this split.
+    """
+    pairs = []
+    for img_file in file_list:
+        label_file = os.path.splitext(img_file)[0] + '.txt'
+        pairs.append((os.path.join(src_images, img_file), os.path.join(dst_images, img_file)))
+        pairs.append((os.path.join(src_labels, label_file), os.path.join(dst_labels, label_file)))
+ 
+    # Images and labels that belonged to a previous split but not to this one
+    wanted = {dst for _, dst in pairs}
+    stale = [entry.path for directory in (dst_images, dst_labels) for entry in os.scandir(directory)
+             if not entry.is_dir(follow_symlinks=False) and entry.path not in wanted
+             and entry.name.lower().endswith(IMAGE_EXTENSIONS + LABEL_EXTENSIONS)]
+    if clean:
+        for path in stale:
+            os.remove(path)
+ 
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        used = list(pool.map(lambda pair: place_file(pair[0], pair[1], mode), pairs))
+ 
+    skipped = used.count(None)
+    fallbacks = used.count('copy') if mode != 'copy' else 0
+    print(f"Placed {len(file_list)} files in {split_name} set ({mode}; {skipped} files already in place"
+          f"{f', {len(stale)} stale files removed' if clean else ''}).")
+    if stale and not clean:
+        print(f"Warning: {len(stale)} images and labels from a previous split are still in the {split_name} set; use --clean to remove them.")
+    if fallbacks:
+        print(f"Warning: {fallbacks} files were copied because {mode} is not supported for them.")
+ 
+def label_path_for(image_path):
+    """
+    Label path YOLO derives from an image path (last /images/ replaced by /labels/).
+    """
+    sa, sb = f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}"
+    return os.path.splitext(sb.join(image_path.rsplit(sa, 1)))[0] + '.txt'
+ 
+def write_split_lists(train_files, val_files, images_dir, labels_dir, output_dir, workers=8, clean=False):
+    """
+    Write train.txt and val.txt listing image paths, without creating per-split copies.
+
+    YOLO finds each label by replacing the last /images/ in the image path with /labels/. If the
+    source directories do not follow that layout, the labeled images are first linked into
+    output_dir/all/images and output_dir/all/labels (hardlinks, falling back to copies).
+
+    :return: Paths of the train and val list files.
+    """
+    sample = os.path.join(os.path.abspath(images_dir), train_files[0] if train_files else val_files[0])
+    if label_path_for(sample) != os.path.join(os.path.abspath(labels_dir), os.path.basename(os.path.splitext(sample)[0]) + '.txt'):
+        pool_images = os.path.join(output_dir, 'all', 'images')
+        pool_labels = os.path.join(output_dir, 'all', 'labels')
+        os.makedirs(pool_images, exist_ok=True)
+        os.makedirs(pool_labels, exist_ok=True)
+        place_files(train_files + val_files, images_dir, labels_dir, pool_images, pool_labels, 'pooled', mode='hardlink', workers=workers, clean=clean)
+        images_dir = pool_images
+ 
+    list_paths = []
+    for split_name, file_list in (('train', train_files), ('val', val_files)):
+        list_path = os.path.join(output_dir, f"{split_name}.txt")
+        with open(list_path, 'w') as f:
+            f.writelines(os.path.join(os.path.abspath(images_dir), img_file) + '\n' for img_file in file_list)
+        print(f"Wrote {len(file_list)} {split_name} image paths to {list_path}.")
+        list_paths.append(list_path)
+    return tuple(list_paths)
+ 
+def split_dataset(images_dir, labels_dir, output_dir, train_ratio=0.8, seed=42, mode='copy', workers=8, index=None, use_label_store=False, clean=False):
     """
     Split dataset into training and validation sets, including only images that have corresponding label files.
  
@@ -13,30 +156,49 @@ def split_dataset(images_dir, labels_dir, output_dir, train_ratio=0.8, seed=42):
     :param output_dir: Base directory to save train and val splits.
     :param train_ratio: Proportion of data to use for training (default: 0.8).
     :param seed: Random seed for reproducibility (default: 42).
+    :param mode: How files are placed in the splits: 'copy', 'hardlink', 'symlink', 'reflink', or
+                 'list' to only write train.txt/val.txt path lists (default: 'copy').
+    :param workers: Number of threads placing files (default: 8).
+    :param index: DatasetIndex used to list images and labels (a new one is opened if None).
+    :param use_label_store: Pair images with labels through the packed label store and report the
+                            per-split class balance from it, without reading any label file.
+    :param clean: Remove images and labels left in the split directories by a previous split that
+                  are not part of this one (other files are kept).
     """
+    if mode not in SPLIT_MODES:
+        raise ValueError(f"Unknown split mode: {mode}")
+ 
     # Ensure output directories exist
     train_images_dir = os.path.join(output_dir, 'train', 'images')
     train_labels_dir = os.path.join(output_dir, 'train', 'labels')
     val_images_dir = os.path.join(output_dir, 'val', 'images')
     val_labels_dir = os.path.join(output_dir, 'val', 'labels')
  
-    for directory in [train_images_dir, train_labels_dir, val_images_dir, val_labels_dir]:
-        os.makedirs(directory, exist_ok=True)
-        print(f"Created directory: {directory}")
+    if mode != 'list':
+        for directory in [train_images_dir, train_labels_dir, val_images_dir, val_labels_dir]:
+            os.makedirs(directory, exist_ok=True)
+            print(f"Created directory: {directory}")
+    else:
+        os.makedirs(output_dir, exist_ok=True)
  
-    # List all image files
-    all_image_files = [f for f in os.listdir(images_dir) if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
-    print(f"Total images found: {len(all_image_files)}")
+    # Pair images with label files from the cached directory listings (sorted, so the split
+    # only depends on the seed and not on the filesystem's listing order)
+    index = index or DatasetIndex()
+    store = None
+    if use_label_store:
+        store = open_label_store(labels_dir, index=index)
+        label_ids = {os.path.splitext(name)[0]: i for i, name in enumerate(store.names)}
+        labeled_image_files, unlabeled_image_files = [], []
+        for img_file in sorted(index.files(images_dir, IMAGE_EXTENSIONS)):
+            (labeled_image_files if os.path.splitext(img_file)[0] in label_ids else unlabeled_image_files).append(img_file)
+    else:
+        labeled_image_files, unlabeled_image_files = index.pair(images_dir, labels_dir)
+    index.save()
+    print(f"Total images found: {len(labeled_image_files) + len(unlabeled_image_files)}")
  
-    # Filter images that have corresponding label files
-    labeled_image_files = []
-    for img_file in all_image_files:
+    for img_file in unlabeled_image_files:
         label_file = os.path.splitext(img_file)[0] + '.txt'
-        label_path = os.path.join(labels_dir, label_file)
-        if os.path.exists(label_path):
-            labeled_image_files.append(img_file)
-        else:
-            print(f"Excluded {img_file}: Label file {label_file} does not exist.")
+        print(f"Excluded {img_file}: Label file {label_file} does not exist.")
  
     print(f"Total labeled images: {len(labeled_image_files)}")
  
@@ -56,45 +218,41 @@ def split_dataset(images_dir, labels_dir, output_dir, train_ratio=0.8, seed=42):
     print(f"Training samples: {len(train_files)}")
     print(f"Validation samples: {len(val_files)}")
  
-    # Function to copy files
-    def copy_files(file_list, src_images, src_labels, dst_images, dst_labels, split_name):
-        for img_file in file_list:
-            label_file = os.path.splitext(img_file)[0] + '.txt'
- 
-            src_img_path = os.path.join(src_images, img_file)
-            src_label_path = os.path.join(src_labels, label_file)
- 
-            dst_img_path = os.path.join(dst_images, img_file)
-            dst_label_path = os.path.join(dst_labels, label_file)
- 
-            # Copy image
-            shutil.copy2(src_img_path, dst_img_path)
+    if store is not None:
+        for split_name, file_list in (('Training', train_files), ('Validation', val_files)):
+            ids = [label_ids[os.path.splitext(img_file)[0]] for img_file in file_list]
+            classes = np.concatenate([store.labels(i)[0] for i in ids]) if ids else np.empty(0, dtype=np.int32)
+            counts = np.bincount(classes[classes >= 0])
+            print(f"{split_name} boxes per class: {dict(enumerate(counts.tolist()))}")
  
-            # Copy label
-            shutil.copy2(src_label_path, dst_label_path)
+    if mode == 'list':
+        write_split_lists(train_files, val_files, images_dir, labels_dir, output_dir, workers=workers, clean=clean)
+    else:
+        # Place training files
+        place_files(
+            train_files,
+            src_images=images_dir,
+            src_labels=labels_dir,
+            dst_images=train_images_dir,
+            dst_labels=train_labels_dir,
+            split_name='training',
+            mode=mode,
+            workers=workers,
+            clean=clean
+        )
  
-        print(f"Copied {len(file_list)} files to {split_name} set.")
- 
-    # Copy training files
-    copy_files(
-        train_files,
-        src_images=images_dir,
-        src_labels=labels_dir,
-        dst_images=train_images_dir,
-        dst_labels=train_labels_dir,
-        split_name='training'
-       
-    )
- 
-    # Copy validation files
-    copy_files(
-        val_files,
-        src_images=images_dir,
-        src_labels=labels_dir,
-        dst_images=val_images_dir,
-        dst_labels=val_labels_dir,
-        split_name='validation'
-    )
+        # Place validation files
+        place_files(
+            val_files,
+            src_images=images_dir,
+            src_labels=labels_dir,
+            dst_images=val_images_dir,
+            dst_labels=val_labels_dir,
+            split_name='validation',
+            mode=mode,
+            workers=workers,
+            clean=clean
+        )
  
     print("Dataset splitting completed successfully.")
  
@@ -107,6 +265,10 @@ if __name__ == "__main__":
     parser.add_argument("--output_dir", type=str, default=os.path.abspath("../dataset/images"), help="Directory to save the split datasets.")
     parser.add_argument("--train_ratio", type=float, default=0.8, help="Proportion of data to use for training (default: 0.8).")
     parser.add_argument("--seed", type=int, default=42, help="Random seed for shuffling (default: 42).")
+    parser.add_argument("--mode", type=str, choices=SPLIT_MODES, default='copy', help="How to place files in the splits (default: copy).")
+    parser.add_argument("--workers", type=int, default=8, help="Threads used to place files (default: 8).")
+    parser.add_argument("--label_store", action='store_true', help="Pair images and report class balance from the packed label store.")
+    parser.add_argument("--clean", action='store_true', help="Delete images and labels left in train/ and val/ by a previous split that are not in this one.")
     args = parser.parse_args()
  
     split_dataset(
@@ -114,7 +276,11 @@ if __name__ == "__main__":
         labels_dir=args.labels_dir,
         output_dir=args.output_dir,
         train_ratio=args.train_ratio,
-        seed=args.seed
+        seed=args.seed,
+        mode=args.mode,
+        workers=args.workers,
+        use_label_store=args.label_store,
+        clean=args.clean
     )
 
 
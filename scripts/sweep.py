@@ -0,0 +1,243 @@
+# scripts/sweep.py
+
+import csv
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from metrics_db import add_epoch_callbacks
+
+# Search space used when none is given: [distribution, ...] per training argument
+DEFAULT_SPACE = {
+    "lr0": ["log_uniform", 1e-4, 1e-1],
+    "lrf": ["log_uniform", 1e-3, 1e-1],
+    "momentum": ["uniform", 0.8, 0.98],
+    "optimizer": ["choice", ["SGD", "AdamW"]],
+    "cos_lr": ["choice", [True, False]],
+    "patience": ["choice", [5, 10, 20]],
+}
+
+METRIC = "metrics/mAP50-95(B)"
+
+def sample_params(space, rng):
+    """
+    Draw one set of training arguments from a search space.
+
+    Each entry maps an argument to ["uniform", low, high], ["log_uniform", low, high],
+    ["int", low, high] (inclusive) or ["choice", [values]].
+    """
+    params = {}
+    for name, (kind, *args) in space.items():
+        if kind == "uniform":
+            params[name] = rng.uniform(*args)
+        elif kind == "log_uniform":
+            params[name] = math.exp(rng.uniform(math.log(args[0]), math.log(args[1])))
+        elif kind == "int":
+            params[name] = rng.randint(*args)
+        elif kind == "choice":
+            params[name] = rng.choice(args[0])
+        else:
+            raise ValueError(f"Unknown distribution for {name}: {kind}")
+    return params
+
+def rung_epochs(epochs, min_epochs=3, eta=3):
+    """
+    Epochs at which trials are compared: min_epochs, min_epochs * eta, ... below epochs.
+    """
+    rungs = []
+    rung = min_epochs
+    while rung < epochs:
+        rungs.append(rung)
+        rung *= eta
+    return rungs
+
+def asha_should_stop(rungs, lock, epoch, value, eta=3):
+    """
+    Record a trial's metric at a rung and decide whether to prune it (asynchronous successive halving).
+
+    A trial continues only while its metric is in the top 1/eta of all metrics recorded at the
+    same rung so far, so trials never wait for each other. The first eta - 1 trials reaching a
+    rung always continue.
+
+    :param rungs: Shared mapping of rung epoch to the list of recorded metrics.
+    :param lock: Lock guarding rungs across trial processes.
+    """
+    with lock:
+        values = list(rungs.get(epoch, [])) + [value]
+        rungs[epoch] = values
+    if len(values) < eta:
+        return False
+    cutoff = sorted(values, reverse=True)[len(values) // eta - 1]
+    return value < cutoff
+
+def _pin(cores, threads):
+    """
+    Pin this process to the given CPU cores and limit its math libraries to `threads` threads.
+    Must run before torch is imported.
+    """
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    else:
+        try:
+            import psutil
+        except ImportError:
+            return
+        psutil.Process().cpu_affinity(list(cores))
+
+def _run_trial(trial_id, params, config, core_slots, rungs, lock):
+    cores = core_slots.get()
+    try:
+        _pin(cores, len(cores))
+
+        import cv2
+        import torch
+        from ultralytics import YOLO
+
+        torch.set_num_threads(len(cores))
+        cv2.setNumThreads(1)
+
+        milestones = set(rung_epochs(config["epochs"], config["min_epochs"], config["eta"]))
+        history = []
+        status = {"pruned_at": None}
+
+        def on_epoch(trainer):
+            epoch = trainer.epoch + 1
+            value = float(trainer.metrics.get(METRIC, 0))
+            history.append(value)
+            if epoch in milestones and asha_should_stop(rungs, lock, epoch, value, config["eta"]):
+                status["pruned_at"] = epoch
+                trainer.stop = True
+
+        model = add_epoch_callbacks(YOLO(config["model"]), on_epoch)
+        start = time.perf_counter()
+        model.train(
+            data=config["data"],
+            epochs=config["epochs"],
+            imgsz=config["imgsz"],
+            batch=config["batch"],
+            device=config["device"],
+            workers=config["workers"],
+            project=config["project"],
+            name=f"trial_{trial_id:03d}",
+            exist_ok=True,
+            plots=False,
+            **params,
+        )
+        return {
+            "trial": trial_id,
+            "mAP50_95": max(history, default=0.0),
+            "epochs": len(history),
+            "pruned_at": status["pruned_at"],
+            "duration_s": time.perf_counter() - start,
+            "cores": sorted(cores),
+            "save_dir": os.path.join(config["project"], f"trial_{trial_id:03d}"),
+            "error": None,
+            **params,
+        }
+    except Exception as e:
+        return {"trial": trial_id, "mAP50_95": None, "error": f"{type(e).__name__}: {e}", **params}
+    finally:
+        core_slots.put(cores)
+
+def write_leaderboard(results, output_dir):
+    """
+    Write the trials ranked by their best mAP50-95 to leaderboard.json and leaderboard.csv.
+    """
+    ranked = sorted(results, key=lambda r: r["mAP50_95"] if r["mAP50_95"] is not None else -1, reverse=True)
+    with open(os.path.join(output_dir, "leaderboard.json"), 'w') as f:
+        json.dump(ranked, f, indent=2)
+    fields = []
+    for result in ranked:
+        fields.extend(key for key in result if key not in fields)
+    with open(os.path.join(output_dir, "leaderboard.csv"), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(ranked)
+    return ranked
+
+def run_sweep(data, trials=16, parallel=2, space=None, model="yolo11n.pt", epochs=100, imgsz=640, batch=8,
+              device="cpu", workers=2, min_epochs=3, eta=3, seed=0, project="runs/sweep"):
+    """
+    Train randomly sampled hyperparameter sets in parallel and prune weak trials early.
+
+    The available CPU cores are split evenly between `parallel` worker processes; each trial is
+    pinned to its share and limits its torch/OpenMP threads to it, so trials do not fight over
+    cores. After every validation a trial reports its mAP50-95; at the rung epochs
+    (min_epochs, min_epochs * eta, ...) trials outside the top 1/eta of their rung are stopped.
+
+    :param data: Path to data.yaml.
+    :param trials: Number of hyperparameter sets to try.
+    :param parallel: Number of trials running at once.
+    :param space: Search space, see sample_params() (default: DEFAULT_SPACE).
+    :param workers: Dataloader workers per trial.
+    :param project: Directory for the trial runs and the leaderboard.
+    :return: The trial results ranked by best mAP50-95.
+    """
+    space = space or DEFAULT_SPACE
+    rng = random.Random(seed)
+    os.makedirs(project, exist_ok=True)
+    config = {
+        "data": os.path.abspath(data), "model": model, "epochs": epochs, "imgsz": imgsz, "batch": batch,
+        "device": device, "workers": workers, "project": os.path.abspath(project), "min_epochs": min_epochs, "eta": eta,
+    }
+
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    parallel = max(1, min(parallel, len(cores), trials))
+    per_trial = len(cores) // parallel
+
+    # Spawned workers start from a fresh interpreter, so the thread limits apply before torch loads
+    context = multiprocessing.get_context("spawn")
+    manager = context.Manager()
+    core_slots = manager.Queue()
+    for i in range(parallel):
+        core_slots.put(set(cores[i * per_trial:(i + 1) * per_trial]))
+    rungs, lock = manager.dict(), manager.Lock()
+
+    results = []
+    with manager, ProcessPoolExecutor(max_workers=parallel, mp_context=context) as pool:
+        futures = [pool.submit(_run_trial, i, sample_params(space, rng), config, core_slots, rungs, lock) for i in range(trials)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            outcome = result["error"] or (f"pruned at epoch {result['pruned_at']}" if result.get("pruned_at") else "completed")
+            print(f"Trial {result['trial']}: mAP50-95 {result['mAP50_95']} ({outcome})")
+            write_leaderboard(results, project)
+
+    ranked = write_leaderboard(results, project)
+    print(f"Leaderboard written to {os.path.join(project, 'leaderboard.json')}")
+    return ranked
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter sweep with successive-halving early termination.")
+    parser.add_argument("--data", type=str, default="../dataset/data.yaml", help="Path to data.yaml.")
+    parser.add_argument("--space", type=str, default=None, help="JSON file with the search space (default: lr0, lrf, momentum, optimizer, cos_lr, patience).")
+    parser.add_argument("--trials", type=int, default=16, help="Number of hyperparameter sets to try (default: 16).")
+    parser.add_argument("--parallel", type=int, default=2, help="Trials running at once, each pinned to its share of the cores (default: 2).")
+    parser.add_argument("--model", type=str, default="yolo11n.pt", help="Model variant to train (default: yolo11n.pt).")
+    parser.add_argument("--epochs", type=int, default=100, help="Maximum epochs per trial (default: 100).")
+    parser.add_argument("--imgsz", type=int, default=640, help="Image size (default: 640).")
+    parser.add_argument("--batch", type=int, default=8, help="Batch size (default: 8).")
+    parser.add_argument("--device", type=str, default="cpu", help="Training device (default: cpu).")
+    parser.add_argument("--workers", type=int, default=2, help="Dataloader workers per trial (default: 2).")
+    parser.add_argument("--min_epochs", type=int, default=3, help="First epoch at which trials are compared (default: 3).")
+    parser.add_argument("--eta", type=int, default=3, help="Keep the top 1/eta of trials at each rung (default: 3).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for sampling the search space.")
+    parser.add_argument("--project", type=str, default="runs/sweep", help="Directory for trial runs and the leaderboard.")
+    args = parser.parse_args()
+
+    space = None
+    if args.space:
+        with open(args.space, 'r') as f:
+            space = json.load(f)
+
+    run_sweep(args.data, trials=args.trials, parallel=args.parallel, space=space, model=args.model, epochs=args.epochs,
+              imgsz=args.imgsz, batch=args.batch, device=args.device, workers=args.workers, min_epochs=args.min_epochs,
+              eta=args.eta, seed=args.seed, project=args.project)
@@ -3,8 +3,12 @@
 import os
 
 from ultralytics import YOLO
+
+from export_model import split_images
+from image_cache import CachedDetectionTrainer
+from training_manifest import save_training_manifest, training_manifest, training_manifest_path
  
-def train_yolov8(yaml_path="../dataset/data.yaml", model_variant="yolo11m.pt", epochs=10, imgsz=640, batch=16, name="text_verification_model"):
+def train_yolov8(yaml_path="../dataset/data.yaml", model_variant="yolo11m.pt", epochs=10, imgsz=640, batch=16, name="text_verification_model", image_cache=False):
 
     """
 
@@ -22,6 +26,9 @@ def train_yolov8(yaml_path="../dataset/data.yaml", model_variant="yolo11m.pt", e
 
     :param name: Name of the training run.
 
+    :param image_cache: Read the train and val images from pre-resized memory-mapped caches
+                        (built by image_cache.py, or on first use) instead of decoding every JPEG each epoch.
+
     """
 
     model = YOLO(model_variant)
@@ -38,26 +45,45 @@ def train_yolov8(yaml_path="../dataset/data.yaml", model_variant="yolo11m.pt", e
 
         name=name,
 
-        project="runs/detect"
+        project="runs/detect",
+
+        trainer=CachedDetectionTrainer if image_cache else None
 
     )
 
+    # Record the training images so continue_training --incremental can find the new ones later
+    save_training_manifest(training_manifest(split_images(yaml_path, 'train')), training_manifest_path(os.path.join(model.trainer.save_dir, 'weights', 'best.pt')))
+
     print("Training completed.")
  
 if __name__ == "__main__":
 
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train a YOLO11 text verification model.")
+    parser.add_argument("--data", type=str, default="../dataset/data.yaml", help="Path to data.yaml.")
+    parser.add_argument("--model", type=str, default="yolo11m.pt", help="Model variant to start from (default: yolo11m.pt).")
+    parser.add_argument("--epochs", type=int, default=10, help="Number of training epochs (default: 10).")
+    parser.add_argument("--imgsz", type=int, default=640, help="Image size (default: 640).")
+    parser.add_argument("--batch", type=int, default=16, help="Batch size (default: 16).")
+    parser.add_argument("--name", type=str, default="text_verification_model", help="Name of the training run.")
+    parser.add_argument("--image_cache", action='store_true', help="Read images from pre-resized memory-mapped caches instead of decoding them every epoch.")
+    args = parser.parse_args()
+
     train_yolov8(
 
-        yaml_path=os.path.abspath("../dataset/data.yaml"),
+        yaml_path=os.path.abspath(args.data),
+
+        model_variant=args.model,
 
-        model_variant="yolo11m.pt", 
+        epochs=args.epochs,
 
-        epochs=10,
+        imgsz=args.imgsz,
 
-        imgsz=640,
+        batch=args.batch,
 
-        batch=16,
+        name=args.name,
 
-        name="text_verification_model"
+        image_cache=args.image_cache
 
     )
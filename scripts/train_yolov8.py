@@ -1,3 +1,5 @@
+import argparse
+import json
 import torch
 import yaml
 import os
@@ -5,6 +7,14 @@ import time
 from ultralytics import YOLO
 from datetime import datetime
 
+from metrics_db import DEFAULT_DB, MetricsSink
+
+parser = argparse.ArgumentParser(description="Train the YOLOv8 model, logging progress to the training database.")
+parser.add_argument("--run_id", type=int, default=None, help="training_tasks id to log metrics under (default: stdout only).")
+parser.add_argument("--db", type=str, default=DEFAULT_DB, help=f"Training database (default: {DEFAULT_DB}).")
+parser.add_argument("--per_batch", action='store_true', help="Also log the training losses of every batch.")
+args = parser.parse_args()
+
 # Check for GPU availability
 device = 'cuda' if torch.cuda.is_available() else 'cpu'
 print(f"Using device: {device}")
@@ -46,29 +56,29 @@ def on_train_epoch_end(trainer):
     total_epochs = trainer.args.epochs
     progress = int((epoch / total_epochs) * 100)
     
-    # Get current metrics
+    # Get current metrics (from the previous validation; this runs before the epoch is validated)
     metrics = {
-        'precision': trainer.metrics.get('metrics/precision', 0),
-        'recall': trainer.metrics.get('metrics/recall', 0),
-        'mAP50': trainer.metrics.get('metrics/mAP50', 0),
-        'mAP50_95': trainer.metrics.get('metrics/mAP50-95', 0)
+        'precision': float(trainer.metrics.get('metrics/precision(B)', 0)),
+        'recall': float(trainer.metrics.get('metrics/recall(B)', 0)),
+        'mAP50': float(trainer.metrics.get('metrics/mAP50(B)', 0)),
+        'mAP50_95': float(trainer.metrics.get('metrics/mAP50-95(B)', 0))
     }
     
-    # Print progress to stdout for PythonShell to capture
+    # Print progress to stdout for the console log; the server reads the training database
     print(f"PROGRESS:{progress}")
     print(f"DEVICE:{device}")
     print(f"METRICS:{json.dumps(metrics)}")
 
+model.add_callback('on_train_epoch_end', on_train_epoch_end)
+sink = MetricsSink(args.run_id, args.db, per_batch=args.per_batch).attach(model) if args.run_id is not None else None
+
 # Start training
 try:
     start_time = datetime.now()
     print(f"Training started at: {start_time}")
     
     # Train the model
-    results = model.train(
-        **params,
-        callbacks={'on_train_epoch_end': on_train_epoch_end}
-    )
+    results = model.train(**params)
     
     end_time = datetime.now()
     duration = end_time - start_time
@@ -77,4 +87,7 @@ try:
 
 except Exception as e:
     print(f"ERROR:{str(e)}")
-    raise e
\ No newline at end of file
+    raise e
+finally:
+    if sink is not None:
+        sink.close()
\ No newline at end of file
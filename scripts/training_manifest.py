@@ -0,0 +1,53 @@
+# scripts/training_manifest.py
+
+import json
+import os
+
+from split_dataset import label_path_for
+
+TRAINING_MANIFEST_NAME = "dataset_manifest.json"
+TRAINING_MANIFEST_VERSION = 1
+
+def training_manifest(image_paths):
+    """
+    Snapshot of a set of training images as {absolute image path: [image size, image mtime_ns,
+    label size, label mtime_ns]}, with None for the label of an unlabeled image. Comparing two
+    snapshots finds images that were added, replaced or relabeled in between.
+    """
+    manifest = {}
+    for image_path in image_paths:
+        image_path = os.path.abspath(image_path)
+        image_stat = os.stat(image_path)
+        try:
+            label_stat = os.stat(label_path_for(image_path))
+            label = [label_stat.st_size, label_stat.st_mtime_ns]
+        except FileNotFoundError:
+            label = [None, None]
+        manifest[image_path] = [image_stat.st_size, image_stat.st_mtime_ns, *label]
+    return manifest
+
+def training_manifest_path(model_path):
+    """
+    Location of the training manifest of a model: the run directory for
+    runs/.../weights/best.pt, otherwise the directory of the weights.
+    """
+    weights_dir = os.path.dirname(os.path.abspath(model_path))
+    if os.path.basename(weights_dir) == 'weights':
+        weights_dir = os.path.dirname(weights_dir)
+    return os.path.join(weights_dir, TRAINING_MANIFEST_NAME)
+
+def save_training_manifest(manifest, path):
+    """
+    Write a training manifest atomically.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({"version": TRAINING_MANIFEST_VERSION, "images": manifest}, f)
+    os.replace(tmp_path, path)
+
+def load_training_manifest(path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if data.get("version") != TRAINING_MANIFEST_VERSION:
+        raise ValueError(f"Unsupported training manifest version in {path}: {data.get('version')}")
+    return data["images"]
@@ -1,253 +1,535 @@
 # scripts/verify_video.py
  
-from ultralytics import YOLO
-
 import cv2
-
+import functools
 import os
+import queue
+import threading
+import time
+from export_model import BACKENDS, load_model
+from model_server import ModelClient
+from multi_video import MultiVideoDecoder, expand_inputs, is_multi_input
+from run_metrics import StageTimers, write_report
+from video_writer import WRITER_BACKENDS, SegmentWriter, open_writer
+from video_utils import FramePool, FrameGate, RoiTracker, draw_detections, extract_detections, letterbox_frame, read_batch, unletterbox_detections
  
-def verify_text_in_video(video_path, model, output_message="This text verified", confidence_threshold=0.5):
-
+def _add_per_frame(timers, stage, start, frames):
+    # Record the time since start spread over the frames of a batch, so stages report per-frame latency
+    if timers is not None and frames:
+        timers.add(stage, (time.perf_counter() - start) / len(frames), count=len(frames))
+ 
+def _detect(model, frames, confidence_threshold, tracker=None, gate=None, decode_size=None, input_pool=None, timers=None):
     """
+    Detections of a batch of frames, through the frame-difference gate and the ROI tracker when given.
 
+    With decode_size set, the frames are letterboxed once to the model input size (into buffers of
+    input_pool if given) and the detections are mapped back to the original frames. With timers
+    set, the letterbox and infer stages are recorded per frame.
+    """
+    if decode_size:
+        start = time.perf_counter()
+        buffers = [input_pool.acquire() if input_pool else None for _ in frames]
+        letterboxed = [letterbox_frame(frame, decode_size, buffer) for frame, buffer in zip(frames, buffers)]
+        _add_per_frame(timers, "letterbox", start, frames)
+        detections = _detect(model, [image for image, _, _ in letterboxed], confidence_threshold, tracker, gate, timers=timers)
+        if input_pool:
+            input_pool.release(buffers)
+        return [unletterbox_detections(d, scale, pad, frame.shape) for d, frame, (_, scale, pad) in zip(detections, frames, letterboxed)]
+    if gate is not None:
+        return gate.detect(frames, lambda changed: _detect(model, changed, confidence_threshold, tracker, timers=timers))
+    start = time.perf_counter()
+    if tracker is not None:
+        detections = tracker.detect(model, frames, class_id=0, confidence_threshold=confidence_threshold)
+    else:
+        results = model(frames, verbose=False)
+        detections = extract_detections(results, class_id=0, confidence_threshold=confidence_threshold)
+        if timers is not None:
+            timers.add_ultralytics_speed(results)
+    _add_per_frame(timers, "infer", start, frames)
+    return detections
+ 
+def verify_text_in_video(video_path, model, output_message="This text verified", confidence_threshold=0.5, batch_size=1, roi=False, roi_imgsz=320, roi_rescan_every=30):
+    """
     Detect and verify specific text in a video.
  
     :param video_path: Path to the input video.
-
     :param model: Trained YOLOv8 model.
-
     :param output_message: Message to display when text is verified.
-
     :param confidence_threshold: Minimum confidence to consider detection valid.
-
+    :param batch_size: Number of consecutive frames passed to the model in one inference call.
+    :param roi: After a detection, infer on a window around it at roi_imgsz instead of the full frame.
+    :param roi_imgsz: Inference size of the ROI window.
+    :param roi_rescan_every: Frames between full-frame scans while a window is tracked.
     """
-
     cap = cv2.VideoCapture(video_path)
-
     if not cap.isOpened():
-
         print(f"Error: Could not open video {video_path}.")
-
         return
  
-    while True:
-
-        ret, frame = cap.read()
-
-        if not ret:
-
+    tracker = RoiTracker(roi_imgsz, rescan_every=roi_rescan_every) if roi else None
+    stop = False
+    while not stop:
+        frames = read_batch(cap, batch_size)
+        if not frames:
             break
  
-        # Perform inference
-
-        results = model(frame, verbose=False)
+        # Perform inference on the whole batch
+        detections = _detect(model, frames, confidence_threshold, tracker)
  
-        # Initialize detection flag
-
-        detected = False
- 
-        # Iterate through detections
-
-        for result in results:
-
-            boxes = result.boxes
-
-            for box in boxes:
-
-                class_id = int(box.cls[0])
-
-                confidence = box.conf[0]
-
-                if class_id == 0 and confidence >= confidence_threshold:
-
-                    detected = True
-
-                    # Draw bounding box
-
-                    box_coords = box.xyxy[0].cpu().numpy()
-
-                    x1, y1, x2, y2 = map(int, box_coords)
-
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-                    # Add class label and confidence
-
-                    label = f"{model.names[class_id]} {confidence:.2f}"
-
-                    cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
- 
-        if detected:
-
-            # Overlay the verification message on the frame
-
-            cv2.putText(frame, output_message, (50, 50),
-
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
- 
-        # Display the frame (optional)
-
-        cv2.imshow('Video Verification', frame)
-
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-
-            break
+        for frame, frame_detections in zip(frames, detections):
+            draw_detections(frame, frame_detections, model.names, output_message)
+            # Display the frame (optional)
+            cv2.imshow('Video Verification', frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                stop = True
+                break
  
     cap.release()
-
     cv2.destroyAllWindows()
-
     print("Verification completed.")
  
-def verify_and_save_video(input_video, output_video, model, output_message="This text verified", confidence_threshold=0.5):
+# Sentinel passed down the pipeline once the decoder reaches the end of the video
+_END_OF_STREAM = object()
 
+def _put(q, item, stop_event):
+    """
+    Block until the item is queued, giving up if the pipeline is shutting down.
+    """
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q, stop_event):
+    """
+    Block until an item is available, returning the end-of-stream sentinel on shutdown.
+    """
+    while not stop_event.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END_OF_STREAM
+
+def _run_stage(name, work, in_queue, out_queue, stop_event, errors):
     """
+    Run one pipeline stage until end of stream or shutdown.
+
+    :param name: Stage name used in error messages.
+    :param work: Callable applied to every item; its return value is passed downstream.
+                 When in_queue is None the stage is a source and work() is called with no
+                 arguments until it returns the end-of-stream sentinel.
+    :param in_queue: Queue to read items from, or None for the source stage.
+    :param out_queue: Queue to write results to, or None for the sink stage.
+    :param stop_event: Event set when any stage fails.
+    :param errors: List collecting (stage name, exception) pairs.
+    """
+    try:
+        while not stop_event.is_set():
+            if in_queue is None:
+                item = work()
+            else:
+                item = _get(in_queue, stop_event)
+                if item is not _END_OF_STREAM:
+                    item = work(item)
+
+            if out_queue is not None and not _put(out_queue, item, stop_event):
+                return
+            if item is _END_OF_STREAM:
+                return
+    except Exception as e:
+        errors.append((name, e))
+        stop_event.set()
+
+def _verify_and_save_video_pipelined(cap, write_frame, model, output_message, queue_size, batch_size, detect, pool=None, timers=None):
+    """
+    Run decode, inference, annotation and writing as separate threads connected by bounded queues.
 
+    Frames travel through the pipeline in batches of batch_size. Each stage is a single thread
+    reading from a FIFO queue, so frames leave the pipeline in the order they were decoded.
+    A full queue blocks the stage feeding it, and an error in any stage stops the whole
+    pipeline and is re-raised once all threads have exited.
+
+    :param write_frame: Function writing one annotated frame, called as write_frame(frame, detected).
+    :param detect: Function returning the detections of a batch of frames.
+    :param pool: FramePool the frames are decoded into; they are released after being written.
+    :param timers: StageTimers recording the decode, annotate and write stages per frame.
+    """
+    stop_event = threading.Event()
+    errors = []
+    decoded = queue.Queue(maxsize=queue_size)
+    inferred = queue.Queue(maxsize=queue_size)
+    annotated = queue.Queue(maxsize=queue_size)
+
+    def decode():
+        start = time.perf_counter()
+        frames = read_batch(cap, batch_size, pool)
+        _add_per_frame(timers, "decode", start, frames)
+        return frames if frames else _END_OF_STREAM
+
+    def infer(frames):
+        return frames, detect(frames)
+
+    def annotate(item):
+        frames, detections = item
+        start = time.perf_counter()
+        detected = [draw_detections(frame, frame_detections, model.names, output_message)
+                    for frame, frame_detections in zip(frames, detections)]
+        _add_per_frame(timers, "annotate", start, frames)
+        return frames, detected
+
+    def write(item):
+        frames, detected = item
+        start = time.perf_counter()
+        for frame, frame_detected in zip(frames, detected):
+            write_frame(frame, frame_detected)
+        _add_per_frame(timers, "write", start, frames)
+        if pool is not None:
+            pool.release(frames)
+        return frames
+
+    stages = [
+        ("decode", decode, None, decoded),
+        ("inference", infer, decoded, inferred),
+        ("annotate", annotate, inferred, annotated),
+        ("write", write, annotated, None),
+    ]
+    threads = [
+        threading.Thread(target=_run_stage, args=(name, work, in_q, out_q, stop_event, errors),
+                         name=f"verify-{name}", daemon=True)
+        for name, work, in_q, out_q in stages
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        name, error = errors[0]
+        raise RuntimeError(f"Pipeline stage '{name}' failed: {error}") from error
+
+def verify_and_save_video(input_video, output_video, model, output_message="This text verified", confidence_threshold=0.5, pipelined=False, queue_size=8, batch_size=1,
+                          roi=False, roi_imgsz=320, roi_rescan_every=30, gate=False, gate_threshold=0.5, gate_refresh_every=30, report_path=None,
+                          reuse_buffers=False, decode_size=None, writer='opencv', codec=None, preset='veryfast', crf=23,
+                          detections_only=False, segment_padding=15):
+    """
     Detect specific text in a video and save the annotated video.
- 
-    :param input_video: Path to the input video.
 
+    :param input_video: Path to the input video.
     :param output_video: Path to save the annotated output video.
-
     :param model: Trained YOLOv8 model.
-
     :param output_message: Message to display when text is verified.
-
     :param confidence_threshold: Minimum confidence to consider detection valid.
-
+    :param pipelined: Overlap decoding, inference, annotation and writing in separate threads.
+    :param queue_size: Maximum number of batches buffered between two pipeline stages.
+    :param batch_size: Number of consecutive frames passed to the model in one inference call.
+    :param roi: After a detection, infer on a window around it at roi_imgsz instead of the full frame,
+                see RoiTracker.
+    :param roi_imgsz: Inference size of the ROI window.
+    :param roi_rescan_every: Frames between full-frame scans while a window is tracked.
+    :param gate: Reuse the previous detections for frames that barely differ from the last inferred
+                 frame instead of running the model, see FrameGate.
+    :param gate_threshold: Mean absolute signature difference (0-255) from which a frame is inferred.
+    :param gate_refresh_every: Maximum number of consecutive frames reusing detections.
+    :param report_path: Write a JSON run report with the per-frame decode, letterbox, infer, annotate
+                        and write timings, frame counts and skip rate.
+    :param reuse_buffers: Decode into a pool of preallocated frames instead of a new array per frame.
+    :param decode_size: Letterbox every frame once to this model input size before inference;
+                        only the boxes that are drawn are mapped back to the full-size frame.
+    :param writer: 'opencv' to encode on the calling thread, 'threaded' to encode with OpenCV on a
+                   background thread, or 'ffmpeg' to pipe the frames into an ffmpeg subprocess.
+    :param codec: FourCC for the OpenCV writers (default: mp4v) or ffmpeg encoder (default: libx264).
+    :param preset: ffmpeg encoder preset.
+    :param crf: ffmpeg constant rate factor.
+    :param detections_only: Write only the segments with detections, each to its own file named
+                            after output_video with the first frame number appended.
+    :param segment_padding: Frames kept before and after the detections of a segment.
+    :return: Run report, or None if the video could not be opened.
     """
-
     cap = cv2.VideoCapture(input_video)
-
     if not cap.isOpened():
-
         print(f"Error: Could not open video {input_video}.")
-
         return
- 
-    # Get video properties
 
+    # Get video properties
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
     fps = cap.get(cv2.CAP_PROP_FPS)
- 
-    # Define the codec and create VideoWriter object
-
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # You can use other codecs like 'XVID', 'MJPG', etc.
-
-    out = cv2.VideoWriter(output_video, fourcc, fps, (width, height))
- 
-    while True:
-
-        ret, frame = cap.read()
-
-        if not ret:
-
-            break
- 
-        # Perform inference
-
-        results = model(frame, verbose=False)
- 
-        # Initialize detection flag
-
-        detected = False
- 
-        # Iterate through detections
-
-        for result in results:
-
-            boxes = result.boxes
-
-            for box in boxes:
-
-                class_id = int(box.cls[0])
-
-                confidence = box.conf[0]
-
-                if class_id == 0 and confidence >= confidence_threshold:
-
-                    detected = True
-
-                    # Draw bounding box
-
-                    box_coords = box.xyxy[0].cpu().numpy()
-
-                    x1, y1, x2, y2 = map(int, box_coords)
-
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-                    # Add class label and confidence
-
-                    label = f"{model.names[class_id]} {confidence:.2f}"
-
-                    cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
- 
-        if detected:
-
-            # Overlay the verification message on the frame
 
-            cv2.putText(frame, output_message, (50, 50),
+    # Create the video writer, or one writer per segment with detections
+    open_video = functools.partial(open_writer, fps=fps, size=(width, height), backend=writer, codec=codec, preset=preset, crf=crf)
+    if detections_only:
+        out = SegmentWriter(output_video, open_video, padding=segment_padding)
 
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
- 
-        # Write the frame to the output video
-
-        out.write(frame)
+        def write_frame(frame, detected):
+            out.write(frame, detected)
+    else:
+        out = open_video(output_video)
+
+        def write_frame(frame, detected):
+            out.write(frame)
+
+    tracker = RoiTracker(roi_imgsz, rescan_every=roi_rescan_every) if roi else None
+    frame_gate = FrameGate(gate_threshold, refresh_every=gate_refresh_every) if gate else None
+    timers = StageTimers()
+
+    # Every batch in the pipeline queues and stages may hold frames at the same time
+    in_flight = batch_size * (3 * queue_size + 4) if pipelined else batch_size
+    pool = FramePool((height, width, 3), in_flight) if reuse_buffers else None
+    input_pool = FramePool((decode_size, decode_size, 3), batch_size, fill=114) if reuse_buffers and decode_size else None
+    detect = functools.partial(_detect, model, confidence_threshold=confidence_threshold, tracker=tracker, gate=frame_gate,
+                               decode_size=decode_size, input_pool=input_pool, timers=timers)
+
+    try:
+        if pipelined:
+            _verify_and_save_video_pipelined(cap, write_frame, model, output_message, queue_size, batch_size, detect, pool, timers)
+        else:
+            while True:
+                start = time.perf_counter()
+                frames = read_batch(cap, batch_size, pool)
+                if not frames:
+                    break
+                _add_per_frame(timers, "decode", start, frames)
+
+                # Perform inference on the whole batch
+                detections = detect(frames)
+
+                start = time.perf_counter()
+                detected = [draw_detections(frame, frame_detections, model.names, output_message)
+                            for frame, frame_detections in zip(frames, detections)]
+                _add_per_frame(timers, "annotate", start, frames)
+
+                # Write the frames to the output video
+                start = time.perf_counter()
+                for frame, frame_detected in zip(frames, detected):
+                    write_frame(frame, frame_detected)
+                _add_per_frame(timers, "write", start, frames)
+
+                if pool is not None:
+                    pool.release(frames)
+    finally:
+        cap.release()
+        out.release()
+
+    report = timers.report(video=input_video, output=output_video, batch_size=batch_size, writer=writer)
+    print(timers.summary_line())
+    if detections_only:
+        report["segments"] = out.segments
+        print(f"Wrote {len(out.segments)} segments with detections")
+    if frame_gate is not None:
+        report["gate"] = frame_gate.summary()
+        print(f"Gate: skipped inference on {report['gate']['frames_skipped']}/{report['gate']['frames']} frames "
+              f"({report['gate']['skip_rate']:.0%})")
+    if tracker is not None:
+        report["roi"] = summary = tracker.summary()
+        print(f"ROI: {summary['frames_roi']} frames on the window, {summary['frames_full']} on the full frame, "
+              f"{summary['pixel_ratio']:.0%} of the pixels inferred")
+    if report_path:
+        write_report(report, report_path)
+        print(f"Run report written to {report_path}")
+
+    if not detections_only:
+        print(f"Output video saved to {output_video}")
+    return report
+
+
+def _output_paths(paths, output_dir):
+    # Keep the paths relative to the common directory of the inputs, so videos with the same file
+    # name in different directories do not overwrite each other
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths]) if paths else ""
+    return [os.path.join(output_dir, os.path.relpath(os.path.abspath(path), root)) for path in paths]
  
-    cap.release()
-
-    out.release()
-
-    print(f"Output video saved to {output_video}")
+def verify_and_save_videos(inputs, output_dir, model, output_message="This text verified", confidence_threshold=0.5, batch_size=8, decoders=4, queue_size=64,
+                           writer='opencv', codec=None, preset='veryfast', crf=23):
+    """
+    Detect specific text in several videos with one shared model and save the annotated videos.
+
+    The videos are decoded on parallel threads and their frames merged into shared inference
+    batches. A video that cannot be read, written or inferred on is reported as failed without
+    stopping the others.
+
+    :param inputs: Video paths, or a single video file, directory or glob pattern.
+    :param output_dir: Directory to save the annotated videos to, at their paths relative to the
+                       common directory of the inputs, or None to only report the detections.
+    :param batch_size: Frames per inference call, taken from any of the videos.
+    :param decoders: Number of videos decoded at the same time.
+    :param queue_size: Decoded frames buffered ahead of inference.
+    :param writer: Video writer backend, see video_writer.open_writer.
+    :param codec: FourCC for the OpenCV writers (default: mp4v) or ffmpeg encoder (default: libx264).
+    :param preset: ffmpeg encoder preset.
+    :param crf: ffmpeg constant rate factor.
+    :return: Dictionary per video path with frames, frames_detected, first_frame and first_time_s
+             of the first detection, output path and error.
+    """
+    paths = expand_inputs(inputs) if isinstance(inputs, str) else list(inputs)
+    results = [{"frames": 0, "frames_detected": 0, "first_frame": None, "first_time_s": None, "output": None, "error": None} for _ in paths]
+    writers = {}
+    fps = {}
+    failed = set()
+
+    def fail(index, error):
+        failed.add(index)
+        decoder.stop(index)
+        results[index]["error"] = error
+        if index in writers:
+            writers.pop(index).release()
+        print(f"{paths[index]}: failed ({error})")
+
+    output_paths = _output_paths(paths, output_dir) if output_dir else []
+    for output_video in output_paths:
+        os.makedirs(os.path.dirname(output_video), exist_ok=True)
+
+    try:
+        with MultiVideoDecoder(paths, batch_size, decoders, queue_size) as decoder:
+            for kind, index, payload in decoder:
+                if kind == "start":
+                    fps[index] = payload["fps"]
+                    if output_dir:
+                        output_video = output_paths[index]
+                        try:
+                            writers[index] = open_writer(output_video, payload["fps"], (payload["width"], payload["height"]),
+                                                         backend=writer, codec=codec, preset=preset, crf=crf)
+                        except Exception as e:
+                            fail(index, f"{type(e).__name__}: {e}")
+                            continue
+                        results[index]["output"] = output_video
+                elif kind == "end":
+                    if index in writers:
+                        writers.pop(index).release()
+                        print(f"Output video saved to {results[index]['output']}")
+                elif kind == "error":
+                    fail(index, payload)
+                elif kind == "batch":
+                    items = [item for item in payload if item[0] not in failed]
+                    if not items:
+                        continue
+                    try:
+                        detections = extract_detections(model([frame for _, _, frame in items], verbose=False),
+                                                        class_id=0, confidence_threshold=confidence_threshold)
+                    except Exception as e:
+                        for video in {index for index, _, _ in items}:
+                            fail(video, f"{type(e).__name__}: {e}")
+                        continue
+
+                    for (index, frame_number, frame), frame_detections in zip(items, detections):
+                        if index in failed:
+                            continue
+                        result = results[index]
+                        result["frames"] = frame_number
+                        if draw_detections(frame, frame_detections, model.names, output_message):
+                            result["frames_detected"] += 1
+                            if result["first_frame"] is None:
+                                result["first_frame"] = frame_number
+                                result["first_time_s"] = (frame_number - 1) / fps[index] if fps.get(index) else None
+                        if index in writers:
+                            try:
+                                writers[index].write(frame)
+                            except Exception as e:
+                                fail(index, f"{type(e).__name__}: {e}")
+    finally:
+        for video_writer in writers.values():
+            video_writer.release()
+
+    return dict(zip(paths, results))
  
 if __name__ == "__main__":
-
     import argparse
  
     parser = argparse.ArgumentParser(description="Verify and annotate video with detected text.")
-
-    parser.add_argument("--input", type=str, required=True, help="Path to the input video.")
-
-    parser.add_argument("--output", type=str, required=False, help="Path to save the annotated video.")
-
+    parser.add_argument("--input", type=str, required=True, help="Path to the input video, or a directory or glob pattern of videos to verify with one shared model.")
+    parser.add_argument("--output", type=str, required=False, help="Path to save the annotated video (a directory when --input holds several videos).")
     parser.add_argument("--model", type=str, required=True, help="Path to the trained YOLOv8 model.")
-
     parser.add_argument("--save", action='store_true', help="Flag to save the annotated video.")
-
+    parser.add_argument("--pipelined", action='store_true', help="Run decoding, inference, annotation and writing as overlapping pipeline stages.")
+    parser.add_argument("--queue_size", type=int, default=8, help="Batches buffered between pipeline stages (default: 8).")
+    parser.add_argument("--batch_size", type=int, default=1, help="Frames per inference call (default: 1).")
+    parser.add_argument("--backend", type=str, choices=BACKENDS, default='pytorch', help="Inference runtime; a .pt model is exported to ONNX or OpenVINO on first use (default: pytorch).")
+    parser.add_argument("--int8", action='store_true', help="Use an INT8 model calibrated on the val split of --data (onnx and openvino only).")
+    parser.add_argument("--data", type=str, default="../dataset/data.yaml", help="data.yaml used to calibrate INT8 exports.")
+    parser.add_argument("--server", type=str, default=None, help="URL of a running model_server.py to send frames to instead of loading the model here, e.g. http://127.0.0.1:8765.")
+    parser.add_argument("--roi", action='store_true', help="After a detection, infer on a window around it instead of the full frame.")
+    parser.add_argument("--roi_imgsz", type=int, default=320, help="Inference size of the ROI window (default: 320).")
+    parser.add_argument("--roi_rescan_every", type=int, default=30, help="Frames between full-frame scans while tracking a window (default: 30).")
+    parser.add_argument("--gate", action='store_true', help="Skip inference on frames that barely differ from the last inferred frame.")
+    parser.add_argument("--gate_threshold", type=float, default=0.5, help="Mean absolute difference (0-255) of the downscaled frames from which a frame is inferred (default: 0.5).")
+    parser.add_argument("--gate_refresh_every", type=int, default=30, help="Maximum consecutive frames reusing detections (default: 30).")
+    parser.add_argument("--reuse_buffers", action='store_true', help="Decode into a pool of preallocated frame buffers.")
+    parser.add_argument("--decode_size", type=int, default=None, help="Letterbox frames once to this model input size right after decoding (e.g. 640).")
+    parser.add_argument("--writer", type=str, choices=WRITER_BACKENDS, default='opencv', help="Video writer: opencv (synchronous), threaded (OpenCV on a background thread) or ffmpeg (pipe into ffmpeg) (default: opencv).")
+    parser.add_argument("--codec", type=str, default=None, help="FourCC for the OpenCV writers (default: mp4v) or ffmpeg encoder (default: libx264).")
+    parser.add_argument("--preset", type=str, default='veryfast', help="ffmpeg encoder preset (default: veryfast).")
+    parser.add_argument("--crf", type=int, default=23, help="ffmpeg constant rate factor (default: 23).")
+    parser.add_argument("--detections_only", action='store_true', help="Write only the segments containing detections, one file per segment.")
+    parser.add_argument("--segment_padding", type=int, default=15, help="Frames kept before and after the detections of a segment (default: 15).")
+    parser.add_argument("--report", type=str, default=None, help="Path to write a JSON run report.")
+    parser.add_argument("--decoders", type=int, default=4, help="Videos decoded in parallel when --input is a directory or glob (default: 4).")
     args = parser.parse_args()
  
     # Load the trained model
-
-    model = YOLO(args.model)
+    if args.server:
+        model = ModelClient(args.model, url=args.server)
+    else:
+        model = load_model(args.model, backend=args.backend, int8=args.int8, data=args.data)
  
-    if args.save and args.output:
-
+    if is_multi_input(args.input):
+        results = verify_and_save_videos(
+            inputs=args.input,
+            output_dir=args.output if args.save else None,
+            model=model,
+            output_message="This text verified",
+            confidence_threshold=0.5,
+            batch_size=args.batch_size,
+            decoders=args.decoders,
+            writer=args.writer,
+            codec=args.codec,
+            preset=args.preset,
+            crf=args.crf
+        )
+        for path, result in results.items():
+            if result["error"]:
+                print(f"{path}: error ({result['error']})")
+            elif result["first_frame"] is not None:
+                time_s = f" at {result['first_time_s']:.2f}s" if result["first_time_s"] is not None else ""
+                print(f"{path}: first detection in frame {result['first_frame']}{time_s}, {result['frames_detected']}/{result['frames']} frames with detections")
+            else:
+                print(f"{path}: no detections in {result['frames']} frames")
+    elif args.save and args.output:
         verify_and_save_video(
-
             input_video=args.input,
-
             output_video=args.output,
-
             model=model,
-
             output_message="This text verified",
-
-            confidence_threshold=0.5
-
+            confidence_threshold=0.5,
+            pipelined=args.pipelined,
+            queue_size=args.queue_size,
+            batch_size=args.batch_size,
+            roi=args.roi,
+            roi_imgsz=args.roi_imgsz,
+            roi_rescan_every=args.roi_rescan_every,
+            gate=args.gate,
+            gate_threshold=args.gate_threshold,
+            gate_refresh_every=args.gate_refresh_every,
+            report_path=args.report,
+            reuse_buffers=args.reuse_buffers,
+            decode_size=args.decode_size,
+            writer=args.writer,
+            codec=args.codec,
+            preset=args.preset,
+            crf=args.crf,
+            detections_only=args.detections_only,
+            segment_padding=args.segment_padding
         )
-
     else:
-
         verify_text_in_video(
-
             video_path=args.input,
-
             model=model,
-
             output_message="This text verified",
-
-            confidence_threshold=0.5
-
+            confidence_threshold=0.5,
+            batch_size=args.batch_size,
+            roi=args.roi,
+            roi_imgsz=args.roi_imgsz,
+            roi_rescan_every=args.roi_rescan_every
         )
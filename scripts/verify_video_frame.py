@@ -1,13 +1,234 @@
 # # scripts/verify_video.py
 
-from ultralytics import YOLO
 import cv2
 import os
 import sys
 import time
 import torch  # Import torch to check for CUDA availability
+
+from export_model import BACKENDS, load_model
+from model_server import ModelClient
+from multi_video import MultiVideoDecoder, expand_inputs
+from run_metrics import StageTimers, write_report
+from video_utils import FramePool, draw_detections, extract_detections, letterbox_frame, unletterbox_detections
+ 
+# Stop scanning once the video position passes this point
+MAX_PROCESSING_MS = 3 * 60 * 1000  # 3 minutes in milliseconds
+ 
+def _infer(model, frames, stats, timers, summary_every=0):
+    """
+    Run inference on a batch of frames, record the per-image stage times reported by the model
+    and count the frames in the search statistics.
+
+    :param summary_every: Print a latency summary every this many inferred frames (0 disables it).
+    """
+    results = model(frames, verbose=False)
+    timers.add_ultralytics_speed(results)
+
+    before = stats["frames_inferred"]
+    stats["frames_inferred"] += len(frames)
+    if summary_every and before // summary_every != stats["frames_inferred"] // summary_every:
+        print(f"[{stats['frames_inferred']} frames inferred] {timers.summary_line()}")
+    return results
+ 
+def _scan(results, confidence_threshold, timers):
+    """
+    Return the highest-confidence valid detection (x1, y1, x2, y2, confidence, class) of every frame
+    in a batch, or None for frames without one, timing it per frame as the filter stage.
+    """
+    start = time.perf_counter()
+    detections = [d[0] if len(d) else None for d in extract_detections(results, class_id=0, confidence_threshold=confidence_threshold)]
+    if detections:
+        timers.add("filter", (time.perf_counter() - start) / len(detections), count=len(detections))
+    return detections
+ 
+def _linear_search(cap, model, confidence_threshold, batch_size, total_frames, stats, timers, summary_every=0, pool=None, decode_size=None):
+    """
+    Run inference on every frame in order until the first detection.
+
+    :param pool: FramePool to decode into; the frames of a batch are released once it has no detection.
+    :param decode_size: Letterbox the frames once to this model input size before inference and map
+                        only the detected box back to the full-size frame.
+    :return: (frame_number, frame, detection) of the first detecting frame, or None.
+    """
+    inputs_pool = FramePool((decode_size, decode_size, 3), batch_size, fill=114) if decode_size and pool is not None else None
+    frame_count = 0
+    reached_end = False
+    while not reached_end:
+        # Collect the next batch of frames, stopping at the end of the video or the 3-minute mark
+        frames = []
+        while len(frames) < batch_size:
+            buffer = pool.acquire() if pool is not None else None
+            with timers.time("decode"):
+                ret, frame = cap.read(buffer)
+            if not ret:
+                if pool is not None:
+                    pool.release([buffer])
+                print("End of video reached or cannot read frame.")
+                reached_end = True
+                break
+            if pool is not None and frame is not buffer:
+                # The decoder returned a different size than the pool was made for
+                pool.release([buffer])
+ 
+            # Check if the current video position exceeds 3 minutes
+            current_time_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+            if current_time_ms > MAX_PROCESSING_MS:
+                print("Reached the 3-minute mark. Stopping further processing.")
+                reached_end = True
+                break
+ 
+            frame_count += 1
+            stats["frames_decoded"] += 1
+            stats["last_frame"] = frame_count
+ 
+            if frame_count % 100 == 0:
+                print(f"Processing frame {frame_count}/{total_frames}")
+ 
+            frames.append(frame)
+ 
+        if not frames:
+            break
+ 
+        first_frame_number = frame_count - len(frames) + 1
+ 
+        letterboxed = None
+        if decode_size:
+            buffers = [inputs_pool.acquire() if inputs_pool is not None else None for _ in frames]
+            with timers.time("letterbox"):
+                letterboxed = [letterbox_frame(frame, decode_size, buffer) for frame, buffer in zip(frames, buffers)]
+ 
+        # Perform inference on the whole batch
+        results = _infer(model, [image for image, _, _ in letterboxed] if letterboxed else frames, stats, timers, summary_every)
+        if inputs_pool is not None:
+            inputs_pool.release(buffers)
+ 
+        # Walk the batch in frame order so the earliest detecting frame is reported
+        for offset, (frame, detection) in enumerate(zip(frames, _scan(results, confidence_threshold, timers))):
+            if detection is not None:
+                if letterboxed:
+                    _, scale, pad = letterboxed[offset]
+                    detection = unletterbox_detections(detection[None], scale, pad, frame.shape)[0]
+                return first_frame_number + offset, frame, detection
+ 
+        if pool is not None:
+            pool.release(frames)
+ 
+    return None
+ 
+def _coarse_to_fine_search(cap, model, confidence_threshold, batch_size, coarse_stride, refine_window, stats, timers, summary_every=0):
+    """
+    Sample every coarse_stride-th frame until the first detection, then refine backwards from the hit.
+
+    Frames between samples are skipped with cap.grab(), which avoids the colour conversion and copy
+    of cap.read(). The refinement re-reads up to refine_window frames before the hit (never further
+    back than the previous, non-detecting, sample) and runs inference on them from the hit backwards,
+    stopping at the first frame without a detection. This assumes the text stays on screen once it
+    appears, which holds for the status labels this project verifies.
+
+    :return: (frame_number, frame, detection) of the first detecting frame, or None.
+    """
+    frame_number = 0
+    last_sampled = 0
+    reached_end = False
+    hit = None
+    while hit is None and not reached_end:
+        samples = []
+        while len(samples) < batch_size:
+            # Skip ahead to the next sampled frame; the first frame of the video is always sampled
+            if frame_number > 0:
+                for _ in range(coarse_stride - 1):
+                    with timers.time("decode"):
+                        grabbed = cap.grab()
+                    if not grabbed:
+                        print("End of video reached or cannot read frame.")
+                        reached_end = True
+                        break
+                    if cap.get(cv2.CAP_PROP_POS_MSEC) > MAX_PROCESSING_MS:
+                        print("Reached the 3-minute mark. Stopping further processing.")
+                        reached_end = True
+                        break
+                    frame_number += 1
+                    stats["frames_decoded"] += 1
+                    # Skipped frames count towards the frames a linear scan would have covered
+                    stats["last_frame"] = frame_number
+                if reached_end:
+                    break
+ 
+            with timers.time("decode"):
+                ret, frame = cap.read()
+            if not ret:
+                print("End of video reached or cannot read frame.")
+                reached_end = True
+                break
+ 
+            if cap.get(cv2.CAP_PROP_POS_MSEC) > MAX_PROCESSING_MS:
+                print("Reached the 3-minute mark. Stopping further processing.")
+                reached_end = True
+                break
+ 
+            frame_number += 1
+            stats["frames_decoded"] += 1
+            stats["last_frame"] = frame_number
+            samples.append((frame_number, frame))
+            last_sampled = frame_number
+ 
+        if reached_end and frame_number > last_sampled:
+            # The video ended between two samples; sample its last frame so the tail is not missed
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
+            with timers.time("decode"):
+                ret, frame = cap.read()
+            if ret:
+                stats["frames_decoded"] += 1
+                samples.append((frame_number, frame))
+                last_sampled = frame_number
+ 
+        if not samples:
+            break
+ 
+        results = _infer(model, [frame for _, frame in samples], stats, timers, summary_every)
+        for (number, frame), detection in zip(samples, _scan(results, confidence_threshold, timers)):
+            if detection is not None:
+                hit = (number, frame, detection)
+                break
  
-def verify_and_save_frame(input_video, model, save_frame_dir, output_message="This text verified", confidence_threshold=0.5):
+    if hit is None:
+        return None
+ 
+    # The previous sample had no detection, so the first detecting frame lies after it (the window
+    # may reach back past it when the hit is the last frame, which the refinement handles)
+    hit_number = hit[0]
+    window_start = max(hit_number - coarse_stride + 1, hit_number - refine_window, 1)
+    if window_start >= hit_number:
+        return hit
+ 
+    print(f"Coarse hit at frame {hit_number}. Refining frames {window_start}-{hit_number - 1}.")
+    cap.set(cv2.CAP_PROP_POS_FRAMES, window_start - 1)
+    window = []
+    for number in range(window_start, hit_number):
+        with timers.time("decode"):
+            ret, frame = cap.read()
+        if not ret:
+            break
+        stats["frames_decoded"] += 1
+        window.append((number, frame))
+ 
+    first = hit
+    end = len(window)
+    while end > 0:
+        chunk = window[max(end - batch_size, 0):end]
+        results = _infer(model, [frame for _, frame in chunk], stats, timers, summary_every)
+        for (number, frame), detection in reversed(list(zip(chunk, _scan(results, confidence_threshold, timers)))):
+            if detection is None:
+                return first
+            first = (number, frame, detection)
+        end -= len(chunk)
+ 
+    return first
+ 
+def verify_and_save_frame(input_video, model, save_frame_dir, output_message="This text verified", confidence_threshold=0.5, batch_size=1,
+                          search="linear", coarse_stride=30, refine_window=None, report_path=None, summary_every=0,
+                          reuse_buffers=False, decode_size=None):
     """
     Detect specific text in a video, save the specific frame where detection occurred,
     and print the time taken for processing.
@@ -17,7 +238,27 @@ def verify_and_save_frame(input_video, model, save_frame_dir, output_message="Th
     :param model: Trained YOLOv8 model.
     :param output_message: Message to display when text is verified.
     :param confidence_threshold: Minimum confidence to consider detection valid.
+    :param batch_size: Number of consecutive frames passed to the model in one inference call.
+                       Detection still stops at the first detecting frame within a batch.
+    :param search: "linear" to run inference on every frame, or "coarse" to sample every
+                   coarse_stride-th frame and refine backwards around the first hit.
+    :param coarse_stride: Distance in frames between samples of the coarse search.
+    :param refine_window: Maximum number of frames before the coarse hit re-examined during
+                          refinement (default: coarse_stride - 1, which finds the exact first frame).
+    :param report_path: Write a JSON run report with p50/p95/p99 latencies of the decode,
+                        preprocess, inference, postprocess, filter and I/O stages and the peak RSS.
+    :param summary_every: Print a latency summary every this many inferred frames (0 disables it).
+    :param reuse_buffers: Decode into a pool of batch_size preallocated frames (linear search only).
+    :param decode_size: Letterbox frames once to this model input size before inference (linear
+                        search only); only the detected box is mapped back to the full-size frame.
+    :return: Dictionary with the detected frame number and box, saved image path, frame counts and the
+             run report, or None if the video could not be opened.
     """
+    if search not in ("linear", "coarse"):
+        raise ValueError(f"Unknown search strategy: {search}")
+    if refine_window is None:
+        refine_window = coarse_stride - 1
+ 
     start_time = time.time()
  
     cap = cv2.VideoCapture(input_video)
@@ -25,82 +266,40 @@ def verify_and_save_frame(input_video, model, save_frame_dir, output_message="Th
         print(f"Error: Could not open video {input_video}.")
         return
  
-    frame_count = 0
     detected = False
     detected_frame_number = 0
     detected_frame_image_path = ""
+    stats = {"frames_decoded": 0, "frames_inferred": 0, "last_frame": 0}
+    timers = StageTimers()
  
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     print(f"Total frames in video: {total_frames}")
  
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("End of video reached or cannot read frame.")
-            break
- 
-        # Check if the current video position exceeds 3 minutes
-        current_time_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
-        if current_time_ms > 3 * 60 * 1000:  # 3 minutes in milliseconds
-            print("Reached the 3-minute mark. Stopping further processing.")
-            break
- 
-        frame_count += 1
- 
-        if frame_count % 100 == 0:
-            print(f"Processing frame {frame_count}/{total_frames}")
- 
-        frame_start_time = time.time()
- 
-        # Perform inference
-        results = model(frame)
- 
-        frame_end_time = time.time()
-        frame_elapsed_time = frame_end_time - frame_start_time
-        print(f"Frame {frame_count} processed in {frame_elapsed_time:.2f} seconds")
- 
-        # Iterate through detections
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                class_id = int(box.cls[0])
-                confidence = box.conf[0]
-                if class_id == 0 and confidence >= confidence_threshold:
-                    detected = True
-                    detected_frame_number = frame_count
- 
-                    # Draw bounding box
-                    box_coords = box.xyxy[0].cpu().numpy()
-                    x1, y1, x2, y2 = map(int, box_coords)
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
- 
-                    # Add class label and confidence
-                    label = f"{model.names[class_id]} {confidence:.2f}"
-                    cv2.putText(frame, label, (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
- 
-                    # Overlay the verification message on the frame
-                    cv2.putText(frame, output_message, (50, 50),
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
- 
-                    # Save the detected frame as an image
-                    if not os.path.exists(save_frame_dir):
-                        os.makedirs(save_frame_dir)
-                        print(f"Created directory for detected frames: {save_frame_dir}")
+    if search == "coarse":
+        print(f"Coarse-to-fine search (stride {coarse_stride}, refine window {refine_window}).")
+        hit = _coarse_to_fine_search(cap, model, confidence_threshold, batch_size, coarse_stride, refine_window, stats, timers, summary_every)
+    else:
+        height, width = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        pool = FramePool((height, width, 3), batch_size) if reuse_buffers else None
+        hit = _linear_search(cap, model, confidence_threshold, batch_size, total_frames, stats, timers, summary_every, pool, decode_size)
  
-                    detected_frame_image_path = os.path.join(
-                        save_frame_dir, f"detected_frame_{detected_frame_number}.png")
-                    cv2.imwrite(detected_frame_image_path, frame)
-                    print(f"Detected text in frame {detected_frame_number}. Saved frame image to {detected_frame_image_path}.")
+    if hit is not None:
+        detected = True
+        detected_frame_number, frame, detection = hit
  
-                    # Terminate processing
-                    break  # Exit the boxes loop
+        # Draw the bounding box, class label and confidence, and overlay the verification message
+        draw_detections(frame, detection[None], model.names, output_message)
  
-            if detected:
-                break  # Exit the results loop
+        # Save the detected frame as an image
+        if not os.path.exists(save_frame_dir):
+            os.makedirs(save_frame_dir)
+            print(f"Created directory for detected frames: {save_frame_dir}")
  
-        if detected:
-            break  # Exit the frame processing loop
+        detected_frame_image_path = os.path.join(
+            save_frame_dir, f"detected_frame_{detected_frame_number}.png")
+        with timers.time("io"):
+            cv2.imwrite(detected_frame_image_path, frame)
+        print(f"Detected text in frame {detected_frame_number}. Saved frame image to {detected_frame_image_path}.")
  
     cap.release()
     print("Video capture released.")
@@ -109,24 +308,147 @@ def verify_and_save_frame(input_video, model, save_frame_dir, output_message="Th
     elapsed_time = end_time - start_time
     print(f"Time taken for processing: {elapsed_time:.2f} seconds")
  
+    # A linear scan decodes and infers every frame up to the detection (or up to where the search stopped)
+    linear_frames = detected_frame_number if detected else stats["last_frame"]
+    print(f"Frames decoded: {stats['frames_decoded']}, frames inferred: {stats['frames_inferred']} "
+          f"(linear scan: {linear_frames} decoded and inferred)")
+ 
+    report = timers.report(
+        video=input_video,
+        search=search,
+        batch_size=batch_size,
+        detected_frame=detected_frame_number if detected else None,
+        frames_decoded=stats["frames_decoded"],
+        frames_inferred=stats["frames_inferred"],
+        linear_frames=linear_frames,
+    )
+    if report_path:
+        write_report(report, report_path)
+        print(f"Run report written to {report_path}")
+ 
     if detected:
         print(f"\nText was verified in frame {detected_frame_number}.")
         print(f"Detected frame image saved to: {detected_frame_image_path}")
     else:
         print("\nFrame not detected.")
  
+    return {
+        "detected": detected,
+        "frame_number": detected_frame_number if detected else None,
+        "detection": hit[2].tolist() if detected else None,
+        "image_path": detected_frame_image_path or None,
+        "frames_decoded": stats["frames_decoded"],
+        "frames_inferred": stats["frames_inferred"],
+        "linear_frames": linear_frames,
+        "elapsed": elapsed_time,
+        "report": report,
+    }
+ 
+def verify_videos(inputs, model, save_frame_dir, output_message="This text verified", confidence_threshold=0.5, batch_size=8,
+                  decoders=4, queue_size=64):
+    """
+    Find the first detecting frame of several videos with one shared model.
+
+    The videos are decoded on parallel threads and their frames merged into shared inference
+    batches. A video stops being decoded at its first detection, and a video that cannot be
+    read or fails during inference is reported without stopping the others.
+
+    :param inputs: Video paths, or a single video file, directory or glob pattern.
+    :param save_frame_dir: Directory to save the detected frame images to.
+    :param batch_size: Frames per inference call, taken from any of the videos.
+    :param decoders: Number of videos decoded at the same time.
+    :param queue_size: Decoded frames buffered ahead of inference.
+    :return: Dictionary per video path with detected, frame_number, time_s (position of the detection
+             in the video), detection, image_path, frames_decoded, detected_after_s (wall time from the
+             start of the run) and error.
+    """
+    paths = expand_inputs(inputs) if isinstance(inputs, str) else list(inputs)
+    start_time = time.time()
+    results = [{"detected": False, "frame_number": None, "time_s": None, "detection": None, "image_path": None,
+                "frames_decoded": 0, "detected_after_s": None, "error": None} for _ in paths]
+    fps = {}
+    finished = set()
+
+    def finish(index, error=None):
+        finished.add(index)
+        decoder.stop(index)
+        if error:
+            results[index]["error"] = error
+            print(f"{paths[index]}: failed ({error})")
+
+    with MultiVideoDecoder(paths, batch_size, decoders, queue_size, max_ms=MAX_PROCESSING_MS) as decoder:
+        for kind, index, payload in decoder:
+            if kind == "start":
+                fps[index] = payload["fps"] or None
+            elif kind == "end":
+                results[index]["frames_decoded"] = payload
+                finished.add(index)
+            elif kind == "error":
+                finish(index, payload)
+            elif kind == "batch":
+                items = [item for item in payload if item[0] not in finished]
+                if not items:
+                    continue
+                try:
+                    detections = extract_detections(model([frame for _, _, frame in items], verbose=False),
+                                                    class_id=0, confidence_threshold=confidence_threshold)
+                except Exception as e:
+                    for video in {index for index, _, _ in items}:
+                        finish(video, f"{type(e).__name__}: {e}")
+                    continue
+
+                for (index, frame_number, frame), detection in zip(items, detections):
+                    if index in finished or not len(detection):
+                        continue
+                    result = results[index]
+                    try:
+                        draw_detections(frame, detection[:1], model.names, output_message)
+                        os.makedirs(save_frame_dir, exist_ok=True)
+                        stem = os.path.splitext(os.path.basename(paths[index]))[0]
+                        image_path = os.path.join(save_frame_dir, f"{stem}_detected_frame_{frame_number}.png")
+                        cv2.imwrite(image_path, frame)
+                    except Exception as e:
+                        finish(index, f"{type(e).__name__}: {e}")
+                        continue
+                    result.update({
+                        "detected": True,
+                        "frame_number": frame_number,
+                        "time_s": (frame_number - 1) / fps[index] if fps.get(index) else None,
+                        "detection": detection[0].tolist(),
+                        "image_path": image_path,
+                        "detected_after_s": time.time() - start_time,
+                    })
+                    finish(index)
+                    print(f"{paths[index]}: text verified in frame {frame_number}")
+
+    return dict(zip(paths, results))
+ 
 if __name__ == "__main__":
     import argparse
  
     parser = argparse.ArgumentParser(description="Verify video frames for specific text and save the detected frame if found.")
-    parser.add_argument("--input", type=str, required=True, help="Path to the input video.")
-    parser.add_argument("--model", type=str, required=True, help="Path to the trained YOLOv8 model (.pt file).")
+    parser.add_argument("--input", type=str, required=True, help="Path to the input video, or a directory or glob pattern of videos to verify with one shared model.")
+    parser.add_argument("--model", type=str, required=True, help="Path to the trained YOLOv8 model (.pt file, exported .onnx file or OpenVINO directory).")
     parser.add_argument("--confidence", type=float, default=0.95, help="Confidence threshold for detections (default: 0.5).")
+    parser.add_argument("--batch_size", type=int, default=1, help="Frames per inference call (default: 1).")
+    parser.add_argument("--search", type=str, choices=["linear", "coarse"], default="linear", help="First-detection search strategy (default: linear).")
+    parser.add_argument("--coarse_stride", type=int, default=30, help="Frames between samples in coarse search (default: 30).")
+    parser.add_argument("--refine_window", type=int, default=None, help="Frames before the coarse hit to refine (default: coarse_stride - 1).")
+    parser.add_argument("--report", type=str, default=None, help="Path to write a JSON run report with per-stage latency percentiles.")
+    parser.add_argument("--summary_every", type=int, default=0, help="Print a latency summary every N inferred frames (default: off).")
+    parser.add_argument("--backend", type=str, choices=BACKENDS, default='pytorch', help="Inference runtime; a .pt model is exported to ONNX or OpenVINO on first use (default: pytorch).")
+    parser.add_argument("--int8", action='store_true', help="Use an INT8 model calibrated on the val split of --data (onnx and openvino only).")
+    parser.add_argument("--data", type=str, default="../dataset/data.yaml", help="data.yaml used to calibrate INT8 exports.")
+    parser.add_argument("--server", type=str, default=None, help="URL of a running model_server.py to send frames to instead of loading the model here, e.g. http://127.0.0.1:8765.")
+    parser.add_argument("--reuse_buffers", action='store_true', help="Decode into a pool of preallocated frame buffers (linear search).")
+    parser.add_argument("--decode_size", type=int, default=None, help="Letterbox frames once to this model input size right after decoding, e.g. 640 (linear search).")
+    parser.add_argument("--decoders", type=int, default=4, help="Videos decoded in parallel when --input is a directory or glob (default: 4).")
     parser.add_argument("--save_frame_dir", type=str, default=os.path.abspath("../dataset/detected_frames"), help="Directory to save the detected frame image.")
     args = parser.parse_args()
  
     # Validate input arguments
-    if not os.path.exists(args.input):
+    inputs = expand_inputs(args.input)
+    if not inputs:
         print(f"Error: Input video {args.input} does not exist.")
         sys.exit(1)
     if not os.path.exists(args.model):
@@ -134,18 +456,59 @@ if __name__ == "__main__":
         sys.exit(1)
  
     # Load the trained model and set device
-    print("Loading the YOLOv8 model...")
-    device = 'cuda' if torch.cuda.is_available() else 'cpu'
-    print(f"Using device: {device}")
-    model = YOLO(args.model)
-    model.to(device)
+    if args.server:
+        print(f"Using the model server at {args.server}")
+        model = ModelClient(args.model, url=args.server)
+    else:
+        print("Loading the YOLOv8 model...")
+        model = load_model(args.model, backend=args.backend, int8=args.int8, data=args.data)
+        if args.backend == 'pytorch':
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            print(f"Using device: {device}")
+            model.to(device)
+        else:
+            print(f"Using {args.backend} on CPU")
     print("Model loaded successfully.")
  
-    # Run verification and save the frame if detected
-    verify_and_save_frame(
-        input_video=args.input,
-        model=model,
-        save_frame_dir=args.save_frame_dir,
-        output_message="This text verified",
-        confidence_threshold=args.confidence
-    )
\ No newline at end of file
+    if not os.path.isfile(args.input):
+        # Several videos: shared inference batches across all of them
+        start_time = time.time()
+        results = verify_videos(
+            inputs,
+            model=model,
+            save_frame_dir=args.save_frame_dir,
+            output_message="This text verified",
+            confidence_threshold=args.confidence,
+            batch_size=args.batch_size,
+            decoders=args.decoders
+        )
+        elapsed_time = time.time() - start_time
+        print(f"\nVerified {len(results)} videos in {elapsed_time:.2f} seconds")
+        for path, result in results.items():
+            if result["error"]:
+                print(f"  {path}: error ({result['error']})")
+            elif result["detected"]:
+                time_s = f" at {result['time_s']:.2f}s" if result["time_s"] is not None else ""
+                print(f"  {path}: frame {result['frame_number']}{time_s}, saved to {result['image_path']}")
+            else:
+                print(f"  {path}: not detected ({result['frames_decoded']} frames)")
+        if args.report:
+            write_report({"elapsed_s": elapsed_time, "videos": results}, args.report)
+            print(f"Run report written to {args.report}")
+    else:
+        # Run verification and save the frame if detected
+        verify_and_save_frame(
+            input_video=args.input,
+            model=model,
+            save_frame_dir=args.save_frame_dir,
+            output_message="This text verified",
+            confidence_threshold=args.confidence,
+            batch_size=args.batch_size,
+            search=args.search,
+            coarse_stride=args.coarse_stride,
+            refine_window=args.refine_window,
+            report_path=args.report,
+            summary_every=args.summary_every,
+            reuse_buffers=args.reuse_buffers,
+            decode_size=args.decode_size
+        )
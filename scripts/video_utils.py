@@ -0,0 +1,342 @@
+# scripts/video_utils.py
+
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+class FramePool:
+    """
+    Reusable frame buffers of one shape, so long videos do not allocate a new frame per read.
+
+    Buffers are allocated on first use up to capacity and handed out again once released;
+    acquire() blocks while all of them are in use, which also bounds the memory held by
+    frames in flight. Arrays the pool did not allocate (e.g. a frame the decoder returned in
+    a new array) are ignored by release(), so they never end up in the pool.
+    """
+
+    def __init__(self, shape, capacity, fill=None):
+        """
+        :param shape: (height, width, channels) of the buffers.
+        :param capacity: Maximum number of buffers.
+        :param fill: Value new buffers are filled with (left uninitialised if None).
+        """
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        self.fill = fill
+        self.free = queue.Queue()
+        # Every buffer allocated, by id; holding them keeps their ids from being reused
+        self.buffers = {}
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.buffers) < self.capacity:
+                if self.fill is None:
+                    buffer = np.empty(self.shape, dtype=np.uint8)
+                else:
+                    buffer = np.full(self.shape, self.fill, dtype=np.uint8)
+                self.buffers[id(buffer)] = buffer
+                return buffer
+        return self.free.get()
+
+    def release(self, buffers):
+        for buffer in buffers:
+            if self.buffers.get(id(buffer)) is buffer:
+                self.free.put(buffer)
+
+def read_batch(cap, batch_size, pool=None):
+    """
+    Read up to batch_size consecutive frames from an opened video capture.
+
+    :param cap: Opened cv2.VideoCapture.
+    :param batch_size: Maximum number of frames to read.
+    :param pool: FramePool to decode into instead of allocating a new array per frame; the
+                 caller releases the frames back to the pool when done with them.
+    :return: List of frames, shorter than batch_size (possibly empty) at the end of the video.
+    """
+    frames = []
+    while len(frames) < batch_size:
+        if pool is None:
+            ret, frame = cap.read()
+        else:
+            buffer = pool.acquire()
+            ret, frame = cap.read(buffer)
+            if not ret:
+                pool.release([buffer])
+            elif frame is not buffer:
+                # The decoder returned a different size than the pool was made for
+                pool.release([buffer])
+        if not ret:
+            break
+        frames.append(frame)
+    return frames
+
+def letterbox_frame(frame, imgsz, out=None):
+    """
+    Resize a frame to fit imgsz x imgsz, keeping its aspect ratio, and pad it with grey like the
+    ultralytics preprocessing, so the model does not resize it again.
+
+    :param out: imgsz x imgsz buffer filled with 114 to resize into, e.g. from a FramePool with
+                fill=114; only the image area is written, so the padding of a reused buffer stays
+                valid as long as all frames have the same size.
+    :return: (image, scale, (pad_x, pad_y)) to map boxes back with unletterbox_detections.
+    """
+    height, width = frame.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_w, new_h = round(width * scale), round(height * scale)
+    pad_x, pad_y = (imgsz - new_w) // 2, (imgsz - new_h) // 2
+    if out is None:
+        out = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    region = out[pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+    resized = cv2.resize(frame, (new_w, new_h), dst=region, interpolation=cv2.INTER_LINEAR)
+    if not np.shares_memory(resized, region):
+        region[...] = resized
+    return out, scale, (pad_x, pad_y)
+
+def unletterbox_detections(detections, scale, pad, shape):
+    """
+    Map (k, 6) detections from letterboxed coordinates back onto the original frame of the given shape.
+    """
+    if not len(detections):
+        return detections
+    mapped = detections.copy()
+    mapped[:, [0, 2]] = ((mapped[:, [0, 2]] - pad[0]) / scale).clip(0, shape[1])
+    mapped[:, [1, 3]] = ((mapped[:, [1, 3]] - pad[1]) / scale).clip(0, shape[0])
+    return mapped
+
+def frame_signature(frame, size=(64, 36)):
+    """
+    Downscaled grayscale thumbnail of a frame, used to compare frames cheaply.
+
+    :param frame: BGR frame.
+    :param size: (width, height) of the signature; the default keeps the 16:9 aspect of screen recordings.
+    :return: uint8 array of shape (height, width).
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+def signature_difference(a, b):
+    """
+    Mean absolute pixel difference (0-255) between two frame signatures.
+    """
+    return cv2.norm(a, b, cv2.NORM_L1) / a.size
+
+def extract_detections(results, class_id=0, confidence_threshold=0.5):
+    """
+    Filter a batch of inference results by class and confidence without per-box Python loops.
+
+    The masks are applied on the tensors where they live and the surviving boxes of the whole
+    batch are moved to host memory in a single transfer.
+
+    :param results: Results of one model call, one per frame.
+    :param class_id: Class to keep, or None to keep every class.
+    :param confidence_threshold: Minimum confidence to keep a detection.
+    :return: List with one float32 array per frame of shape (k, 6): x1, y1, x2, y2, confidence, class,
+             in the model's (confidence-descending) order.
+    """
+    kept = []
+    for result in results:
+        data = result.boxes.data
+        mask = data[:, 4] >= confidence_threshold
+        if class_id is not None:
+            mask &= data[:, 5] == class_id
+        kept.append(data[mask])
+
+    sizes = [len(k) for k in kept]
+    if not sum(sizes):
+        return [np.zeros((0, 6), dtype=np.float32) for _ in kept]
+
+    if isinstance(kept[0], np.ndarray):
+        host = np.concatenate(kept)
+    else:
+        import torch
+
+        host = torch.cat(kept).cpu().numpy()
+    return np.split(host.astype(np.float32, copy=False), np.cumsum(sizes)[:-1])
+
+def draw_detections(frame, detections, names, output_message=None):
+    """
+    Draw boxes with class label and confidence, and overlay the verification message if any
+    box was drawn.
+
+    :param frame: Frame to annotate in place.
+    :param detections: (k, 6) array from extract_detections.
+    :param names: Mapping from class id to class name (model.names).
+    :param output_message: Message to display when text is verified.
+    :return: True if the frame has at least one detection.
+    """
+    for x1, y1, x2, y2, confidence, class_id in detections:
+        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        label = f"{names[int(class_id)]} {confidence:.2f}"
+        cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+
+    if len(detections) and output_message:
+        cv2.putText(frame, output_message, (50, 50),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    return len(detections) > 0
+
+class RoiTracker:
+    """
+    Run inference on a window around the last detection instead of the full frame.
+
+    The status labels this project verifies stay at a nearly fixed screen position, so once one
+    is found the following frames are cropped to the detected boxes expanded by margin and run
+    at the smaller roi_imgsz, and the boxes are shifted back to full-frame coordinates. The full
+    frame is scanned again every rescan_every frames so new text elsewhere is not missed, and a
+    frame without a detection in the window is re-checked on the full frame immediately, after
+    which the window is dropped until the next detection.
+    """
+
+    def __init__(self, roi_imgsz=320, margin=0.5, min_size=128, rescan_every=30):
+        """
+        :param roi_imgsz: Inference size for the cropped window.
+        :param margin: Padding added on each side of the detected boxes, relative to their width and height.
+        :param min_size: Minimum width and height of the window in pixels.
+        :param rescan_every: Frames between two full-frame scans while a window is tracked.
+        """
+        self.roi_imgsz = roi_imgsz
+        self.margin = margin
+        self.min_size = min_size
+        self.rescan_every = rescan_every
+        self.roi = None
+        self.since_rescan = 0
+        self.frames_full = 0
+        self.frames_roi = 0
+        self.pixels_full = 0
+        self.pixels_inferred = 0
+
+    def detect(self, model, frames, class_id=0, confidence_threshold=0.5):
+        """
+        Detections of a batch of frames of the same size, as returned by extract_detections.
+        """
+        if self.roi is None or self.since_rescan >= self.rescan_every:
+            return self._detect_full(model, frames, class_id, confidence_threshold)
+
+        x1, y1, x2, y2 = self.roi
+        crops = [np.ascontiguousarray(frame[y1:y2, x1:x2]) for frame in frames]
+        results = model(crops, imgsz=self.roi_imgsz, verbose=False)
+        detections = extract_detections(results, class_id=class_id, confidence_threshold=confidence_threshold)
+        for frame_detections in detections:
+            frame_detections[:, [0, 2]] += x1
+            frame_detections[:, [1, 3]] += y1
+        self.frames_roi += len(frames)
+        self.since_rescan += len(frames)
+        self.pixels_full += frames[0].shape[0] * frames[0].shape[1] * len(frames)
+        self.pixels_inferred += (x2 - x1) * (y2 - y1) * len(frames)
+
+        missed = [i for i, frame_detections in enumerate(detections) if not len(frame_detections)]
+        if missed:
+            # The text moved or disappeared: re-check those frames on the full frame
+            rechecked = self._detect_full(model, [frames[i] for i in missed], class_id, confidence_threshold, recheck=True)
+            for i, frame_detections in zip(missed, rechecked):
+                detections[i] = frame_detections
+        else:
+            self._update(detections, frames[0].shape)
+        return detections
+
+    def _detect_full(self, model, frames, class_id, confidence_threshold, recheck=False):
+        results = model(frames, verbose=False)
+        detections = extract_detections(results, class_id=class_id, confidence_threshold=confidence_threshold)
+        pixels = frames[0].shape[0] * frames[0].shape[1] * len(frames)
+        self.frames_full += len(frames)
+        self.pixels_inferred += pixels
+        if not recheck:
+            self.pixels_full += pixels
+        self.since_rescan = 0
+        self._update(detections, frames[0].shape)
+        return detections
+
+    def _update(self, detections, shape):
+        """
+        Track the window around the boxes of the last frame with detections, or drop it if none has any.
+        """
+        last = next((d for d in reversed(detections) if len(d)), None)
+        if last is None:
+            self.roi = None
+            return
+        height, width = shape[:2]
+        x1, y1 = last[:, 0].min(), last[:, 1].min()
+        x2, y2 = last[:, 2].max(), last[:, 3].max()
+        pad_x = max(self.margin * (x2 - x1), (self.min_size - (x2 - x1)) / 2, 0)
+        pad_y = max(self.margin * (y2 - y1), (self.min_size - (y2 - y1)) / 2, 0)
+        self.roi = (max(int(x1 - pad_x), 0), max(int(y1 - pad_y), 0),
+                    min(int(x2 + pad_x) + 1, width), min(int(y2 + pad_y) + 1, height))
+
+    def summary(self):
+        """
+        Frames inferred on the full frame and on the window, and the fraction of pixels inferred.
+        """
+        return {
+            "frames_full": self.frames_full,
+            "frames_roi": self.frames_roi,
+            "pixel_ratio": self.pixels_inferred / self.pixels_full if self.pixels_full else 1.0,
+        }
+
+class FrameGate:
+    """
+    Skip inference on frames that barely differ from the last inferred frame.
+
+    Each frame's signature is compared with the signature of the last frame that went through
+    the model; below threshold the frame reuses that frame's detections. A refresh is forced
+    after refresh_every reused frames so a slow fade-in is never missed for long.
+    """
+
+    def __init__(self, threshold=0.5, refresh_every=30, size=(160, 90)):
+        """
+        :param threshold: Mean absolute signature difference (0-255) from which a frame is inferred.
+                          At the default signature size a 200x40 label appearing on a 720p frame
+                          changes the signature by about 0.9, while a moving mouse cursor changes
+                          it by less than 0.1.
+        :param refresh_every: Maximum number of consecutive frames reusing detections.
+        :param size: (width, height) of the frame signatures.
+        """
+        self.threshold = threshold
+        self.refresh_every = refresh_every
+        self.size = size
+        self.reference = None
+        self.since_inferred = 0
+        self.last = np.zeros((0, 6), dtype=np.float32)
+        self.frames = 0
+        self.skipped = 0
+
+    def detect(self, frames, detect):
+        """
+        Detections of a batch of frames, calling detect(frames) only on the frames that changed.
+
+        :param detect: Function returning the detections of a list of frames, e.g. a wrapper
+                       around model and extract_detections.
+        """
+        inferred, sources = [], []
+        for i, frame in enumerate(frames):
+            signature = frame_signature(frame, self.size)
+            if (self.reference is None or self.since_inferred >= self.refresh_every
+                    or signature_difference(signature, self.reference) >= self.threshold):
+                self.reference = signature
+                self.since_inferred = 0
+                inferred.append(i)
+            else:
+                self.since_inferred += 1
+            # Index into the inferred frames of the detections this frame uses (-1: previous batch)
+            sources.append(len(inferred) - 1)
+
+        detections = detect([frames[i] for i in inferred]) if inferred else []
+        batch = [detections[source] if source >= 0 else self.last for source in sources]
+        if detections:
+            self.last = detections[-1]
+        self.frames += len(frames)
+        self.skipped += len(frames) - len(inferred)
+        return batch
+
+    def summary(self):
+        return {
+            "frames": self.frames,
+            "frames_skipped": self.skipped,
+            "skip_rate": self.skipped / self.frames if self.frames else 0.0,
+        }
@@ -0,0 +1,178 @@
+# scripts/video_writer.py
+
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+WRITER_BACKENDS = ('opencv', 'threaded', 'ffmpeg')
+
+class ThreadedWriter:
+    """
+    Move the encoding of another writer onto a background thread.
+
+    write() copies the frame into a bounded queue and returns, so the caller may reuse the frame
+    buffer straight away; a full queue blocks the caller instead of growing without bound.
+    Frames are written in the order they were queued, and release() waits until every queued
+    frame is written. An error in the writer thread is raised by the next write() or release().
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, writer, queue_size=32):
+        self.writer = writer
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="video-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            frame = self.frames.get()
+            if frame is self._CLOSE:
+                break
+            if self.error is None:
+                try:
+                    self.writer.write(frame)
+                except Exception as e:
+                    self.error = e
+
+    def write(self, frame):
+        if self.error is not None:
+            raise RuntimeError(f"Video writer failed: {self.error}") from self.error
+        self.frames.put(frame.copy())
+
+    def release(self):
+        self.frames.put(self._CLOSE)
+        self.thread.join()
+        self.writer.release()
+        if self.error is not None:
+            raise RuntimeError(f"Video writer failed: {self.error}") from self.error
+
+class FFmpegWriter:
+    """
+    Pipe raw BGR frames into an ffmpeg subprocess, which encodes them on its own cores.
+    """
+
+    def __init__(self, path, fps, size, codec='libx264', preset='veryfast', crf=23, ffmpeg='ffmpeg'):
+        """
+        :param path: Output video path.
+        :param fps: Frame rate of the output video.
+        :param size: (width, height) of the frames.
+        :param codec: ffmpeg video encoder, e.g. libx264, libx265 or libvpx-vp9.
+        :param preset: Encoder speed preset (faster presets encode faster into larger files).
+        :param crf: Constant rate factor; lower is higher quality.
+        :param ffmpeg: ffmpeg executable.
+        """
+        executable = shutil.which(ffmpeg)
+        if executable is None:
+            raise RuntimeError(f"{ffmpeg} not found; install ffmpeg or use another writer backend")
+        width, height = size
+        command = [
+            executable, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f"{width}x{height}", '-r', str(fps), '-i', '-',
+            '-c:v', codec, '-preset', preset, '-crf', str(crf), '-pix_fmt', 'yuv420p', path,
+        ]
+        self.path = path
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def write(self, frame):
+        try:
+            self.process.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            self.release()
+            raise
+
+    def release(self):
+        if self.process.stdin and not self.process.stdin.closed:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+        stderr = self.process.stderr.read().decode(errors='replace')
+        self.process.stderr.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed writing {self.path}: {stderr.strip()}")
+
+def open_writer(path, fps, size, backend='opencv', codec=None, preset='veryfast', crf=23, queue_size=32):
+    """
+    Open a video writer with write(frame) and release().
+
+    :param backend: 'opencv' for a synchronous cv2.VideoWriter, 'threaded' for a cv2.VideoWriter
+                    on a background thread, or 'ffmpeg' for a pipe into an ffmpeg subprocess.
+    :param codec: FourCC for the OpenCV backends (default: mp4v) or ffmpeg encoder (default: libx264).
+    :param preset: ffmpeg encoder preset.
+    :param crf: ffmpeg constant rate factor.
+    :param queue_size: Frames buffered by the threaded backend.
+    """
+    if backend == 'ffmpeg':
+        return FFmpegWriter(path, fps, size, codec=codec or 'libx264', preset=preset, crf=crf)
+    if backend not in WRITER_BACKENDS:
+        raise ValueError(f"Unknown writer backend: {backend}")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*(codec or 'mp4v')), fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer for {path}")
+    return ThreadedWriter(writer, queue_size) if backend == 'threaded' else writer
+
+class SegmentWriter:
+    """
+    Write only the parts of a video that contain detections, one file per segment.
+
+    A segment starts `padding` frames before a detected frame and ends `padding` frames after the
+    last one; detections closer together than that extend the same segment. Segment files are
+    named after the output path with the first frame number appended, e.g. out_000123.mp4.
+    """
+
+    def __init__(self, path, open_segment, padding=15):
+        """
+        :param path: Output video path the segment names are derived from.
+        :param open_segment: Function opening a writer for a segment path, e.g. a partial of open_writer.
+        :param padding: Frames kept before and after the detections of a segment.
+        """
+        self.stem, self.ext = os.path.splitext(path)
+        self.open_segment = open_segment
+        self.padding = padding
+        # Copies of the most recent frames, written in front of the next segment
+        self.recent = deque(maxlen=padding)
+        self.writer = None
+        self.frame_number = 0
+        self.remaining = 0
+        self.segments = []
+
+    def write(self, frame, detected):
+        self.frame_number += 1
+        if detected:
+            if self.writer is None:
+                start = self.frame_number - len(self.recent)
+                path = f"{self.stem}_{start:06d}{self.ext}"
+                self.writer = self.open_segment(path)
+                self.segments.append({"path": path, "start_frame": start, "end_frame": None})
+                for recent in self.recent:
+                    self.writer.write(recent)
+                self.recent.clear()
+            self.remaining = self.padding
+        elif self.writer is not None:
+            if self.remaining == 0:
+                self._close_segment()
+            else:
+                self.remaining -= 1
+
+        if self.writer is not None:
+            self.writer.write(frame)
+            self.segments[-1]["end_frame"] = self.frame_number
+        elif self.padding:
+            self.recent.append(frame.copy())
+
+    def _close_segment(self):
+        self.writer.release()
+        self.writer = None
+
+    def release(self):
+        if self.writer is not None:
+            self._close_segment()
+        self.recent.clear()
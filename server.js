@@ -55,6 +55,21 @@ function initializeDatabase() {
     metrics TEXT,
     history TEXT
   )`);
+
+  // Per-run progress log written by scripts/metrics_db.py; WAL lets it write while we read
+  db.run('PRAGMA journal_mode=WAL');
+  db.run(`CREATE TABLE IF NOT EXISTS training_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    epoch INTEGER,
+    batch INTEGER,
+    progress REAL,
+    device TEXT,
+    metrics TEXT,
+    timestamp REAL NOT NULL
+  )`);
+  db.run('CREATE INDEX IF NOT EXISTS training_metrics_run ON training_metrics (run_id, id)');
 }
 
 // API Routes
@@ -185,45 +200,37 @@ app.get('/api/training-status', (req, res) => {
         });
       }
 
-      // Calculate progress based on start and end times
-      const progress = row.end_time
-        ? 100
-        : Math.floor(
-            ((new Date() - new Date(row.start_time)) /
-            (1000 * 60 * 60)) * 100
-          );
-
-      // Parse metrics from training log
-      let metrics = {};
-      try {
-        if (row.metrics) {
-          metrics = JSON.parse(row.metrics);
-        }
-      } catch (e) {
-        console.error('Error parsing metrics:', e);
-      }
-
-      // Get training history
+      // Progress, device and per-epoch metrics as logged by the training run
       db.all(
-        'SELECT * FROM training_tasks WHERE id = ? ORDER BY start_time ASC',
+        `SELECT kind, epoch, progress, device, metrics, timestamp FROM training_metrics
+         WHERE run_id = ? AND kind IN ('start', 'batch', 'epoch', 'end') ORDER BY id ASC`,
         [row.id],
-        (err, history) => {
+        (err, rows) => {
           if (err) {
-            console.error('Error fetching history:', err);
+            return res.status(500).json({ error: err.message });
           }
 
+          const parse = (text) => {
+            try {
+              return text ? JSON.parse(text) : {};
+            } catch (e) {
+              console.error('Error parsing metrics:', e);
+              return {};
+            }
+          };
+          const last = rows[rows.length - 1];
+          const epochs = rows.filter(r => r.kind === 'epoch');
+          const progress = row.end_time ? 100 : (last ? last.progress : 0);
+
           res.json({
             status: row.status,
-            progress: Math.min(progress, 100),
-            device: row.device || 'CPU',
-            metrics,
-            history: history.map(h => ({
-              timestamp: h.start_time,
-              metrics: h.metrics ? JSON.parse(h.metrics) : {},
-              progress: Math.floor(
-                ((new Date(h.start_time) - new Date(row.start_time)) /
-                (1000 * 60 * 60)) * 100
-              )
+            progress: Math.min(Math.floor(progress), 100),
+            device: (last && last.device) || 'CPU',
+            metrics: epochs.length ? parse(epochs[epochs.length - 1].metrics) : {},
+            history: epochs.map(h => ({
+              timestamp: new Date(h.timestamp * 1000).toISOString(),
+              metrics: parse(h.metrics),
+              progress: Math.floor(h.progress)
             }))
           });
         }
@@ -250,6 +257,7 @@ app.post('/api/train', (req, res) => {
       }
 
       const trainingId = this.lastID;
+      options.args = ['--run_id', String(trainingId), '--db', path.resolve('./yolov8_training.db')];
 
       const pythonProcess = PythonShell.run('train_yolov8.py', options, (err, results) => {
         const status = err ? 'failed' : 'completed';
@@ -271,29 +279,9 @@ app.post('/api/train', (req, res) => {
         res.json({ id: trainingId });
       });
 
-      // Handle real-time output from Python process
+      // Progress and metrics are written to training_metrics by the training script itself
       pythonProcess.on('message', (message) => {
-        if (message.startsWith('PROGRESS:')) {
-          const progress = parseInt(message.split(':')[1]);
-          db.run(
-            'UPDATE training_tasks SET progress = ? WHERE id = ?',
-            [progress, trainingId]
-          );
-        }
-        else if (message.startsWith('DEVICE:')) {
-          const device = message.split(':')[1];
-          db.run(
-            'UPDATE training_tasks SET device = ? WHERE id = ?',
-            [device, trainingId]
-          );
-        }
-        else if (message.startsWith('METRICS:')) {
-          const metrics = message.split(':')[1];
-          db.run(
-            'UPDATE training_tasks SET metrics = ? WHERE id = ?',
-            [metrics, trainingId]
-          );
-        }
+        console.log(`[training ${trainingId}] ${message}`);
       });
     }
   );
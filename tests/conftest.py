@@ -0,0 +1,53 @@
+# tests/conftest.py
+
+import os
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+# The scripts import each other as top-level modules, as when run from scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+class BrightFrameModel:
+    """
+    Stand-in for a YOLO model that detects one class-0 box in every frame brighter than threshold,
+    returning results shaped like the ultralytics Results read by extract_detections.
+    """
+
+    names = {0: "text"}
+
+    def __init__(self, threshold=128):
+        self.threshold = threshold
+        self.frames = 0
+
+    def __call__(self, frames, verbose=False, imgsz=None):
+        self.frames += len(frames)
+        results = []
+        for frame in frames:
+            data = np.zeros((0, 6), dtype=np.float32)
+            if frame.mean() > self.threshold:
+                data = np.array([[1, 1, 10, 10, 0.9, 0]], dtype=np.float32)
+            results.append(SimpleNamespace(boxes=SimpleNamespace(data=data), speed={}))
+        return results
+
+@pytest.fixture
+def make_video(tmp_path):
+    """
+    Write a small mp4v video whose frame i is black before first_bright and white from it on.
+    """
+    def make(name="video.mp4", frames=30, first_bright=None, size=(64, 48), fps=10):
+        path = str(tmp_path / name)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+        for i in range(frames):
+            value = 255 if first_bright is not None and i >= first_bright else 0
+            writer.write(np.full((size[1], size[0], 3), value, dtype=np.uint8))
+        writer.release()
+        return path
+    return make
+
+@pytest.fixture
+def bright_model():
+    return BrightFrameModel()
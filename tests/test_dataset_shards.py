@@ -0,0 +1,52 @@
+# tests/test_dataset_shards.py
+
+import os
+
+from dataset_shards import export_shards, load_manifest, read_shard_index, unpack_shards
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def test_shards_keep_relative_paths_and_long_names(tmp_path):
+    long_name = "frame_" + "x" * 150 + ".jpg"
+    images = [tmp_path / "a" / "images" / "clip.jpg", tmp_path / "b" / "images" / "clip.jpg", tmp_path / "a" / "images" / long_name]
+    for i, image in enumerate(images):
+        _write(str(image), f"image {i}".encode())
+        _write(str(image).replace(os.sep + "images" + os.sep, os.sep + "labels" + os.sep)[:-4] + ".txt", f"{i} 0.5 0.5 0.1 0.1\n".encode())
+    (tmp_path / "train.txt").write_text("".join(f"{image}\n" for image in images))
+    (tmp_path / "data.yaml").write_text("train: train.txt\nval: train.txt\nnc: 3\n")
+    shard_dir = str(tmp_path / "shards")
+
+    export_shards(str(tmp_path / "data.yaml"), shard_dir, splits=('train',))
+
+    shard = load_manifest(shard_dir)["splits"]["train"]["shards"][0]
+    entries = read_shard_index(shard_dir, shard)
+    assert sorted(entry["image"] for entry in entries) == sorted(["a/images/clip.jpg", "b/images/clip.jpg", f"a/images/{long_name}"])
+    with open(os.path.join(shard_dir, shard["path"]), 'rb') as f:
+        for entry in entries:
+            f.seek(entry["image_offset"])
+            assert f.read(entry["image_size"]) == (tmp_path / entry["image"]).read_bytes()
+
+    images_dir = unpack_shards(shard_dir, 'train', str(tmp_path / "scratch"))
+
+    assert (tmp_path / "scratch" / "train" / "images" / "a" / "images" / "clip.jpg").read_bytes() == b"image 0"
+    assert (tmp_path / "scratch" / "train" / "images" / "b" / "images" / "clip.jpg").read_bytes() == b"image 1"
+    assert (tmp_path / "scratch" / "train" / "images" / "b" / "labels" / "clip.txt").read_bytes().startswith(b"1 ")
+    assert images_dir == str(tmp_path / "scratch" / "train" / "images")
+
+def test_unpack_rewrites_same_length_relabel(tmp_path):
+    _write(str(tmp_path / "train" / "images" / "f.jpg"), b"image")
+    label = tmp_path / "train" / "labels" / "f.txt"
+    _write(str(label), b"0 0.5 0.5 0.1 0.1\n")
+    (tmp_path / "data.yaml").write_text("train: train/images\nval: train/images\nnc: 2\n")
+    shard_dir, scratch = str(tmp_path / "shards"), str(tmp_path / "scratch")
+    export_shards(str(tmp_path / "data.yaml"), shard_dir, splits=('train',))
+    unpack_shards(shard_dir, 'train', scratch)
+
+    _write(str(label), b"1 0.5 0.5 0.1 0.1\n")
+    export_shards(str(tmp_path / "data.yaml"), shard_dir, splits=('train',))
+    unpack_shards(shard_dir, 'train', scratch)
+
+    assert (tmp_path / "scratch" / "train" / "labels" / "f.txt").read_bytes() == b"1 0.5 0.5 0.1 0.1\n"
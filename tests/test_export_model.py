@@ -0,0 +1,38 @@
+# tests/test_export_model.py
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from export_model import split_images, split_source
+
+@pytest.fixture
+def dataset(tmp_path):
+    root = tmp_path / "dataset"
+    for split in ("train", "val"):
+        (root / split / "images").mkdir(parents=True)
+        for i in range(2):
+            cv2.imwrite(str(root / split / "images" / f"{split}_{i}.jpg"), np.zeros((8, 8, 3), dtype=np.uint8))
+    (root / "val.txt").write_text("val/images/val_0.jpg\n./val/images/val_1.jpg\n")
+    return root
+
+def test_splits_resolve_against_data_yaml_directory(dataset, tmp_path, monkeypatch):
+    data = dataset / "data.yaml"
+    data.write_text("train: train/images\nval: val.txt\nnc: 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    assert split_source(str(data), "train") == str(dataset / "train" / "images")
+    assert split_images(str(data), "train") == [str(dataset / "train" / "images" / f"train_{i}.jpg") for i in range(2)]
+    assert split_images(str(data), "val") == [str(dataset / "val" / "images" / f"val_{i}.jpg") for i in range(2)]
+
+def test_splits_resolve_against_path_key(dataset, tmp_path, monkeypatch):
+    config_dir = tmp_path / "configs"
+    config_dir.mkdir()
+    data = config_dir / "data.yaml"
+    data.write_text("path: ../dataset\ntrain: train/images\nval: val.txt\nnc: 1\n")
+    monkeypatch.chdir(dataset / "train")
+
+    assert split_source(str(data), "val") == str(dataset / "val.txt")
+    assert [os.path.basename(path) for path in split_images(str(data), "train")] == ["train_0.jpg", "train_1.jpg"]
@@ -0,0 +1,65 @@
+# tests/test_extract_frames.py
+
+import json
+import os
+
+import pytest
+
+from extract_frames import MANIFEST_NAME, extract_frames_from_videos
+
+@pytest.fixture
+def videos_dir(make_video, tmp_path):
+    make_video("clip.mp4", frames=30, fps=10)
+    return str(tmp_path)
+
+def _frames(output_dir):
+    return sorted(name for name in os.listdir(output_dir) if name.endswith(".jpg"))
+
+def _manifest(output_dir):
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'r') as f:
+        return json.load(f)
+
+def test_unchanged_video_is_skipped(videos_dir, tmp_path):
+    output_dir = str(tmp_path / "frames")
+
+    first = extract_frames_from_videos(videos_dir, output_dir, frame_rate=5, workers=1)
+
+    assert [stats["extracted"] for stats in first] == [15]
+    assert _manifest(output_dir)["videos"]["clip.mp4"]["complete"]
+    assert extract_frames_from_videos(videos_dir, output_dir, frame_rate=5, workers=1) == []
+
+def test_interrupted_extraction_resumes(videos_dir, tmp_path):
+    output_dir = str(tmp_path / "frames")
+    extract_frames_from_videos(videos_dir, output_dir, frame_rate=5, workers=1)
+
+    # Simulate a crash after frame 9 was (possibly partially) written
+    manifest = _manifest(output_dir)
+    manifest["videos"]["clip.mp4"].update(frames=10, complete=False)
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f)
+    for index in range(10, 15):
+        os.remove(os.path.join(output_dir, f"clip_frame_{index}.jpg"))
+
+    results = extract_frames_from_videos(videos_dir, output_dir, frame_rate=5, workers=1)
+
+    assert [stats["extracted"] for stats in results] == [6]
+    assert _frames(output_dir) == sorted(f"clip_frame_{index}.jpg" for index in range(15))
+    assert _manifest(output_dir)["videos"]["clip.mp4"]["complete"]
+
+def test_changed_frame_rate_extracts_again(videos_dir, tmp_path):
+    output_dir = str(tmp_path / "frames")
+    extract_frames_from_videos(videos_dir, output_dir, frame_rate=5, workers=1)
+
+    results = extract_frames_from_videos(videos_dir, output_dir, frame_rate=1, workers=1)
+
+    assert [stats["extracted"] for stats in results] == [3]
+    assert _frames(output_dir) == [f"clip_frame_{index}.jpg" for index in range(3)]
+
+def test_touched_video_is_skipped_with_hash(videos_dir, tmp_path):
+    output_dir = str(tmp_path / "frames")
+    extract_frames_from_videos(videos_dir, output_dir, frame_rate=5, workers=1, hash_videos=True)
+
+    video_path = os.path.join(videos_dir, "clip.mp4")
+    os.utime(video_path, (0, 0))
+
+    assert extract_frames_from_videos(videos_dir, output_dir, frame_rate=5, workers=1, hash_videos=True) == []
@@ -0,0 +1,64 @@
+# tests/test_label_store.py
+
+import os
+import time
+
+import pytest
+
+from check_labels import check_labels
+from dataset_index import DatasetIndex
+from label_store import open_label_store
+
+@pytest.fixture
+def labels_dir(tmp_path):
+    labels = tmp_path / "labels"
+    labels.mkdir()
+    (labels / "a.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    (labels / "b.txt").write_text("1 0.4 0.4 0.1 0.1\n0 0.6 0.6 0.1 0.1\n")
+    (labels / "c.txt").write_text("")
+    # Age the directory so its cached listing is trusted (see DatasetIndex)
+    old = time.time() - 60
+    os.utime(labels, (old, old))
+    return str(labels)
+
+def test_in_place_edit_needs_verify(labels_dir, tmp_path):
+    index = DatasetIndex(str(tmp_path / "index.json"))
+    store_dir = str(tmp_path / "store")
+    store = open_label_store(labels_dir, store_dir, workers=1, index=index)
+    assert len(store.classes) == 3
+
+    # Rewriting a file in place leaves the directory mtime, and so the cached listing, unchanged
+    directory_times = os.stat(labels_dir)
+    with open(os.path.join(labels_dir, "a.txt"), 'w') as f:
+        f.write("0 0.5 0.5 0.2 0.2\n1 0.1 0.1 0.05 0.05\n")
+    os.utime(labels_dir, ns=(directory_times.st_atime_ns, directory_times.st_mtime_ns))
+
+    assert len(open_label_store(labels_dir, store_dir, workers=1, index=index).classes) == 3
+    assert len(open_label_store(labels_dir, store_dir, workers=1, index=index, verify=True).classes) == 4
+
+def test_added_file_rebuilds_without_verify(labels_dir, tmp_path):
+    index = DatasetIndex(str(tmp_path / "index.json"))
+    store_dir = str(tmp_path / "store")
+    open_label_store(labels_dir, store_dir, workers=1, index=index)
+
+    with open(os.path.join(labels_dir, "d.txt"), 'w') as f:
+        f.write("2 0.5 0.5 0.3 0.3\n")
+
+    store = open_label_store(labels_dir, store_dir, workers=1, index=index)
+    assert store.names == ["a.txt", "b.txt", "c.txt", "d.txt"]
+
+def test_store_matches_file_validation(tmp_path):
+    labels = tmp_path / "labels"
+    labels.mkdir()
+    (labels / "ok.txt").write_text("0 0.5 0.5 0.2 0.2\n1 0.3 0.3 0.1 0.1\n")
+    (labels / "bad.txt").write_text("5 0.5 0.5 0.2 0.2\n0 1.5 0.5 0.2 0.2\n0.5 0.5 0.5 0.1 0.1\n0 0.5 0.5 0 0.1\n")
+    (labels / "dup.txt").write_text("0 0.5 0.5 0.2 0.2\n0 0.5 0.5 0.2 0.2\n")
+    (labels / "broken.txt").write_text("0 0.5 0.5\nnot a label\n1 0.2 0.2 0.1 0.1\n")
+    (labels / "empty.txt").write_text("")
+    index = DatasetIndex(str(tmp_path / "index.json"))
+
+    from_files = check_labels(str(labels), nc=2, workers=1, index=index)
+    from_store = check_labels(str(labels), nc=2, workers=1, index=index, use_store=True)
+
+    assert from_files["invalid_rows"] > 0 and from_files["malformed_lines"] == 2
+    assert from_store == from_files
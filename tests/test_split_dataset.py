@@ -0,0 +1,52 @@
+# tests/test_split_dataset.py
+
+import os
+
+import pytest
+
+from dataset_index import DatasetIndex
+from split_dataset import split_dataset
+
+@pytest.fixture
+def source(tmp_path):
+    images, labels = tmp_path / "frames", tmp_path / "labels"
+    images.mkdir()
+    labels.mkdir()
+    for i in range(5):
+        (images / f"frame_{i}.jpg").write_bytes(b"jpeg")
+        (labels / f"frame_{i}.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+    return str(images), str(labels)
+
+def _split(source, output_dir, tmp_path, **kwargs):
+    index = DatasetIndex(str(tmp_path / "index.json"))
+    split_dataset(*source, output_dir, train_ratio=0.6, index=index, **kwargs)
+
+def test_resplit_keeps_stale_files_without_clean(source, tmp_path):
+    output_dir = str(tmp_path / "split")
+    _split(source, output_dir, tmp_path)
+    stale = os.path.join(output_dir, "train", "images", "old.jpg")
+    notes = os.path.join(output_dir, "train", "images", "notes.md")
+    for path in (stale, notes):
+        with open(path, 'w') as f:
+            f.write("kept")
+
+    _split(source, output_dir, tmp_path)
+
+    assert os.path.exists(stale) and os.path.exists(notes)
+
+def test_clean_removes_only_stale_images_and_labels(source, tmp_path):
+    output_dir = str(tmp_path / "split")
+    _split(source, output_dir, tmp_path)
+    stale_image = os.path.join(output_dir, "train", "images", "old.jpg")
+    stale_label = os.path.join(output_dir, "val", "labels", "old.txt")
+    notes = os.path.join(output_dir, "train", "images", "notes.md")
+    for path in (stale_image, stale_label, notes):
+        with open(path, 'w') as f:
+            f.write("x")
+
+    _split(source, output_dir, tmp_path, clean=True)
+
+    assert not os.path.exists(stale_image) and not os.path.exists(stale_label)
+    assert os.path.exists(notes)
+    assert len(os.listdir(os.path.join(output_dir, "train", "images"))) == 3 + 1
+    assert len(os.listdir(os.path.join(output_dir, "val", "images"))) == 2
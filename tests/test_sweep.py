@@ -0,0 +1,35 @@
+# tests/test_sweep.py
+
+import threading
+
+from sweep import asha_should_stop, rung_epochs
+
+def test_rung_epochs():
+    assert rung_epochs(100, min_epochs=3, eta=3) == [3, 9, 27, 81]
+    assert rung_epochs(10, min_epochs=2, eta=2) == [2, 4, 8]
+    assert rung_epochs(3, min_epochs=3, eta=3) == []
+
+def test_first_trials_at_a_rung_always_continue():
+    rungs, lock = {}, threading.Lock()
+
+    assert not asha_should_stop(rungs, lock, 3, 0.1)
+    assert not asha_should_stop(rungs, lock, 3, 0.05)
+    assert rungs[3] == [0.1, 0.05]
+
+def test_trials_outside_the_top_fraction_are_stopped():
+    rungs, lock = {3: [0.5, 0.4]}, threading.Lock()
+
+    # Three values: only the best one is in the top third
+    assert asha_should_stop(rungs, lock, 3, 0.3)
+    assert not asha_should_stop({3: [0.5, 0.4]}, lock, 3, 0.6)
+
+    # Six values: the best two survive
+    rungs = {9: [0.9, 0.1, 0.2, 0.3, 0.4]}
+    assert not asha_should_stop(dict(rungs), lock, 9, 0.5)
+    assert asha_should_stop(dict(rungs), lock, 9, 0.35)
+
+def test_rungs_are_recorded_separately():
+    rungs, lock = {3: [0.9, 0.8, 0.7]}, threading.Lock()
+
+    assert not asha_should_stop(rungs, lock, 9, 0.1)
+    assert rungs == {3: [0.9, 0.8, 0.7], 9: [0.1]}
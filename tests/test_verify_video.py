@@ -0,0 +1,38 @@
+# tests/test_verify_video.py
+
+import os
+
+import pytest
+
+from multi_video import is_multi_input
+from verify_video import verify_and_save_videos
+
+def test_same_file_names_get_separate_outputs(make_video, bright_model, tmp_path):
+    os.makedirs(tmp_path / "a")
+    os.makedirs(tmp_path / "b")
+    first = make_video(os.path.join("a", "clip.mp4"), frames=5, first_bright=2)
+    second = make_video(os.path.join("b", "clip.mp4"), frames=5)
+
+    results = verify_and_save_videos([first, second], str(tmp_path / "out"), bright_model, batch_size=4)
+
+    assert results[first]["output"] == str(tmp_path / "out" / "a" / "clip.mp4")
+    assert results[second]["output"] == str(tmp_path / "out" / "b" / "clip.mp4")
+    assert results[first]["first_frame"] == 3
+    assert results[second]["first_frame"] is None
+    assert all(os.path.getsize(result["output"]) > 0 for result in results.values())
+
+def test_writer_open_failure_is_reported_per_video(make_video, bright_model, tmp_path):
+    video = make_video(frames=3)
+
+    results = verify_and_save_videos([video], str(tmp_path / "out"), bright_model, writer="bogus")
+
+    assert "Unknown writer backend" in results[video]["error"]
+
+def test_is_multi_input(make_video, tmp_path):
+    video = make_video()
+
+    assert not is_multi_input(video)
+    assert is_multi_input(str(tmp_path))
+    assert is_multi_input(str(tmp_path / "*.mp4"))
+    with pytest.raises(FileNotFoundError):
+        is_multi_input(str(tmp_path / "missing.mp4"))
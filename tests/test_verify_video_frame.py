@@ -0,0 +1,36 @@
+# tests/test_verify_video_frame.py
+
+import cv2
+import pytest
+
+from conftest import BrightFrameModel
+from verify_video_frame import verify_and_save_frame
+
+@pytest.mark.parametrize("search", ["linear", "coarse"])
+def test_no_detection_reports_every_frame_as_linear_cost(make_video, bright_model, tmp_path, search):
+    video = make_video(frames=90)
+    cap = cv2.VideoCapture(video)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    result = verify_and_save_frame(video, bright_model, str(tmp_path / "frames"), batch_size=4, search=search, coarse_stride=100)
+
+    assert not result["detected"]
+    assert total == 90
+    assert result["linear_frames"] == total
+    # The coarse search decodes the last frame again to sample the tail of the video
+    assert result["frames_decoded"] == total + (search == "coarse")
+
+@pytest.mark.parametrize("coarse_stride", [1, 7, 16, 100])
+@pytest.mark.parametrize("batch_size", [1, 4])
+def test_coarse_search_finds_the_same_first_frame(make_video, tmp_path, coarse_stride, batch_size):
+    video = make_video(frames=90, first_bright=37)
+
+    results = {
+        search: verify_and_save_frame(video, BrightFrameModel(), str(tmp_path / search), batch_size=batch_size,
+                                      search=search, coarse_stride=coarse_stride)
+        for search in ("linear", "coarse")
+    }
+
+    assert results["linear"]["frame_number"] == 38
+    assert results["coarse"]["frame_number"] == results["linear"]["frame_number"]
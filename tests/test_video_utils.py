@@ -0,0 +1,73 @@
+# tests/test_video_utils.py
+
+import numpy as np
+import pytest
+
+from video_utils import FramePool, letterbox_frame, read_batch, unletterbox_detections
+
+@pytest.mark.parametrize("shape", [(480, 640, 3), (640, 360, 3), (320, 320, 3)])
+def test_letterbox_round_trip(shape):
+    frame = np.zeros(shape, dtype=np.uint8)
+    image, scale, pad = letterbox_frame(frame, 320)
+    assert image.shape == (320, 320, 3)
+
+    box = np.array([[10, 20, shape[1] - 30, shape[0] - 40, 0.9, 0]], dtype=np.float32)
+    letterboxed = box.copy()
+    letterboxed[:, [0, 2]] = box[:, [0, 2]] * scale + pad[0]
+    letterboxed[:, [1, 3]] = box[:, [1, 3]] * scale + pad[1]
+
+    np.testing.assert_allclose(unletterbox_detections(letterboxed, scale, pad, shape), box, atol=1e-3)
+
+def test_letterbox_pads_with_grey_and_reuses_the_buffer():
+    frame = np.full((100, 200, 3), 255, dtype=np.uint8)
+    out = np.full((64, 64, 3), 114, dtype=np.uint8)
+
+    image, scale, (pad_x, pad_y) = letterbox_frame(frame, 64, out)
+
+    assert image is out and scale == pytest.approx(0.32) and (pad_x, pad_y) == (0, 16)
+    assert (image[:pad_y] == 114).all() and (image[pad_y:pad_y + 32] == 255).all()
+
+def test_unletterbox_clips_to_the_frame():
+    detections = np.array([[-5, -5, 400, 400, 0.5, 0]], dtype=np.float32)
+
+    mapped = unletterbox_detections(detections, 1.0, (0, 0), (100, 200, 3))
+
+    assert mapped[0, :4].tolist() == [0, 0, 200, 100]
+
+class FakeCapture:
+    def __init__(self, frames, shape):
+        self.frames = frames
+        self.shape = shape
+
+    def read(self, buffer=None):
+        if not self.frames:
+            return False, None
+        self.frames -= 1
+        if buffer is not None and buffer.shape == self.shape:
+            buffer[...] = 1
+            return True, buffer
+        return True, np.ones(self.shape, dtype=np.uint8)
+
+def test_frame_pool_reuses_its_buffers():
+    pool = FramePool((4, 4, 3), capacity=2)
+    cap = FakeCapture(5, (4, 4, 3))
+
+    seen = set()
+    while True:
+        frames = read_batch(cap, 2, pool)
+        if not frames:
+            break
+        seen.update(id(frame) for frame in frames)
+        pool.release(frames)
+
+    assert len(seen) == 2
+
+def test_frame_pool_ignores_foreign_frames():
+    pool = FramePool((4, 4, 3), capacity=2)
+    cap = FakeCapture(3, (6, 6, 3))
+
+    frames = read_batch(cap, 3, pool)
+    pool.release(frames)
+
+    assert len(frames) == 3
+    assert all(buffer.shape == (4, 4, 3) for buffer in pool.free.queue)
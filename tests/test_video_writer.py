@@ -0,0 +1,52 @@
+# tests/test_video_writer.py
+
+import numpy as np
+
+from video_writer import SegmentWriter
+
+class RecordingWriter:
+    def __init__(self, path):
+        self.path = path
+        self.frames = []
+        self.released = False
+
+    def write(self, frame):
+        self.frames.append(int(frame[0, 0, 0]))
+
+    def release(self):
+        self.released = True
+
+def _write_video(detected_frames, frames=40, padding=3):
+    writers = []
+
+    def open_segment(path):
+        writers.append(RecordingWriter(path))
+        return writers[-1]
+
+    segment_writer = SegmentWriter("/out/video.mp4", open_segment, padding=padding)
+    for number in range(1, frames + 1):
+        segment_writer.write(np.full((2, 2, 3), number, dtype=np.uint8), number in detected_frames)
+    segment_writer.release()
+    return segment_writer.segments, writers
+
+def test_segments_are_padded_and_merged():
+    segments, writers = _write_video({10, 12, 30})
+
+    assert segments == [
+        {"path": "/out/video_000007.mp4", "start_frame": 7, "end_frame": 15},
+        {"path": "/out/video_000027.mp4", "start_frame": 27, "end_frame": 33},
+    ]
+    assert writers[0].frames == list(range(7, 16))
+    assert writers[1].frames == list(range(27, 34))
+    assert all(writer.released for writer in writers)
+
+def test_segment_at_the_start_and_end_of_the_video():
+    segments, writers = _write_video({1, 40})
+
+    assert [(s["start_frame"], s["end_frame"]) for s in segments] == [(1, 4), (37, 40)]
+    assert writers[1].frames == [37, 38, 39, 40]
+
+def test_no_detections_write_nothing():
+    segments, writers = _write_video(set())
+
+    assert segments == [] and writers == []